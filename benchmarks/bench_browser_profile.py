@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Page-load and per-post time with the 'default' and 'lean' browser profiles.
+
+Serves N mock posts from benchmarks.mock_server with media on (post images, a video, a
+web font and comment avatars, each delayed by --asset-latency) and scrapes them with a
+driver in each profile. Reports the post page's load time (navigation timing), the time
+per post through get_comments_from_post, how many asset requests reached the server and
+whether both profiles extracted the same comments.
+
+Usage:
+    python -m benchmarks.bench_browser_profile --posts 5
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import time
+
+os.environ.setdefault('HEADLESS', '1')
+
+from scrapers.driver_factory import BROWSER_PROFILES, create_driver
+from scrapers.instagram_scraper import get_comments_from_post
+from benchmarks.mock_server import serve_in_background
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+LOAD_TIME_SCRIPT = "const t = performance.getEntriesByType('navigation')[0]; return t.loadEventEnd - t.startTime;"
+
+def run_profile(server, urls, profile):
+    driver = create_driver(profile=profile)
+    if driver is None:
+        raise RuntimeError("Could not launch Chrome.")
+    server.asset_requests = 0
+    load_ms, post_seconds, comments = [], [], []
+    try:
+        for url in urls:
+            driver.get(url)
+            load_ms.append(driver.execute_script(LOAD_TIME_SCRIPT))
+            start = time.monotonic()
+            comments.append(get_comments_from_post(url, driver=driver))
+            post_seconds.append(time.monotonic() - start)
+    finally:
+        driver.quit()
+    return {
+        'profile': profile,
+        'avg_page_load_ms': round(sum(load_ms) / len(load_ms), 1),
+        'avg_post_seconds': round(sum(post_seconds) / len(post_seconds), 2),
+        'asset_requests': server.asset_requests,
+        'comments': sum(len(c) for c in comments),
+    }, comments
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=5)
+    parser.add_argument('--comments', type=int, default=60, help='comments per mock post')
+    parser.add_argument('--asset-latency', type=float, default=0.2, help='seconds per image/video/font request')
+    args = parser.parse_args()
+
+    server, base_url = serve_in_background(comments_per_post=args.comments, media=True, asset_latency=args.asset_latency)
+    urls = [f"{base_url}/p/post{i}/" for i in range(args.posts)]
+    results, extracted = [], {}
+    try:
+        for profile in BROWSER_PROFILES:
+            result, extracted[profile] = run_profile(server, urls, profile)
+            results.append(result)
+            print(f"[INFO] {profile}: page load {result['avg_page_load_ms']:.0f} ms, {result['avg_post_seconds']:.1f}s per post, "
+                  f"{result['asset_requests']} asset requests, {result['comments']} comments")
+    finally:
+        server.shutdown()
+
+    same_comments = len({json.dumps(c) for c in extracted.values()}) == 1
+    print(f"[INFO] Same comments extracted by every profile: {same_comments}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'browser_profile.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'posts': args.posts, 'comments_per_post': args.comments, 'asset_latency': args.asset_latency,
+                   'results': results, 'same_comments': same_comments}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
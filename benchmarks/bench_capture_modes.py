@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Throughput of the DOM and network (CDP) capture modes of get_comments_from_post.
+
+Scrapes the same mock posts once per capture mode on one driver created with network
+capture enabled, and reports comments found, time per post and comments per second.
+
+Usage:
+    python -m benchmarks.bench_capture_modes --posts 3 --comments 300
+"""
+
+import argparse
+import json
+import os
+import pathlib
+
+os.environ.setdefault('HEADLESS', '1')
+
+from main import setup_driver
+from scrapers.instagram_scraper import get_comments_from_post
+from benchmarks.mock_server import serve_in_background
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+MODES = ['dom', 'network']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=3)
+    parser.add_argument('--comments', type=int, default=300, help='comments per mock post')
+    args = parser.parse_args()
+
+    server, base_url = serve_in_background(comments_per_post=args.comments)
+    driver = setup_driver(capture_mode='network')
+    if not driver:
+        server.shutdown()
+        return
+
+    results = {}
+    try:
+        for mode in MODES:
+            per_post = []
+            for i in range(args.posts):
+                stats = {}
+                get_comments_from_post(f"{base_url}/p/{mode}{i}/", driver=driver, capture_mode=mode, stats=stats)
+                per_post.append(stats)
+            total_seconds = sum(s['total_seconds'] for s in per_post)
+            total_comments = sum(s['comments'] for s in per_post)
+            results[mode] = {
+                'comments': total_comments,
+                'seconds_per_post': round(total_seconds / args.posts, 2),
+                'comments_per_second': round(total_comments / total_seconds, 2) if total_seconds else 0,
+                'per_post': per_post,
+            }
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    print()
+    for mode in MODES:
+        r = results[mode]
+        print(f"[INFO] {mode:>8}: {r['comments']} comments, {r['seconds_per_post']}s/post, {r['comments_per_second']} comments/s")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'capture_modes.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'posts': args.posts, 'comments_per_post': args.comments, 'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Report chart rendering time by output settings and chart workers.
+
+Renders a bar chart and a word cloud for each of N synthetic brands, serially and on a
+ChartPool, at several DPI/format settings, then renders everything again to time the
+unchanged-input skip.
+
+Usage:
+    python -m benchmarks.bench_charts --brands 50 --workers 1 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import pathlib
+import random
+import shutil
+import tempfile
+import time
+
+from social_sentiment_analyzer.visualizer import create_sentiment_bar_chart, create_word_cloud, ChartPool
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+SAMPLE_TEXTS = [
+    "Love this app, super easy to use!",
+    "Why is the app so slow now?",
+    "Worst update ever, bring back the old version",
+    "This is so helpful for my small business",
+    "Not working on my phone",
+    "Thank you so much, the new features are great",
+    "Is there an English version?",
+    "Amazing features, great job team",
+]
+SETTINGS = [(300, 'png'), (100, 'png'), (100, 'svg')]
+
+def render_all(brands, out_dir: pathlib.Path, workers: int, dpi: int, fmt: str) -> float:
+    start = time.perf_counter()
+    charts = ChartPool(workers)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, counts, comments in brands:
+            charts.submit(create_sentiment_bar_chart, counts, str(out_dir / f"{name}_barchart.{fmt}"), dpi, fmt)
+            charts.submit(create_word_cloud, comments, str(out_dir / f"{name}_wordcloud.{fmt}"), dpi, fmt)
+        charts.close()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--brands', type=int, default=50)
+    parser.add_argument('--comments', type=int, default=2000, help="comments per brand")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    brands = [
+        (f"brand{b:03d}",
+         {'positive': rng.randint(0, 500), 'neutral': rng.randint(0, 500), 'negative': rng.randint(0, 500)},
+         [rng.choice(SAMPLE_TEXTS) for _ in range(args.comments)])
+        for b in range(args.brands)
+    ]
+
+    results = []
+    for dpi, fmt in SETTINGS:
+        for workers in args.workers:
+            out_dir = pathlib.Path(tempfile.mkdtemp(prefix='bench_charts_'))
+            try:
+                first = render_all(brands, out_dir, workers, dpi, fmt)
+                unchanged = render_all(brands, out_dir, workers, dpi, fmt)
+            finally:
+                shutil.rmtree(out_dir, ignore_errors=True)
+            results.append({'dpi': dpi, 'format': fmt, 'workers': workers,
+                            'seconds': round(first, 3), 'unchanged_rerun_seconds': round(unchanged, 3)})
+            print(f"[INFO] {fmt} @ {dpi} dpi, {workers} worker(s): {first:.2f}s for {args.brands} brands, "
+                  f"{unchanged:.2f}s when nothing changed")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'charts.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'brands': args.brands, 'comments_per_brand': args.comments, 'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Memory per comment of the scraper's comment representations at 100k comments.
+
+Builds the same N synthetic comments (author, text, timestamp, like count, drawer
+position) three ways and measures the memory each holds with tracemalloc:
+
+    text_set      the original set of comment texts (loses authors, order and duplicates)
+    dict_records  a list of dicts, like the network capture records
+    records       a CommentCollection of CommentRecords (__slots__, deduplicated by key)
+
+Usage:
+    python -m benchmarks.bench_comment_records --comments 100000
+"""
+
+import argparse
+import gc
+import json
+import pathlib
+import random
+import time
+import tracemalloc
+
+from scrapers.comment_record import CommentCollection, CommentRecord
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+SAMPLE_TEXTS = [
+    "Aplikasinya sangat membantu usaha saya 🙏",
+    "Love this app, super easy to use!",
+    "Kenapa tidak bisa login dari kemarin?",
+    "Mantap min 👍",
+    "Fiturnya lengkap banget, recommended",
+    "🔥🔥🔥",
+    "Is there an English version?",
+    "Semoga makin sukses BukuWarung",
+]
+
+
+def raw_comments(count: int):
+    """Yields (author, text, created_at, like_count, position); texts and authors are built fresh like scraped strings."""
+    rng = random.Random(0)
+    for i in range(count):
+        yield (f"user_{rng.randint(0, count // 4)}", f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} #{i}",
+               f"2024-05-{1 + i % 28:02d}T10:00:00.000Z", rng.choice([None, 0, 1, 3, 12]), i)
+
+
+def build_text_set(count: int):
+    return {text for _, text, _, _, _ in raw_comments(count)}
+
+
+def build_dict_records(count: int):
+    return [{'id': None, 'author': author, 'text': text, 'created_at': created_at, 'like_count': likes, 'position': position}
+            for author, text, created_at, likes, position in raw_comments(count)]
+
+
+def build_records(count: int):
+    comments = CommentCollection()
+    for author, text, created_at, likes, position in raw_comments(count):
+        comments.add(CommentRecord(text, author=author, created_at=created_at, like_count=likes, position=position))
+    return comments
+
+
+def measure(build, count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    built = build(count)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=100_000)
+    args = parser.parse_args()
+
+    results = []
+    for name, build in (('text_set', build_text_set), ('dict_records', build_dict_records), ('records', build_records)):
+        built, size, elapsed = measure(build, args.comments)
+        results.append({'representation': name, 'comments': len(built), 'bytes': size,
+                        'bytes_per_comment': round(size / len(built), 1), 'build_seconds': round(elapsed, 3)})
+        print(f"[INFO] {name}: {len(built)} comments, {size / 1e6:.1f} MB ({size / len(built):.0f} bytes/comment), "
+              f"built in {elapsed:.2f}s")
+        del built
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'comment_records.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'comments': args.comments, 'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
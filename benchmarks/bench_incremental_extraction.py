@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Per-cycle extraction cost: bulk vs incremental.
+
+Loads the static comments drawer fixture in headless Chrome, appends a page of comments
+per cycle (as the real drawer does on scroll) and times one extraction call per cycle.
+The bulk extractor re-reads the whole drawer every cycle, so its cost grows with the
+total; the incremental extractor only reads new nodes, so its curve stays flat.
+
+Usage:
+    python -m benchmarks.bench_incremental_extraction --cycles 40 --batch 100
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pathlib
+import time
+
+os.environ.setdefault('HEADLESS', '1')
+
+from main import setup_driver
+from scrapers.instagram_scraper import extract_comments_bulk, extract_comments_incremental, extract_comments_per_element
+
+FIXTURE = pathlib.Path(__file__).parent / 'fixtures' / 'comments_drawer.html'
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+SELECTOR = 'div.x1lliihq'
+
+EXTRACTORS = {
+    'element': extract_comments_per_element,
+    'bulk': extract_comments_bulk,
+    'incremental': extract_comments_incremental,
+}
+
+def run_mode(driver, mode: str, cycles: int, batch: int):
+    """Runs one extractor over a freshly loaded fixture and returns per-cycle timings."""
+    extract = EXTRACTORS[mode]
+    driver.get(FIXTURE.resolve().as_uri())
+    rows = []
+    for cycle in range(1, cycles + 1):
+        total = driver.execute_script("return appendComments(arguments[0]);", batch)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            found, _ = extract(driver, SELECTOR)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rows.append({'cycle': cycle, 'total_nodes': total, 'returned': len(found), 'ms': round(elapsed_ms, 2)})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cycles', type=int, default=40)
+    parser.add_argument('--batch', type=int, default=100, help='comments appended per cycle')
+    parser.add_argument('--include-element', action='store_true', help='also time the legacy per-element path (slow)')
+    args = parser.parse_args()
+
+    modes = ['bulk', 'incremental']
+    if args.include_element:
+        modes.insert(0, 'element')
+
+    driver = setup_driver()
+    if not driver:
+        return
+    try:
+        results = {mode: run_mode(driver, mode, args.cycles, args.batch) for mode in modes}
+    finally:
+        driver.quit()
+
+    print(f"\n{'cycle':>5} {'nodes':>7} " + " ".join(f"{mode + ' ms':>15}" for mode in modes))
+    for i in range(args.cycles):
+        row = results[modes[0]][i]
+        print(f"{row['cycle']:>5} {row['total_nodes']:>7} " + " ".join(f"{results[m][i]['ms']:>15.2f}" for m in modes))
+
+    summary = {}
+    for mode in modes:
+        first = results[mode][0]['ms'] or 0.01
+        last = results[mode][-1]['ms']
+        summary[mode] = {'first_cycle_ms': first, 'last_cycle_ms': last, 'growth': round(last / first, 2)}
+        print(f"[INFO] {mode}: first cycle {first:.2f} ms, last cycle {last:.2f} ms ({summary[mode]['growth']}x)")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'incremental_extraction.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'cycles': args.cycles, 'batch': args.batch, 'summary': summary, 'per_cycle': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
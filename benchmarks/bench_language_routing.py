@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Translation calls avoided by the local language pre-classifier.
+
+Routes every comment of a labelled fixture (mixed Indonesian / English, like the
+Bukuwarung tab) through classify_route and reports how many comments would still be sent
+to translation, how many are routed straight to VADER, and how often the route disagrees
+with the fixture's language label.
+
+Usage:
+    python -m benchmarks.bench_language_routing [--fixture path.json]
+"""
+
+import argparse
+import json
+import pathlib
+import time
+from collections import Counter
+
+from social_sentiment_analyzer.language import classify_route, english_vocabulary, ROUTE_NO_TEXT, ROUTE_ENGLISH, ROUTE_TRANSLATE
+
+FIXTURE = pathlib.Path(__file__).parent / 'fixtures' / 'bukuwarung_comments.json'
+EXPECTED_ROUTE = {'en': ROUTE_ENGLISH, 'id': ROUTE_TRANSLATE, 'none': ROUTE_NO_TEXT}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixture', default=str(FIXTURE), help='JSON list of {"text": ..., "lang": "en" | "id" | "none"}')
+    args = parser.parse_args()
+
+    with open(args.fixture, encoding='utf-8') as f:
+        comments = json.load(f)
+
+    english_vocabulary()  # Load the lexicon outside the timed section.
+    start = time.perf_counter()
+    routes = [classify_route(c['text']) for c in comments]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    counts = Counter(routes)
+    mismatches = [(c['text'], c['lang'], r) for c, r in zip(comments, routes) if EXPECTED_ROUTE.get(c['lang']) != r]
+    avoided = len(comments) - counts[ROUTE_TRANSLATE]
+
+    print(f"[INFO] {len(comments)} comments classified in {elapsed_ms:.1f} ms")
+    print(f"[INFO] Routes: {counts[ROUTE_ENGLISH]} English, {counts[ROUTE_NO_TEXT]} without text, {counts[ROUTE_TRANSLATE]} to translate")
+    print(f"[INFO] Translation calls avoided: {avoided}/{len(comments)} ({avoided / len(comments) * 100:.1f}%)")
+    print(f"[INFO] Routes disagreeing with the fixture labels: {len(mismatches)}")
+    for text, lang, route in mismatches:
+        print(f"    [{lang} -> {route}] {text}")
+
+if __name__ == "__main__":
+    main()
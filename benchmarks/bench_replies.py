@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Reply-thread expansion throughput by batch size.
+
+Serves a mock post where every Nth comment has a reply thread behind a "View replies"
+control, scrapes it with expand_replies on at each REPLY_EXPAND_BATCH size and reports
+the threads opened, replies collected, time spent in the reply stage, replies per
+minute and whether every reply was linked to its own parent: the mock's replies start
+with "@<parent's author>", and each reply's parent_key must lead to that comment. The
+records are also written and read back through utils.storage to check the saved file
+keeps every reply in its thread. A batch size of 1 opens one thread at a time, like the
+old click-by-click loop without its sleeps.
+
+Usage:
+    python -m benchmarks.bench_replies --comments 200 --replies-every 4 --batches 1 10 25
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import tempfile
+from unittest import mock
+
+os.environ.setdefault('HEADLESS', '1')
+
+from scrapers import instagram_scraper
+from scrapers.driver_factory import create_driver
+from scrapers.instagram_scraper import get_comments_from_post
+from utils.storage import comment_threads, write_comments, read_comment_rows, reply_threads
+from benchmarks.mock_server import serve_in_background
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=200, help='top-level comments on the mock post')
+    parser.add_argument('--replies-every', type=int, default=4, help='every Nth comment has a reply thread')
+    parser.add_argument('--replies-per-thread', type=int, default=3)
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 10, 25], help='REPLY_EXPAND_BATCH values to run')
+    args = parser.parse_args()
+
+    server, base_url = serve_in_background(comments_per_post=args.comments, replies_every=args.replies_every,
+                                           replies_per_thread=args.replies_per_thread)
+    driver = create_driver(capture_mode='dom')
+    if driver is None:
+        server.shutdown()
+        raise RuntimeError("Could not launch Chrome.")
+
+    results = []
+    try:
+        for batch in args.batches:
+            stats, records = {}, []
+            with mock.patch.object(instagram_scraper, 'REPLY_EXPAND_BATCH', batch):
+                get_comments_from_post(f"{base_url}/p/replies{batch}/", driver=driver, capture_mode='dom',
+                                       expand_replies=True, stats=stats, records=records)
+            parents = {record.key: record for record in records if record.parent_key is None}
+            replies = [record for record in records if record.parent_key is not None]
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'comments.json')
+                write_comments(path, [record.text for record in records], comment_threads(records))
+                saved_threads = reply_threads(read_comment_rows(path))
+            result = {
+                'batch': batch, 'reply_threads': stats.get('reply_threads', 0), 'replies': stats.get('replies', 0),
+                'reply_seconds': stats.get('reply_seconds'), 'replies_per_minute': stats.get('replies_per_minute'),
+                'linked': bool(replies) and all(
+                    record.parent_key in parents and record.text.split()[0] == f"@{parents[record.parent_key].author}"
+                    for record in replies
+                ),
+                'saved': sum(len(thread['replies']) for thread in saved_threads) == len(replies),
+            }
+            results.append(result)
+            print(f"[INFO] batch {batch}: {result['replies']} replies from {result['reply_threads']} threads in "
+                  f"{result['reply_seconds']}s ({result['replies_per_minute']} replies/min), "
+                  f"all linked to their parent: {result['linked']}, saved with threads: {result['saved']}")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'replies.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'comments': args.comments, 'replies_every': args.replies_every,
+                   'replies_per_thread': args.replies_per_thread, 'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
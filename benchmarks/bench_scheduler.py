@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Sheet-order processing vs PostScheduler on fake brand tabs, with a simulated clock.
+
+Builds a spreadsheet (benchmarks/fake_sheets.py) with one large tab whose rows are
+mostly already "Success", a few small campaigns and one urgent launch with Priority 1,
+and replays a single-worker run where each post takes a time derived from its comment
+count. No browser is started; only the order and the budgets are being measured:
+
+    sheet_order  tabs in sheet order, rows in row order, completed rows scraped again
+    scheduler    PostScheduler (completed rows skipped, SCHEDULE_ORDER, no budget)
+    budgeted     PostScheduler with --budget seconds per brand
+
+Reports simulated seconds, posts scraped, completed posts re-scraped, posts deferred
+and when each brand finished (the urgent launch's finish time is the headline number).
+Scraped posts are marked "Success" on the fake sheet, as main does.
+
+The scheduler's guarantees are asserted on the plans it builds: brands and posts in
+priority order, completed rows skipped, --force / --force-brand / --force-post
+re-scraping them, and posts cut off by the budget left unmarked for the next run.
+
+Usage:
+    python -m benchmarks.bench_scheduler --large-posts 300 --budget 600
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import pathlib
+import random
+
+from config import (URL_COLUMN, STATUS_COLUMN, COMMENT_COUNT_COLUMN, COMMENTS_LINK_COLUMN, PRIORITY_COLUMN,
+                    POSTED_AT_COLUMN, SCHEDULE_ORDER)
+from utils.scheduler import PostScheduler, COMPLETED_STATUS
+from benchmarks.fake_sheets import FakeSpreadsheet
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+HEADER = [URL_COLUMN, STATUS_COLUMN, COMMENT_COUNT_COLUMN, COMMENTS_LINK_COLUMN, PRIORITY_COLUMN, POSTED_AT_COLUMN]
+URGENT_BRAND = 'UrgentLaunch'
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def post_seconds(comments) -> float:
+    """Simulated time to scrape a post: page load plus scrolling for its comments."""
+    return 8 + (int(comments) if comments not in (None, '') else 150) * 0.04
+
+
+def make_tabs(large_posts: int, small_brands: int, seed: int = 0):
+    rng = random.Random(seed)
+
+    def row(brand, i, done, comments, priority=''):
+        return [f"https://www.instagram.com/p/{brand}{i}/", COMPLETED_STATUS if done else '',
+                comments if done else '', '', priority, f"2024-05-{1 + i % 28:02d}"]
+
+    tabs = {'BigBrand': [HEADER] + [row('big', i, rng.random() < 0.7, rng.randint(200, 3000)) for i in range(large_posts)]}
+    for b in range(small_brands):
+        tabs[f"Campaign{b + 1}"] = [HEADER] + [row(f"c{b}_", i, False, '') for i in range(rng.randint(3, 8))]
+    tabs[URGENT_BRAND] = [HEADER] + [row('urgent', i, False, '', priority=1) for i in range(4)]
+    return tabs
+
+
+def simulate(plans, clock: SimulatedClock, expected: dict, sheets: dict) -> dict:
+    """Single worker: posts of each plan in order, stopping a brand when it is over budget.
+
+    Each scraped post's row is marked "Success" in sheets (tab name -> worksheet).
+    """
+    scraped = rescraped = deferred = 0
+    finished = {}
+    status_col = HEADER.index(STATUS_COLUMN) + 1
+    for plan in plans:
+        plan.start()
+        for task in plan.tasks:
+            if plan.over_budget():
+                deferred += 1
+                continue
+            clock.now += post_seconds(expected[task.url])
+            sheets[plan.brand].update_cell(task.row_index, status_col, COMPLETED_STATUS)
+            scraped += 1
+            rescraped += task.completed
+        finished[plan.brand] = round(clock.now, 1)
+    return {'seconds': round(clock.now, 1), 'posts_scraped': scraped, 'completed_rescraped': rescraped,
+            'posts_deferred': deferred, 'urgent_finished_at': finished.get(URGENT_BRAND), 'brand_finished_at': finished}
+
+
+def check_plans(plans, tabs: dict):
+    """Asserts the order and skipping guarantees of a default PostScheduler plan."""
+    scheduler = PostScheduler(order=SCHEDULE_ORDER)
+    assert plans[0].brand == URGENT_BRAND, "the Priority 1 launch must be scheduled first"
+    for plan in plans:
+        assert plan.tasks == sorted(plan.tasks, key=scheduler.sort_key), f"'{plan.brand}' posts out of priority order"
+        completed = {row[0] for row in tabs[plan.brand][1:] if row[1] == COMPLETED_STATUS}
+        assert not any(task.completed for task in plan.tasks), f"'{plan.brand}' schedules completed rows"
+        assert {task.url for task in plan.skipped} == completed, f"'{plan.brand}' does not skip its completed rows"
+
+
+def check_forced(tabs: dict):
+    """Asserts that force, force_brands and force_posts schedule completed rows again."""
+    def planned(**force):
+        plans = PostScheduler(brand_budget=0, brand_budgets={}).plan(FakeSpreadsheet(tabs).worksheets(), **force)
+        return {task.url for plan in plans for task in plan.tasks}
+
+    everything = {row[0] for rows in tabs.values() for row in rows[1:]}
+    big_rows = {row[0] for row in tabs['BigBrand'][1:]}
+    completed = sorted(row[0] for row in tabs['BigBrand'][1:] if row[1] == COMPLETED_STATUS)
+    pending = {row[0] for rows in tabs.values() for row in rows[1:] if row[1] != COMPLETED_STATUS}
+    assert planned() == pending
+    assert planned(force=True) == everything, "--force must re-scrape completed rows"
+    assert planned(force_brands=['BigBrand']) == pending | big_rows, "--force-brand must re-scrape the tab's completed rows"
+    assert planned(force_posts=completed[:1]) == pending | set(completed[:1]), "--force-post must re-scrape only that post"
+
+
+class SheetOrderPlan:
+    """The original behaviour: every row of the tab, in row order, without a budget."""
+
+    def __init__(self, brand, tasks):
+        self.brand, self.tasks = brand, tasks
+
+    def start(self):
+        pass
+
+    def over_budget(self) -> bool:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--large-posts', type=int, default=300, help='rows in the large tab (about 70%% already Success)')
+    parser.add_argument('--small-brands', type=int, default=5, help='small campaign tabs after the large one')
+    parser.add_argument('--budget', type=float, default=600, help='seconds per brand for the budgeted run')
+    args = parser.parse_args()
+
+    tabs = make_tabs(args.large_posts, args.small_brands)
+    # Simulated cost uses the real comment count, also for rows whose count is not in the sheet yet.
+    expected = {row[0]: row[2] or 150 for rows in tabs.values() for row in rows[1:]}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        check_forced(tabs)
+
+    results = {}
+    for name in ('sheet_order', 'scheduler', 'budgeted'):
+        spreadsheet = FakeSpreadsheet(tabs)
+        clock = SimulatedClock()
+        scheduler = PostScheduler(clock=clock, brand_budget=args.budget if name == 'budgeted' else 0, brand_budgets={})
+        sheets = spreadsheet.worksheets()
+        if name == 'sheet_order':
+            plans = [SheetOrderPlan(sheet.title, scheduler.read_tasks(sheet)) for sheet in sheets]
+        else:
+            plans = scheduler.plan(sheets)
+            check_plans(plans, tabs)
+        read_calls = spreadsheet.api_calls
+        result = simulate(plans, clock, expected, {sheet.title: sheet for sheet in sheets})
+        result['sheet_api_calls'] = read_calls
+        results[name] = result
+
+        if name != 'sheet_order':
+            # Whatever the budget cut off is still unmarked, so the next run schedules exactly that.
+            with contextlib.redirect_stdout(io.StringIO()):
+                rerun = PostScheduler(brand_budget=0, brand_budgets={}).plan(spreadsheet.worksheets())
+            left = sum(len(plan.tasks) for plan in rerun)
+            assert left == result['posts_deferred'], f"{name}: {left} posts left for the next run, expected {result['posts_deferred']}"
+            assert result['completed_rescraped'] == 0
+            if name == 'budgeted':
+                assert result['posts_deferred'] > 0, "--budget is too large to cut any brand off"
+        print(f"[INFO] {name}: {result['posts_scraped']} posts in {result['seconds']:.0f}s simulated "
+              f"({result['completed_rescraped']} completed re-scraped, {result['posts_deferred']} deferred), "
+              f"{URGENT_BRAND} done at {result['urgent_finished_at']:.0f}s")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'scheduler.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'large_posts': args.large_posts, 'small_brands': args.small_brands, 'budget': args.budget,
+                   'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+    print("[INFO] All checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Wall-clock comparison of the serial scrape path (one driver) against the ScrapePool.
+
+Serves N mock posts from benchmarks.mock_server, scrapes them once with a single worker
+and once with --workers drivers, and reports the elapsed time and speed-up.
+
+Usage:
+    python -m benchmarks.bench_scrape_pool --posts 8 --workers 4 --delay 0 2
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import time
+
+os.environ.setdefault('HEADLESS', '1')
+
+from main import setup_driver
+from scrapers.scrape_pool import ScrapePool, ScrapeJob
+from benchmarks.mock_server import serve_in_background
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+
+def run(jobs, workers: int, delay_range):
+    """Scrapes every job with a fresh pool of `workers` drivers. Returns (elapsed seconds, comment count)."""
+    pool = ScrapePool(setup_driver, workers=workers, delay_range=delay_range)
+    try:
+        if not pool.start():
+            raise RuntimeError("Could not launch any Chrome driver.")
+        start = time.monotonic()
+        total_comments = sum(len(result.comments) for result in pool.scrape(jobs))
+        return time.monotonic() - start, total_comments
+    finally:
+        pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--comments', type=int, default=100, help='comments per mock post')
+    parser.add_argument('--delay', type=float, nargs=2, default=(0, 2), metavar=('MIN', 'MAX'),
+                        help='per-worker pause between posts, in seconds')
+    args = parser.parse_args()
+
+    server, base_url = serve_in_background(comments_per_post=args.comments)
+    jobs = [ScrapeJob(i + 2, f"{base_url}/p/post{i}/") for i in range(args.posts)]
+
+    try:
+        serial_time, serial_comments = run(jobs, 1, tuple(args.delay))
+        pool_time, pool_comments = run(jobs, args.workers, tuple(args.delay))
+    finally:
+        server.shutdown()
+
+    speedup = serial_time / pool_time if pool_time else 0
+    print(f"\n[INFO] Serial (1 driver):   {serial_time:.1f}s, {serial_comments} comments")
+    print(f"[INFO] Pool ({args.workers} drivers):  {pool_time:.1f}s, {pool_comments} comments")
+    print(f"[INFO] Speed-up: {speedup:.2f}x")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'scrape_pool.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'posts': args.posts, 'workers': args.workers, 'comments_per_post': args.comments,
+            'serial_seconds': round(serial_time, 2), 'pool_seconds': round(pool_time, 2),
+            'serial_comments': serial_comments, 'pool_comments': pool_comments, 'speedup': round(speedup, 2),
+        }, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
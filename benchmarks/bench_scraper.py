@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Scraper benchmark on recorded posts replayed offline by benchmarks.replay_server.
+
+Scrapes every recording with get_comments_from_post (DOM capture) once per extraction
+mode and reports, per post: comments found (against the comments recorded), total
+time, comments per second, WebDriver calls per comment (every command the driver sends,
+counted by wrapping driver.execute) and the time spent in navigation, scroll cycles and
+extraction from the run's instrumentation spans. Every mode must return the same
+comments for a post (the bulk and incremental scripts apply the per-element path's
+filtering); the run fails if they differ.
+
+Results go to benchmarks/results/scraper_<label>.json. Pass --baseline with an earlier
+results file to print the change against it.
+
+Usage:
+    python -m benchmarks.bench_scraper --label before
+    python -m benchmarks.bench_scraper --label after --baseline benchmarks/results/scraper_before.json
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import time
+from collections import Counter
+from typing import List, Tuple
+
+os.environ.setdefault('HEADLESS', '1')
+
+from scrapers.driver_factory import create_driver
+from scrapers.instagram_scraper import get_comments_from_post
+from utils.instrumentation import get_instrumentation
+from benchmarks.replay_server import load_recordings, serve_in_background
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+MODES = ['bulk', 'incremental', 'element']
+COMPARED = ['comments', 'seconds', 'comments_per_second', 'calls_per_comment']
+
+
+class WebDriverCallCounter:
+    """Counts the WebDriver commands a driver sends, by command name."""
+
+    def __init__(self, driver):
+        self.calls = Counter()
+        execute = driver.execute
+
+        def counted(command, params=None):
+            self.calls[command] += 1
+            return execute(command, params)
+
+        driver.execute = counted
+
+    def reset(self) -> Counter:
+        calls, self.calls = self.calls, Counter()
+        return calls
+
+
+def run_post(driver, counter: WebDriverCallCounter, url: str, mode: str, expected: int) -> Tuple[dict, List[str]]:
+    """Scrapes one post in one extraction mode. Returns its measurements and the comments found."""
+    instrumentation = get_instrumentation()
+    instrumentation.reset()
+    counter.reset()
+    stats = {}
+    start = time.monotonic()
+    comments = get_comments_from_post(url, driver=driver, extraction_mode=mode, capture_mode='dom', stats=stats)
+    elapsed = time.monotonic() - start
+    calls = counter.reset()
+    spans = instrumentation.summary()
+    total_calls = sum(calls.values())
+    return {
+        'comments': len(comments),
+        'recorded_comments': expected,
+        'seconds': round(elapsed, 2),
+        'comments_per_second': round(len(comments) / elapsed, 2) if elapsed else 0,
+        'webdriver_calls': total_calls,
+        'calls_per_comment': round(total_calls / len(comments), 2) if comments else None,
+        'top_commands': dict(calls.most_common(5)),
+        'wait_seconds': stats.get('wait_seconds'),
+        'work_seconds': stats.get('work_seconds'),
+        'spans': {name: spans[name]['total_seconds'] for name in ('navigation', 'scroll_cycle', 'extract') if name in spans},
+    }, comments
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    print(f"\n[INFO] Change against {baseline_path}:")
+    for key, result in results.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        changes = []
+        for metric in COMPARED:
+            old, new = before.get(metric), result.get(metric)
+            if old and new is not None:
+                changes.append(f"{metric} {old} -> {new} ({(new - old) / old * 100:+.0f}%)")
+        print(f"[INFO]   {key}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recordings', nargs='+', help='recording names (default: all)')
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES, help='extraction modes to run')
+    parser.add_argument('--page-size', type=int, default=20, help='comments per lazy-loaded page')
+    parser.add_argument('--button-every', type=int, default=3, help='every Nth page waits behind "View more comments" (0: never)')
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds before each page is served')
+    parser.add_argument('--label', default='latest', help='results are written to results/scraper_<label>.json')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    recordings = load_recordings()
+    if args.recordings:
+        recordings = {name: recordings[name] for name in args.recordings}
+    server, base_url = serve_in_background(recordings=recordings, page_size=args.page_size,
+                                           button_every=args.button_every, latency=args.latency)
+    driver = create_driver(capture_mode='dom')
+    if driver is None:
+        server.shutdown()
+        raise RuntimeError("Could not launch Chrome.")
+    counter = WebDriverCallCounter(driver)
+
+    results = {}
+    found = {}
+    try:
+        for mode in args.modes:
+            for name, recording in recordings.items():
+                result, found[name, mode] = run_post(driver, counter, f"{base_url}/p/{name}/", mode,
+                                                     len(recording['comments_html']))
+                results[f"{name}/{mode}"] = result
+                print(f"[INFO] {name} ({mode}): {result['comments']}/{result['recorded_comments']} comments in "
+                      f"{result['seconds']}s, {result['comments_per_second']} comments/s, "
+                      f"{result['calls_per_comment']} WebDriver calls per comment")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    for name in recordings:
+        reference = found[name, args.modes[0]]
+        for mode in args.modes[1:]:
+            assert found[name, mode] == reference, \
+                f"{name}: '{mode}' extraction returned different comments than '{args.modes[0]}'"
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / f"scraper_{args.label}.json"
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'label': args.label, 'page_size': args.page_size, 'button_every': args.button_every,
+            'latency': args.latency, 'results': results,
+        }, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+VADER scoring throughput at 1, 2, 4 and 8 worker processes.
+
+Scores the same synthetic comments with score_texts_bulk serially and through process
+pools of increasing size, checks that every run matches the serial result exactly and
+reports comments per second. Pool start-up (lexicon loading in each worker) is timed
+separately from scoring.
+
+Usage:
+    python -m benchmarks.bench_sentiment_workers --comments 200000
+"""
+
+import argparse
+import json
+import pathlib
+import time
+
+from social_sentiment_analyzer.analyzer import score_texts_bulk, score_chunk, create_scoring_pool, get_vader_analyzer
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+SAMPLE_TEXTS = [
+    "Love this app, super easy to use!",
+    "Why is the app so slow now?",
+    "Worst update ever, bring back the old version",
+    "This is so helpful for my small business",
+    "Not working on my phone",
+    "Thank you so much! 🙏",
+    "Is there an English version?",
+    "Amazing features, great job team",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    texts = [f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} #{i}" for i in range(args.comments)]
+    get_vader_analyzer()
+    baseline = None
+    results = []
+    for workers in args.workers:
+        start = time.perf_counter()
+        pool = create_scoring_pool(workers)
+        if pool is not None:
+            list(pool.map(score_chunk, [[]] * workers))  # Wait until every worker has started.
+        startup = time.perf_counter() - start
+        try:
+            start = time.perf_counter()
+            scores = score_texts_bulk(texts, executor=pool)
+            elapsed = time.perf_counter() - start
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if baseline is None:
+            baseline = scores
+        identical = scores.equals(baseline)
+        rate = args.comments / elapsed
+        results.append({'workers': workers, 'startup_seconds': round(startup, 3), 'seconds': round(elapsed, 3),
+                        'comments_per_second': round(rate), 'identical_to_serial': identical})
+        print(f"[INFO] {workers} worker(s): {rate:,.0f} comments/s ({elapsed:.2f}s scoring, {startup:.2f}s start-up), "
+              f"identical to serial: {identical}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'sentiment_workers.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'comments': args.comments, 'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
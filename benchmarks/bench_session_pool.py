@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cost of launching a browser per post against reusing warm sessions from a SessionPool.
+
+Serves N mock posts from benchmarks.mock_server and scrapes them twice: once launching
+and quitting a new Chrome for every post (the old no-driver path), and once with
+sessions from a SessionPool warmed before the clock starts. Reports the wall-clock
+time, per-driver startup time and how many times sessions were reused.
+
+Usage:
+    python -m benchmarks.bench_session_pool --posts 8
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import time
+
+os.environ.setdefault('HEADLESS', '1')
+
+from scrapers.driver_factory import SessionPool, create_driver
+from scrapers.instagram_scraper import get_comments_from_post
+from benchmarks.mock_server import serve_in_background
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+
+def run_fresh(urls):
+    """A new driver per post. Returns (elapsed seconds, startup seconds per driver)."""
+    startups = []
+    start = time.monotonic()
+    for url in urls:
+        launch = time.monotonic()
+        driver = create_driver()
+        if driver is None:
+            raise RuntimeError("Could not launch Chrome.")
+        startups.append(time.monotonic() - launch)
+        try:
+            get_comments_from_post(url, driver=driver)
+        finally:
+            driver.quit()
+    return time.monotonic() - start, startups
+
+def run_pooled(urls):
+    """Warm sessions from a SessionPool. Returns (elapsed seconds, pool stats)."""
+    sessions = SessionPool(create_driver, size=1)
+    try:
+        if not sessions.warm():
+            raise RuntimeError("Could not launch Chrome.")
+        start = time.monotonic()
+        for url in urls:
+            driver = sessions.acquire()
+            try:
+                get_comments_from_post(url, driver=driver)
+            finally:
+                sessions.release(driver)
+        return time.monotonic() - start, sessions.stats()
+    finally:
+        sessions.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=8)
+    parser.add_argument('--comments', type=int, default=60, help='comments per mock post')
+    args = parser.parse_args()
+
+    server, base_url = serve_in_background(comments_per_post=args.comments)
+    urls = [f"{base_url}/p/post{i}/" for i in range(args.posts)]
+    try:
+        fresh_time, fresh_startups = run_fresh(urls)
+        pooled_time, pooled_stats = run_pooled(urls)
+    finally:
+        server.shutdown()
+
+    avg_startup = sum(fresh_startups) / len(fresh_startups) if fresh_startups else 0
+    print(f"\n[INFO] New driver per post: {fresh_time:.1f}s ({avg_startup:.2f}s startup per driver)")
+    print(f"[INFO] Session pool:        {pooled_time:.1f}s ({pooled_stats['sessions_started']} session(s) started, "
+          f"{pooled_stats['reuses']} reuses)")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'session_pool.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'posts': args.posts, 'comments_per_post': args.comments,
+            'fresh_seconds': round(fresh_time, 2), 'fresh_startup_seconds': [round(s, 2) for s in fresh_startups],
+            'pooled_seconds': round(pooled_time, 2), 'pooled_sessions': pooled_stats,
+        }, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
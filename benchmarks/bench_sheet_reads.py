@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Sheets API calls at startup: one get_all_records per tab vs a single SheetSnapshot.
+
+Builds an in-memory spreadsheet (benchmarks/fake_sheets.py) with --tabs brand tabs and
+counts the API calls to read every tab and write a status update for every row:
+
+    per_tab    worksheets(), get_all_records() per tab, and a header read
+               (row_values) per SheetWriteBuffer
+    snapshot   worksheets() and one values_batch_get for all tabs, with headers from
+               the snapshot and writes diffed against it
+
+Half of each tab's rows are written with the status and comment count they already
+have, so the snapshot run shows the cells its diff leaves out (cells_written). The
+records read both ways are compared too.
+
+Usage:
+    python -m benchmarks.bench_sheet_reads --tabs 40 --rows 50
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import pathlib
+
+from config import URL_COLUMN, STATUS_COLUMN, COMMENT_COUNT_COLUMN, COMMENTS_LINK_COLUMN
+from utils.sheet_handler import get_all_posts, update_status_for_post, SheetSnapshot, SheetWriteBuffer
+from benchmarks.fake_sheets import FakeSpreadsheet
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+
+
+def make_spreadsheet(tabs: int, rows: int) -> FakeSpreadsheet:
+    header = [URL_COLUMN, STATUS_COLUMN, COMMENT_COUNT_COLUMN, COMMENTS_LINK_COLUMN]
+    return FakeSpreadsheet({
+        f"Brand {t + 1}": [header] + [
+            [f"https://www.instagram.com/p/b{t}p{i}/", 'Success' if i % 2 else '', 10 if i % 2 else '',
+             f"comments_{t}_{i}.json" if i % 2 else '']
+            for i in range(rows)
+        ]
+        for t in range(tabs)
+    })
+
+
+def run(spreadsheet: FakeSpreadsheet, use_snapshot: bool):
+    """Reads every tab, then marks every row Success with 10 comments. Returns (records, startup calls, write calls)."""
+    snapshot = SheetSnapshot.load(spreadsheet) if use_snapshot else None
+    sheets = snapshot.worksheets if snapshot else spreadsheet.worksheets()
+    records = {sheet.title: get_all_posts(sheet, snapshot) for sheet in sheets}
+    startup = dict(spreadsheet.calls)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for sheet in sheets:
+            with SheetWriteBuffer(sheet, snapshot=snapshot) as writes:
+                for i in range(len(records[sheet.title])):
+                    update_status_for_post(sheet, i + 2, "Success", 10, f"comments_{sheet.title}_{i}.json", buffer=writes)
+    writes = {method: count - startup.get(method, 0) for method, count in spreadsheet.calls.items()
+              if count - startup.get(method, 0)}
+    return records, startup, writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tabs', type=int, default=40)
+    parser.add_argument('--rows', type=int, default=50, help='post rows per tab')
+    args = parser.parse_args()
+
+    per_tab = make_spreadsheet(args.tabs, args.rows)
+    per_tab_records, per_tab_startup, per_tab_writes = run(per_tab, use_snapshot=False)
+    snapshot = make_spreadsheet(args.tabs, args.rows)
+    snapshot_records, snapshot_startup, snapshot_writes = run(snapshot, use_snapshot=True)
+
+    same_records = per_tab_records == snapshot_records
+    # The snapshot path writes back the strings it read, so compare cell values as text.
+    same_sheet = all(
+        [[str(value) for value in row] for row in a.rows] == [[str(value) for value in row] for row in b.rows]
+        for a, b in zip(per_tab._worksheets, snapshot._worksheets)
+    )
+    results = {
+        'per_tab': {'startup_calls': sum(per_tab_startup.values()), 'startup': per_tab_startup,
+                    'write_calls': sum(per_tab_writes.values()), 'writes': per_tab_writes,
+                    'cells_written': per_tab.cells_written},
+        'snapshot': {'startup_calls': sum(snapshot_startup.values()), 'startup': snapshot_startup,
+                     'write_calls': sum(snapshot_writes.values()), 'writes': snapshot_writes,
+                     'cells_written': snapshot.cells_written},
+        'same_records': same_records,
+        'same_sheet_after_writes': same_sheet,
+    }
+    for name in ('per_tab', 'snapshot'):
+        result = results[name]
+        print(f"[INFO] {name}: {result['startup_calls']} API calls at startup ({result['startup']}), "
+              f"{result['write_calls']} for writes ({result['writes']}), {result['cells_written']} cells written")
+    print(f"[INFO] Same records: {same_records}, same sheet contents after writes: {same_sheet}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'sheet_reads.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'tabs': args.tabs, 'rows': args.rows, 'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Sheets API calls per post: direct update_status_for_post vs SheetWriteBuffer.
+
+Runs the same "Success" status updates against an in-memory worksheet that counts API
+calls, once writing each row directly and once through a SheetWriteBuffer (flushed
+every --batch rows). Two more runs check the buffer's edge cases:
+
+    rate limited  the first --rate-limit-errors write requests fail with 429; the buffer
+                  retries with backoff and every row must still end up written
+    idle flush    a few rows are queued and no more updates arrive; the interval timer
+                  must write them before the buffer is closed, with no flush() call
+
+Each run asserts its API calls, cells written and rows written on the fake worksheet,
+so a regression in the flush threshold, the timer or the backoff fails the script.
+
+Usage:
+    python -m benchmarks.bench_sheet_writes --rows 200 --rate-limit-errors 3
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import time
+
+from config import URL_COLUMN, STATUS_COLUMN, COMMENT_COUNT_COLUMN, COMMENTS_LINK_COLUMN
+from utils.sheet_handler import update_status_for_post, SheetWriteBuffer
+from benchmarks.fake_sheets import FakeSpreadsheet
+
+def make_sheet(rows: int, rate_limit_errors: int = 0):
+    header = [URL_COLUMN, STATUS_COLUMN, COMMENT_COUNT_COLUMN, COMMENTS_LINK_COLUMN]
+    data = [header] + [[f"https://www.instagram.com/p/post{i}/", '', '', ''] for i in range(rows)]
+    spreadsheet = FakeSpreadsheet({'Bench': data}, rate_limit_errors=rate_limit_errors)
+    return spreadsheet, spreadsheet._worksheets[0]
+
+def rows_written(sheet) -> int:
+    return sum(1 for row in sheet.rows[1:] if row[1] == "Success")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=20, help='rows per batch_update (SheetWriteBuffer max_rows)')
+    parser.add_argument('--rate-limit-errors', type=int, default=3, help='429 responses before writes succeed')
+    args = parser.parse_args()
+    # Status, comment count and comments link: three cells per post.
+    cells = 3 * args.rows
+    batches = math.ceil(args.rows / args.batch)
+
+    direct, sheet = make_sheet(args.rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for row in range(2, args.rows + 2):
+            update_status_for_post(sheet, row, "Success", 10, f"comments_{row}.json")
+    print(f"[INFO] Direct writes:   {direct.api_calls} API calls ({dict(direct.calls)})")
+    assert rows_written(sheet) == args.rows and direct.cells_written == cells
+    assert direct.calls['update_cell'] == cells
+
+    # No interval timer here, so only the max_rows threshold and the final flush write.
+    buffered, sheet = make_sheet(args.rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        with SheetWriteBuffer(sheet, max_rows=args.batch, max_interval=0) as writes:
+            for row in range(2, args.rows + 2):
+                update_status_for_post(sheet, row, "Success", 10, f"comments_{row}.json", buffer=writes)
+                pending = (row - 1) % args.batch
+                assert rows_written(sheet) == row - 1 - pending, "rows must be written once max_rows are queued"
+    print(f"[INFO] Buffered writes: {buffered.api_calls} API calls ({dict(buffered.calls)})")
+    assert rows_written(sheet) == args.rows and buffered.cells_written == cells
+    assert dict(buffered.calls) == {'row_values': 1, 'batch_update': batches}, dict(buffered.calls)
+
+    limited, sheet = make_sheet(args.rows, rate_limit_errors=args.rate_limit_errors)
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        with SheetWriteBuffer(sheet, max_rows=args.batch, max_interval=0, retry_delay=0.01) as writes:
+            for row in range(2, args.rows + 2):
+                update_status_for_post(sheet, row, "Success", 10, f"comments_{row}.json", buffer=writes)
+    print(f"[INFO] Rate limited:    {limited.calls['rate_limited']} x 429, {writes.retries} retries, "
+          f"{rows_written(sheet)}/{args.rows} rows written ({dict(limited.calls)})")
+    for line in log.getvalue().splitlines():
+        if 'rate limit' in line:
+            print(f"[INFO]   {line}")
+    assert limited.calls['rate_limited'] == writes.retries == args.rate_limit_errors
+    assert limited.calls['batch_update'] == batches + args.rate_limit_errors
+    assert rows_written(sheet) == args.rows and limited.cells_written == cells, "every row must be written after the retries"
+
+    idle, sheet = make_sheet(5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        with SheetWriteBuffer(sheet, max_interval=0.2) as writes:
+            for row in range(2, 5):
+                update_status_for_post(sheet, row, "Success", 10, f"comments_{row}.json", buffer=writes)
+            time.sleep(0.5)
+            written_while_idle = rows_written(sheet)
+            idle_batches = idle.calls['batch_update']
+    print(f"[INFO] Idle flush:      {written_while_idle}/3 queued rows written by the interval timer before close "
+          f"({dict(idle.calls)})")
+    assert written_while_idle == 3 and idle_batches == 1, "the timer must flush queued rows without flush()"
+    assert idle.calls['batch_update'] == 1, "closing with nothing queued must not write again"
+    print("[INFO] All checks passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+On-disk size and load time of the comment/score storage formats.
+
+Writes the same synthetic brand (posts x comments, plus its VADER report) in each
+STORAGE_FORMAT, then measures the bytes on disk, the time to load every comment and
+score back (json: all per-post files plus the report; compact formats: load_records)
+and the time to stream them with iter_records.
+
+Usage:
+    python -m benchmarks.bench_storage --posts 20 --comments 5000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+
+from social_sentiment_analyzer.analyzer import route_comments, build_analysis_frame, frame_to_results, merge_translation_stats
+from utils.storage import (STORAGE_FORMATS, comments_path, scores_path, write_comments, read_comments, write_report,
+                           load_report, load_records, iter_records, pq)
+
+RESULTS_DIR = pathlib.Path(__file__).parent / 'results'
+SAMPLE_TEXTS = [
+    "Love this app, super easy to use!",
+    "Aplikasinya sangat membantu usaha saya",
+    "Why is the app so slow now?",
+    "Mantap kak, fiturnya lengkap 👍",
+    "Worst update ever, bring back the old version",
+    "🔥🔥🔥",
+    "Gimana cara daftar nya min?",
+    "Thank you so much! 🙏",
+]
+BRAND = 'Bench Brand'
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--comments', type=int, default=5000, help="comments per post")
+    args = parser.parse_args()
+
+    posts = {
+        f"https://www.instagram.com/p/POST{p:04d}/": [f"{SAMPLE_TEXTS[(p + i) % len(SAMPLE_TEXTS)]} #{p}-{i}" for i in range(args.comments)]
+        for p in range(args.posts)
+    }
+    all_comments = [c for comments in posts.values() for c in comments]
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = frame_to_results(build_analysis_frame(all_comments, route_comments(all_comments), {}), merge_translation_stats([]))
+    total = len(all_comments)
+
+    results = []
+    for fmt in STORAGE_FORMATS:
+        if fmt == 'parquet' and pq is None:
+            print("[INFO] Skipping parquet: pyarrow is not installed.")
+            results.append({'format': fmt, 'skipped': 'pyarrow not installed'})
+            continue
+        data_dir = tempfile.mkdtemp(prefix=f"bench_storage_{fmt.replace('.', '_')}_")
+        try:
+            report_path = os.path.join(data_dir, 'report.json')
+            start = time.perf_counter()
+            for url, comments in posts.items():
+                write_comments(comments_path(data_dir, BRAND, url, fmt), comments)
+            write_report(report_path, report, scores_path(data_dir, BRAND, fmt))
+            write_seconds = time.perf_counter() - start
+            size = directory_size(data_dir)
+
+            start = time.perf_counter()
+            if fmt == 'json':
+                loaded = sum(len(read_comments(comments_path(data_dir, BRAND, url, fmt))) for url in posts)
+                scored = len(load_report(report_path)['analyzed_comments'])
+            else:
+                loaded = len(load_records(data_dir, 'comments'))
+                scored = len(load_records(data_dir, 'scores'))
+            load_seconds = time.perf_counter() - start
+
+            # Streaming only applies to the partitioned formats.
+            stream_seconds = None
+            if fmt != 'json':
+                start = time.perf_counter()
+                streamed = sum(len(chunk) for kind in ('comments', 'scores') for chunk in iter_records(data_dir, kind))
+                stream_seconds = time.perf_counter() - start
+                assert streamed == 2 * total
+            assert loaded == scored == total, (loaded, scored, total)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        results.append({'format': fmt, 'bytes': size, 'write_seconds': round(write_seconds, 3),
+                        'load_seconds': round(load_seconds, 3),
+                        'stream_seconds': round(stream_seconds, 3) if stream_seconds is not None else None})
+        print(f"[INFO] {fmt}: {size / 1e6:.1f} MB, write {write_seconds:.2f}s, load {load_seconds:.2f}s"
+              + (f", stream {stream_seconds:.2f}s" if stream_seconds is not None else ""))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / 'storage.json'
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'posts': args.posts, 'comments_per_post': args.comments, 'results': results}, f, indent=2)
+    print(f"[INFO] Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
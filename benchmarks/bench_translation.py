@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Translation throughput: one request per comment vs BatchTranslator.
+
+Translates the same synthetic comments through the local stub translation service, first
+one comment per request on a single thread (the old behaviour) and then with batching and
+bounded concurrency. Both runs use the same request rate limit. A few comments are marked to fail so per-item fallback is exercised.
+
+A third run marks a few comments so the stub merges lines in any batch containing them,
+as googletrans does: those batches are retried one comment per request, so a mismatched
+batch of N costs N + 1 requests (halving down to single comments could cost 2N - 1).
+
+Usage:
+    python -m benchmarks.bench_translation --comments 500 --latency 0.2 --merge-every 120
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from social_sentiment_analyzer.translation import BatchTranslator
+from benchmarks.stub_translator import StubTranslator, serve_in_background, FAIL_MARKER, MERGE_MARKER
+from benchmarks.mock_server import SAMPLE_COMMENTS
+
+def run(engine: BatchTranslator, texts):
+    start = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        translated = engine.translate_all(texts)
+    return time.monotonic() - start, translated
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.2, help='stub service latency per request, in seconds')
+    parser.add_argument('--fail-every', type=int, default=100, help='mark every Nth comment to fail (0 disables)')
+    parser.add_argument('--merge-every', type=int, default=120, help='mark every Nth comment to merge its batch\'s lines')
+    args = parser.parse_args()
+
+    texts = [f"{SAMPLE_COMMENTS[i % len(SAMPLE_COMMENTS)]} {i}" for i in range(args.comments)]
+    if args.fail_every:
+        texts = [f"{t} {FAIL_MARKER}" if i % args.fail_every == 0 else t for i, t in enumerate(texts)]
+
+    server, base_url = serve_in_background(latency=args.latency)
+    factory = lambda: StubTranslator(base_url)
+    try:
+        serial = BatchTranslator(factory, batch_size=1, max_concurrency=1)
+        serial_time, serial_out = run(serial, texts)
+        batched = BatchTranslator(factory)
+        batched_time, batched_out = run(batched, texts)
+        merge_texts = [f"{t} {MERGE_MARKER}" if i % args.merge_every == 1 else t for i, t in enumerate(texts)]
+        merged = BatchTranslator(factory)
+        merged_time, merged_out = run(merged, merge_texts)
+    finally:
+        server.shutdown()
+
+    assert serial_out == batched_out, "Batched translation must match per-comment translation"
+    print(f"[INFO] Per comment: {serial_time:.1f}s, {serial.requests} requests, {len(serial_out)} translated")
+    print(f"[INFO] Batched:     {batched_time:.1f}s, {batched.requests} requests, {len(batched_out)} translated "
+          f"({batched.fallbacks} batch splits after failures)")
+    mismatched = [batch for batch in merged.make_batches(list(dict.fromkeys(merge_texts)))
+                  if any(MERGE_MARKER in t for t in batch)]
+    print(f"[INFO] Merged lines: {merged_time:.1f}s, {merged.requests} requests, {len(merged_out)} translated "
+          f"({merged.mismatches} batches with merged lines retried per comment; "
+          f"{sum(len(batch) + 1 for batch in mismatched)} requests for them vs up to "
+          f"{sum(2 * len(batch) - 1 for batch in mismatched)} when halving)")
+    assert all(merged_out[t].endswith(t) for t in merged_out), "Merged batches must not shift translations"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+In-memory stand-ins for gspread Spreadsheet and Worksheet objects that count API calls.
+
+Only the methods this project uses are implemented. Every method that would be an HTTP
+request to the Sheets API increments `api_calls` on the spreadsheet (shared by all its
+worksheets) and records the method name in `calls`; `cells_written` counts cell writes.
+With `rate_limit_errors=N`, the first N write requests fail with a 429 APIError, like a
+spreadsheet over its per-minute quota.
+"""
+
+from collections import Counter
+from typing import Dict, List
+
+from gspread.exceptions import APIError
+from gspread.utils import a1_to_rowcol
+
+
+class _RateLimitResponse:
+    status_code = 429
+    text = 'Quota exceeded'
+
+    def json(self):
+        return {'error': {'code': 429, 'message': 'Quota exceeded for quota metric "Write requests"',
+                          'status': 'RESOURCE_EXHAUSTED'}}
+
+
+class FakeSpreadsheet:
+    def __init__(self, tabs: Dict[str, List[List[object]]], rate_limit_errors: int = 0):
+        self.calls = Counter()
+        self.cells_written = 0
+        self.rate_limit_errors = rate_limit_errors
+        self._worksheets = [FakeWorksheet(self, title, rows) for title, rows in tabs.items()]
+
+    @property
+    def api_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _count(self, method: str):
+        self.calls[method] += 1
+
+    def _check_quota(self):
+        if self.rate_limit_errors > 0:
+            self.rate_limit_errors -= 1
+            self.calls['rate_limited'] += 1
+            raise APIError(_RateLimitResponse())
+
+    def worksheets(self):
+        self._count('worksheets')
+        return list(self._worksheets)
+
+    def values_batch_get(self, ranges: List[str], params=None):
+        """Whole-tab ranges only ("'Title'"). Values come back as strings, like FORMATTED_VALUE."""
+        self._count('values_batch_get')
+        by_title = {sheet.title: sheet for sheet in self._worksheets}
+        value_ranges = []
+        for name in ranges:
+            title = name.split('!')[0]
+            if title.startswith("'") and title.endswith("'"):
+                title = title[1:-1].replace("''", "'")
+            rows = [['' if value is None else str(value) for value in row] for row in by_title[title].rows]
+            value_ranges.append({'range': name, 'majorDimension': 'ROWS', 'values': rows})
+        return {'valueRanges': value_ranges}
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet: FakeSpreadsheet, title: str, rows: List[List[object]]):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.rows = [list(row) for row in rows]
+
+    def _cell(self, row: int, col: int):
+        while len(self.rows) < row:
+            self.rows.append([])
+        line = self.rows[row - 1]
+        while len(line) < col:
+            line.append('')
+        return line
+
+    def get_all_records(self):
+        self.spreadsheet._count('get_all_records')
+        headers = self.rows[0]
+        return [dict(zip(headers, row + [''] * (len(headers) - len(row)))) for row in self.rows[1:]]
+
+    def row_values(self, row: int):
+        self.spreadsheet._count('row_values')
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def update_cell(self, row: int, col: int, value):
+        self.spreadsheet._count('update_cell')
+        self.spreadsheet._check_quota()
+        self.spreadsheet.cells_written += 1
+        self._cell(row, col)[col - 1] = value
+
+    def batch_update(self, data, **kwargs):
+        self.spreadsheet._count('batch_update')
+        self.spreadsheet._check_quota()
+        self.spreadsheet.cells_written += len(data)
+        for item in data:
+            row, col = a1_to_rowcol(item['range'].split('!')[-1])
+            self._cell(row, col)[col - 1] = item['values'][0][0]
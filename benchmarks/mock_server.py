@@ -0,0 +1,262 @@
+"""
+Local mock of the Instagram mobile pages that get_comments_from_post walks through.
+
+Routes:
+    /p/<post_id>/                         post page with a dismissable popup and the Comment icon
+    /p/<post_id>/comments/                comments drawer; fetches the next page from the API on scroll
+    /api/v1/media/<post_id>/comments/     JSON page of comments (?page=N), delayed by `latency`
+    /api/v1/media/<post_id>/comments/<comment_id>/child_comments/
+                                          JSON replies of a comment, delayed by `latency`
+    /media/<name>                         image / video / font bytes, delayed by `asset_latency`
+
+Every post has `comments_per_post` comments served `page_size` at a time, so a scrape
+exercises the same scroll / wait / extract loop as a real post without a live session.
+With `media=True` the pages also load what a real post does besides text: the post
+images and a video, a web font and an avatar image per comment. With `replies_every`
+set, every Nth comment has `replies_per_thread` replies behind a "View replies (N)"
+control that loads them into the comment's container, as on the live drawer.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlparse
+
+SAMPLE_COMMENTS = [
+    "Aplikasinya sangat membantu usaha saya 🙏",
+    "Love this app, super easy to use!",
+    "Kenapa tidak bisa login dari kemarin?",
+    "Mantap min 👍",
+    "Fiturnya lengkap banget, recommended",
+    "🔥🔥🔥",
+    "Is there an English version?",
+    "Semoga makin sukses BukuWarung",
+]
+
+POST_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Post {post_id}</title>
+<style>{font_face}</style>
+</head>
+<body>
+<div role="dialog" id="popup">
+  <button onclick="document.getElementById('popup').remove()">
+    <svg aria-label="Close" width="24" height="24"><rect width="24" height="24"></rect></svg>
+  </button>
+</div>
+<article>
+  <a href="/p/{post_id}/comments/">
+    <svg aria-label="Comment" width="24" height="24"><rect width="24" height="24"></rect></svg>
+  </a>
+  {media}
+</article>
+</body></html>
+"""
+
+COMMENTS_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Comments {post_id}</title>
+<style>
+  #drawer {{ overflow-y: scroll; height: 600px; }}
+  .x1lliihq {{ padding: 12px 0; }}
+  {font_face}
+</style>
+</head>
+<body>
+<div id="drawer">
+  <div class="x1lliihq">
+    <a href="/owner/"><span class="_ap3a">owner</span></a>
+    <span class="_ap3a">Caption for post {post_id}</span>
+  </div>
+</div>
+<script>
+  const postId = {post_id_json};
+  const withMedia = {media_json};
+  const drawer = document.getElementById('drawer');
+  let nextPage = 0;
+  let loading = false;
+  let hasMore = true;
+
+  function render(comment) {{
+    const div = document.createElement('div');
+    div.className = 'x1lliihq';
+    div.innerHTML = '<a href="/' + comment.user.username + '/"><span class="_ap3a"></span></a><span class="_ap3a"></span>';
+    div.querySelector('a span').textContent = comment.user.username;
+    div.lastChild.textContent = comment.text;
+    if (comment.child_comment_count) {{
+      const toggle = document.createElement('span');
+      toggle.setAttribute('role', 'button');
+      toggle.textContent = 'View replies (' + comment.child_comment_count + ')';
+      toggle.addEventListener('click', () => loadReplies(comment.pk, div, toggle), {{ once: true }});
+      div.appendChild(toggle);
+    }}
+    if (withMedia) {{
+      const avatar = document.createElement('img');
+      avatar.src = '/media/avatar_' + comment.user.username + '.jpg';
+      div.prepend(avatar);
+    }}
+    return div;
+  }}
+
+  function loadReplies(commentId, div, toggle) {{
+    fetch('/api/v1/media/' + postId + '/comments/' + commentId + '/child_comments/')
+      .then(r => r.json())
+      .then(data => {{
+        const thread = document.createElement('div');
+        data.child_comments.forEach(c => thread.appendChild(render(c)));
+        div.appendChild(thread);
+        toggle.textContent = 'Hide replies';
+      }});
+  }}
+
+  function loadNextPage() {{
+    if (loading || !hasMore) return;
+    loading = true;
+    fetch('/api/v1/media/' + postId + '/comments/?page=' + nextPage)
+      .then(r => r.json())
+      .then(data => {{
+        data.comments.forEach(c => drawer.appendChild(render(c)));
+        hasMore = data.has_more_comments;
+        nextPage += 1;
+        loading = false;
+      }});
+  }}
+
+  drawer.addEventListener('scroll', () => {{
+    if (drawer.scrollTop + drawer.clientHeight >= drawer.scrollHeight - 50) loadNextPage();
+  }});
+  loadNextPage();
+</script>
+</body></html>
+"""
+
+FONT_FACE = "@font-face { font-family: 'IGSans'; src: url('/media/ig_sans.woff2'); } body { font-family: 'IGSans'; }"
+POST_MEDIA = "".join(f'<img src="/media/{{post_id}}_{i}.jpg">' for i in range(10)) + \
+    '<video src="/media/{post_id}_clip.mp4" autoplay muted></video>'
+
+
+class MockInstagramServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, comments_per_post: int = 200, page_size: int = 20, latency: float = 0.3,
+                 media: bool = False, asset_latency: float = 0.2, asset_bytes: int = 200_000,
+                 replies_every: int = 0, replies_per_thread: int = 3):
+        super().__init__(address, MockInstagramHandler)
+        self.comments_per_post = comments_per_post
+        self.page_size = page_size
+        self.latency = latency
+        self.media = media
+        self.asset_latency = asset_latency
+        self.asset_bytes = asset_bytes
+        self.asset_requests = 0
+        self.replies_every = replies_every
+        self.replies_per_thread = replies_per_thread
+
+    def reply_count(self, index: int) -> int:
+        return self.replies_per_thread if self.replies_every and index % self.replies_every == 0 else 0
+
+    def comments_page(self, post_id: str, page: int) -> dict:
+        """Returns one page of comments in the shape of Instagram's comments API."""
+        start = page * self.page_size
+        end = min(start + self.page_size, self.comments_per_post)
+        comments = [
+            {
+                'pk': f"{post_id}_{i}",
+                'text': f"{SAMPLE_COMMENTS[i % len(SAMPLE_COMMENTS)]} #{i}",
+                'user': {'username': f"user_{i}"},
+                'created_at': 1700000000 + i,
+                'comment_like_count': i % 7,
+                'child_comment_count': self.reply_count(i),
+            }
+            for i in range(start, end)
+        ]
+        return {'comments': comments, 'has_more_comments': end < self.comments_per_post}
+
+    def child_comments(self, post_id: str, comment_id: str) -> dict:
+        """Returns a comment's replies in the shape of Instagram's child comments API."""
+        index = int(comment_id.rsplit('_', 1)[-1])
+        replies = [
+            {
+                'pk': f"{comment_id}_r{j}",
+                'text': f"@user_{index} {SAMPLE_COMMENTS[(index + j + 1) % len(SAMPLE_COMMENTS)]} (reply {j})",
+                'user': {'username': f"replier_{j}"},
+                'created_at': 1700000000 + index + j,
+                'comment_like_count': 0,
+                'parent_comment_id': comment_id,
+            }
+            for j in range(self.reply_count(index))
+        ]
+        return {'child_comments': replies, 'has_more_tail_child_comments': False}
+
+
+class MockInstagramHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, content_type: str = 'text/html; charset=utf-8'):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path = parsed.path
+
+        match = re.fullmatch(r'/api/v1/media/([^/]+)/comments/([^/]+)/child_comments/', path)
+        if match:
+            time.sleep(self.server.latency)
+            self._send(json.dumps(self.server.child_comments(match.group(1), match.group(2))), 'application/json')
+            return
+
+        match = re.fullmatch(r'/api/v1/media/([^/]+)/comments/', path)
+        if match:
+            page = int(parse_qs(parsed.query).get('page', ['0'])[0])
+            time.sleep(self.server.latency)
+            self._send(json.dumps(self.server.comments_page(match.group(1), page)), 'application/json')
+            return
+
+        match = re.fullmatch(r'/media/[^/]+\.(jpg|mp4|woff2)', path)
+        if match:
+            self.server.asset_requests += 1
+            time.sleep(self.server.asset_latency)
+            content_type = {'jpg': 'image/jpeg', 'mp4': 'video/mp4', 'woff2': 'font/woff2'}[match.group(1)]
+            self._send(bytes(self.server.asset_bytes), content_type)
+            return
+
+        media = self.server.media
+        font_face = FONT_FACE if media else ''
+        match = re.fullmatch(r'/p/([^/]+)/comments/', path)
+        if match:
+            post_id = match.group(1)
+            self._send(COMMENTS_PAGE.format(post_id=post_id, post_id_json=json.dumps(post_id),
+                                            media_json=json.dumps(media), font_face=font_face))
+            return
+
+        match = re.fullmatch(r'/p/([^/]+)/', path)
+        if match:
+            post_id = match.group(1)
+            self._send(POST_PAGE.format(post_id=post_id, font_face=font_face,
+                                        media=POST_MEDIA.format(post_id=post_id) if media else ''))
+            return
+
+        self.send_error(404)
+
+
+def serve_in_background(port: int = 0, **kwargs) -> Tuple[MockInstagramServer, str]:
+    """Starts a MockInstagramServer on a daemon thread. Returns the server and its base URL."""
+    server = MockInstagramServer(('127.0.0.1', port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, base_url = serve_in_background(port=8765)
+    print(f"[INFO] Mock Instagram server running at {base_url}/p/demo/ (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
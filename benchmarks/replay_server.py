@@ -0,0 +1,265 @@
+"""
+Offline replay of recorded Instagram posts for get_comments_from_post.
+
+A recording (benchmarks/fixtures/recordings/<name>.json) holds a post page's HTML and
+the outer HTML of every comment container of its comments drawer, the caption first:
+
+    {"url": ..., "recorded_at": ..., "post_html": ..., "caption_html": ...,
+     "comments_html": [...]}
+
+Routes:
+    /p/<name>/                  the recorded post page; clicking the Comment icon opens the drawer
+    /p/<name>/comments/         drawer with the caption and the first page of comments
+    /replay/<name>/page/<n>     the next `page_size` recorded comments, delayed by `latency`
+
+Like the live drawer, later pages are lazy-loaded when the drawer is scrolled to the
+bottom, except every `button_every`-th page, which waits behind a "View more comments"
+button. Recordings are made from a live post with --record (see record_post).
+
+Usage:
+    python -m benchmarks.replay_server                      # serve the recordings on :8766
+    python -m benchmarks.replay_server --record URL [--name NAME]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'recordings')
+COMMENT_SELECTOR = 'div.x1lliihq'
+
+# Recorded post pages have their scripts stripped, so the Comment icon's own click
+# handler is gone; this one opens the drawer the way the live page does.
+POST_PAGE_SCRIPT = """<script>
+  document.addEventListener('click', (event) => {
+    const target = event.target.closest('*');
+    if (target.closest('svg[aria-label="Comment"]') || target.querySelector('svg[aria-label="Comment"]')) {
+      event.preventDefault();
+      location.href = location.pathname.replace(/\\/?$/, '/') + 'comments/';
+    }
+  });
+</script>"""
+
+COMMENTS_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Comments {name}</title>
+<style>
+  #drawer {{ overflow-y: scroll; height: 600px; }}
+  .x1lliihq {{ padding: 12px 0; }}
+</style>
+</head>
+<body>
+<div role="dialog">
+  <div id="drawer">
+{caption}
+{first_page}
+  </div>
+</div>
+<script>
+  const name = {name_json};
+  const pageModes = {page_modes_json};
+  const drawer = document.getElementById('drawer');
+  let nextPage = 0;
+  let loading = false;
+
+  function addButton() {{
+    const div = document.createElement('div');
+    div.id = 'load-more';
+    div.innerHTML = '<button type="button"><span>View more comments</span></button>';
+    div.querySelector('button').addEventListener('click', loadNextPage);
+    drawer.appendChild(div);
+  }}
+
+  function loadNextPage() {{
+    if (loading || nextPage >= pageModes.length) return;
+    loading = true;
+    fetch('/replay/' + name + '/page/' + nextPage)
+      .then(r => r.text())
+      .then(html => {{
+        const button = document.getElementById('load-more');
+        if (button) button.remove();
+        drawer.insertAdjacentHTML('beforeend', html);
+        nextPage += 1;
+        loading = false;
+        if (pageModes[nextPage] === 'button') addButton();
+      }});
+  }}
+
+  drawer.addEventListener('scroll', () => {{
+    if (pageModes[nextPage] === 'scroll' && drawer.scrollTop + drawer.clientHeight >= drawer.scrollHeight - 50) loadNextPage();
+  }});
+  if (pageModes[0] === 'button') addButton();
+</script>
+</body></html>
+"""
+
+
+def load_recordings(directory: str = RECORDINGS_DIR) -> Dict[str, Dict]:
+    """Returns name -> recording for every recording in directory."""
+    recordings = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            recordings[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+    return recordings
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, recordings: Dict[str, Dict], page_size: int = 20, first_page: int = 20,
+                 button_every: int = 3, latency: float = 0.3):
+        super().__init__(address, ReplayHandler)
+        self.recordings = recordings
+        self.page_size = page_size
+        self.first_page = first_page
+        self.button_every = button_every
+        self.latency = latency
+
+    def page_count(self, name: str) -> int:
+        remaining = max(0, len(self.recordings[name]['comments_html']) - self.first_page)
+        return -(-remaining // self.page_size)
+
+    def page_modes(self, name: str) -> List[str]:
+        """How each lazy page is loaded: 'scroll', or 'button' for every button_every-th page."""
+        return [
+            'button' if self.button_every and (page + 1) % self.button_every == 0 else 'scroll'
+            for page in range(self.page_count(name))
+        ]
+
+    def page_html(self, name: str, page: int) -> str:
+        start = self.first_page + page * self.page_size
+        return '\n'.join(self.recordings[name]['comments_html'][start:start + self.page_size])
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: str, content_type: str = 'text/html; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        recordings = self.server.recordings
+
+        match = re.fullmatch(r'/replay/([^/]+)/page/(\d+)', path)
+        if match and match.group(1) in recordings:
+            time.sleep(self.server.latency)
+            self._send(self.server.page_html(match.group(1), int(match.group(2))))
+            return
+
+        match = re.fullmatch(r'/p/([^/]+)/comments/', path)
+        if match and match.group(1) in recordings:
+            name = match.group(1)
+            recording = recordings[name]
+            self._send(COMMENTS_PAGE.format(
+                name=name, name_json=json.dumps(name), page_modes_json=json.dumps(self.server.page_modes(name)),
+                caption=recording['caption_html'],
+                first_page='\n'.join(recording['comments_html'][:self.server.first_page]),
+            ))
+            return
+
+        match = re.fullmatch(r'/p/([^/]+)/', path)
+        if match and match.group(1) in recordings:
+            post_html = recordings[match.group(1)]['post_html']
+            self._send(post_html.replace('</body>', POST_PAGE_SCRIPT + '</body>', 1))
+            return
+
+        self.send_error(404)
+
+
+def serve_in_background(port: int = 0, recordings: Optional[Dict[str, Dict]] = None,
+                        **kwargs) -> Tuple[ReplayServer, str]:
+    """Starts a ReplayServer (all recordings by default) on a daemon thread. Returns the server and its base URL."""
+    server = ReplayServer(('127.0.0.1', port), recordings if recordings is not None else load_recordings(), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# Post page without scripts: replayed pages must not call back to Instagram.
+_JS_POST_HTML = """
+    const root = document.documentElement.cloneNode(true);
+    root.querySelectorAll('script, noscript, link[rel="preload"], link[rel="modulepreload"]').forEach(e => e.remove());
+    return '<!DOCTYPE html>\\n' + root.outerHTML;
+"""
+
+# Outermost comment containers only, so nested containers are not recorded twice.
+_JS_CONTAINERS_HTML = """
+    return Array.from(document.querySelectorAll(arguments[0]))
+        .filter(div => !div.parentElement.closest(arguments[0]))
+        .map(div => div.outerHTML);
+"""
+
+
+def record_post(driver, url: str) -> Dict:
+    """
+    Records a live post for replay: the post page as first loaded, then every comment
+    container after get_comments_from_post has loaded the whole drawer.
+    """
+    from scrapers.instagram_scraper import get_comments_from_post
+
+    driver.get(url)
+    time.sleep(5)
+    post_html = driver.execute_script(_JS_POST_HTML)
+    get_comments_from_post(url, driver=driver, capture_mode='dom')
+    containers = driver.execute_script(_JS_CONTAINERS_HTML, COMMENT_SELECTOR)
+    if not containers:
+        raise RuntimeError(f"No comment containers found on {url}.")
+    return {
+        'url': url,
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'post_html': post_html,
+        'caption_html': containers[0],
+        'comments_html': containers[1:],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--record', metavar='URL', help='record a live post (needs Chrome and an Instagram login)')
+    parser.add_argument('--name', help='recording name (default: the post shortcode)')
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    if args.record:
+        from scrapers.driver_factory import create_driver, wait_for_manual_login
+        from utils.storage import post_key
+
+        driver = create_driver(capture_mode='dom')
+        if driver is None:
+            return
+        try:
+            wait_for_manual_login(driver)
+            recording = record_post(driver, args.record)
+        finally:
+            driver.quit()
+        os.makedirs(RECORDINGS_DIR, exist_ok=True)
+        out_path = os.path.join(RECORDINGS_DIR, f"{args.name or post_key(args.record)}.json")
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(recording, f, ensure_ascii=False, indent=1)
+        print(f"[INFO] Recorded {len(recording['comments_html'])} comments to {out_path}")
+        return
+
+    server, base_url = serve_in_background(port=args.port)
+    for name in server.recordings:
+        print(f"[INFO] Replaying {name} at {base_url}/p/{name}/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
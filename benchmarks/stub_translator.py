@@ -0,0 +1,77 @@
+"""
+Local stub of a translation service, for exercising BatchTranslator without Google.
+
+The server answers POST /translate with each input line prefixed by "[en] " after a fixed
+latency, and fails any request whose text contains FAIL_MARKER so partial-failure
+fallbacks can be exercised. A multi-line request containing MERGE_MARKER comes back with
+its first two lines merged into one, like googletrans does with some batches. StubTranslator is a googletrans-compatible client for it:
+pass `lambda: StubTranslator(base_url)` as BatchTranslator's translator_factory.
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Tuple
+
+FAIL_MARKER = '#fail'
+MERGE_MARKER = '#merge'
+
+
+class StubTranslatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.2):
+        super().__init__(address, StubTranslatorHandler)
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+
+class StubTranslatorHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        with self.server._lock:
+            self.server.requests += 1
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.server.latency)
+        if FAIL_MARKER in payload['text']:
+            self.send_error(500)
+            return
+        lines = [f"[en] {line}" for line in payload['text'].split('\n')]
+        if MERGE_MARKER in payload['text'] and len(lines) > 1:
+            lines[:2] = [f"{lines[0]} {lines[1]}"]
+        translated = '\n'.join(lines)
+        data = json.dumps({'text': translated}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubTranslator:
+    """googletrans-compatible client for StubTranslatorServer."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def translate(self, text: str, dest: str = 'en'):
+        request = urllib.request.Request(
+            f"{self.base_url}/translate",
+            data=json.dumps({'text': text, 'dest': dest}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(request) as response:
+            return SimpleNamespace(text=json.load(response)['text'])
+
+
+def serve_in_background(port: int = 0, **kwargs) -> Tuple[StubTranslatorServer, str]:
+    """Starts a StubTranslatorServer on a daemon thread. Returns the server and its base URL."""
+    server = StubTranslatorServer(('127.0.0.1', port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
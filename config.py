@@ -15,3 +15,133 @@ COMMENTS_LINK_COLUMN = 'Comments Link'
 
 # Scraping configuration
 SCROLL_COUNT = 10
+
+# DOM extraction mode for get_comments_from_post:
+#   'bulk'        - read every visible comment in a single execute_script call per cycle
+#   'incremental' - like 'bulk', but only read comment nodes added since the last cycle
+#   'element'     - legacy per-element WebDriver lookups (one round trip per call)
+DOM_EXTRACTION_MODE = 'bulk'
+
+# Parallel scraping: number of independent Chrome drivers scraping posts at once.
+# 1 keeps the original one-browser behaviour.
+SCRAPE_WORKERS = 1
+# Random pause (seconds) each worker takes between its own posts to avoid rate-limiting.
+POST_DELAY_RANGE = (15, 30)
+# Browser sessions get_comments_from_post keeps warm and reuses when called without a driver.
+SESSION_POOL_SIZE = 1
+# Browser profile: 'default' loads every resource like a normal visit. 'lean' (opt-in)
+# blocks images, video, fonts and third-party trackers, since we only read text; check
+# with benchmarks/bench_browser_profile.py that comment counts are unchanged before using it.
+BROWSER_PROFILE = 'default'
+# Reply threads: with EXPAND_REPLIES, once a post's top-level comments are loaded every
+# "View replies" control is expanded, REPLY_EXPAND_BATCH at a time, until
+# MAX_REPLIES_PER_POST replies are collected. Replies are linked to their parent comment:
+# comment files store each comment's key and parent_key, and reports list the threads.
+EXPAND_REPLIES = False
+REPLY_EXPAND_BATCH = 10
+MAX_REPLIES_PER_POST = 500
+
+# Adaptive waits: keep scrolling only while the comments drawer is still growing, instead
+# of fixed sleeps. False restores the fixed 30 x 0.7 s scroll loop.
+ADAPTIVE_WAITS = True
+# Shortest poll interval and longest wait (seconds) for new content after a scroll or click.
+ADAPTIVE_WAIT_MIN_POLL = 0.1
+ADAPTIVE_WAIT_MAX_TIMEOUT = 10
+
+# Where comments are captured from:
+#   'dom'     - read the rendered comments drawer (see DOM_EXTRACTION_MODE)
+#   'network' - parse the JSON responses that feed the drawer via Chrome DevTools Protocol
+CAPTURE_MODE = 'dom'
+
+# Google Sheets write batching: queued status updates are flushed in one request every
+# SHEET_BATCH_ROWS rows or SHEET_FLUSH_INTERVAL seconds, retrying rate-limit errors.
+SHEET_BATCH_ROWS = 20
+SHEET_FLUSH_INTERVAL = 30
+SHEET_MAX_RETRIES = 5
+
+# Persistent translation cache (SQLite) used by analyze_comments_vader, so comments are
+# not re-translated when a campaign is rescraped. Least recently used entries are evicted
+# beyond TRANSLATION_CACHE_MAX_ENTRIES.
+TRANSLATION_CACHE_ENABLED = True
+TRANSLATION_CACHE_PATH = 'social_sentiment_analyzer/data/translation_cache.sqlite3'
+TRANSLATION_CACHE_MAX_ENTRIES = 200000
+
+# Batched translation: comments are packed up to TRANSLATION_BATCH_SIZE per request (and at
+# most TRANSLATION_BATCH_CHARS characters), with up to TRANSLATION_CONCURRENCY requests in
+# flight and request starts spaced at least TRANSLATION_MIN_INTERVAL seconds apart.
+TRANSLATION_BATCH_SIZE = 50
+TRANSLATION_BATCH_CHARS = 4500
+TRANSLATION_CONCURRENCY = 4
+TRANSLATION_MIN_INTERVAL = 0.2
+
+# Skip translation for comments that are already English or have no language content
+# (emoji, @mentions, links); only other comments are sent to the translator.
+LANGUAGE_PRECLASSIFIER = True
+
+# Number of comments scored per chunk by the bulk VADER scoring path.
+SCORING_CHUNK_SIZE = 1000
+# Worker processes for VADER scoring of large comment sets (1 scores in the main process).
+ANALYSIS_WORKERS = 1
+
+# Analyze comments while scraping continues: scrapers hand new comments to a background
+# translation/scoring pipeline instead of analyzing each brand after all its posts are done.
+STREAMING_ANALYSIS = True
+STREAMING_QUEUE_SIZE = 32     # submissions waiting for analysis before scrapers block
+STREAMING_BATCH_SIZE = 200    # comments translated and scored together
+
+# Record finished posts and brands so an interrupted run resumes where it stopped.
+# Cleared when a run completes without failed posts; see main.py --force options.
+CHECKPOINTS_ENABLED = True
+CHECKPOINT_PATH = 'social_sentiment_analyzer/data/checkpoints.sqlite3'
+
+# Incremental re-scrape (also enabled by main.py --incremental): posts with saved comments
+# from a previous run are only scrolled until INCREMENTAL_STOP_CYCLES scrape cycles in a
+# row find nothing new, and only new comments are analyzed and merged into the report.
+# Stopping early assumes the drawer lists the newest comments first. Instagram's default
+# order is "most relevant", so before stopping the scraper checks the comment timestamps:
+# if they are not newest first, it keeps scrolling to the end. Posts whose comments show
+# no timestamps cannot be checked, and new comments further down may then be missed.
+INCREMENTAL_RESCRAPE = False
+INCREMENTAL_STOP_CYCLES = 2
+
+# Post scheduling (utils/scheduler.py): every tab is read before scraping starts. Rows
+# whose Status is already 'Success' are skipped (their saved comments still go into the
+# report) unless SKIP_COMPLETED_POSTS is False (or --rescrape-completed is passed) or the
+# run is incremental; then they are scraped after all other posts. --force, --force-brand
+# and --force-post always re-scrape the rows they name. Posts are ordered by the SCHEDULE_ORDER keys in turn:
+#   'priority'          - the optional PRIORITY_COLUMN, lowest number first
+#   'newest'/'oldest'   - post date in the optional POSTED_AT_COLUMN (ISO 8601)
+#   'stale'             - never-scraped posts first, then the least recently scraped
+#   'smallest'/'largest' - comment count from the last scrape (COMMENT_COUNT_COLUMN)
+# Brands start with the most urgent post. Each brand may scrape for BRAND_TIME_BUDGET
+# seconds (0: no limit; BRAND_TIME_BUDGETS overrides it per tab name); posts left over
+# are scraped first by the next run.
+PRIORITY_COLUMN = 'Priority'
+POSTED_AT_COLUMN = 'Posted At'
+SKIP_COMPLETED_POSTS = True
+SCHEDULE_ORDER = ['priority', 'stale', 'smallest']
+BRAND_TIME_BUDGET = 0
+BRAND_TIME_BUDGETS = {}
+
+# How scraped comments and per-comment scores are stored under social_sentiment_analyzer/data:
+# 'json' (one indented file per post, scores inside the report JSON), 'jsonl.gz' or
+# 'parquet' (needs pyarrow). The compact formats are partitioned as
+# brand=<name>/post=<shortcode>/comments.<ext>, with scores in brand=<name>/scores.<ext>.
+STORAGE_FORMAT = 'json'
+
+# Chart output. Lower CHART_DPI (e.g. 100) or CHART_FORMAT = 'svg' is much cheaper for dashboards.
+CHART_DPI = 300
+CHART_FORMAT = 'png'
+CHART_WORKERS = 1  # worker processes rendering charts while the next brand is processed (1 renders inline)
+
+# Term statistics: the most frequent terms kept per sentiment class in the report JSON,
+# and the number of terms kept for (and drawn by) the word cloud.
+TOP_TERMS_PER_CLASS = 20
+WORDCLOUD_MAX_WORDS = 200
+
+# Run instrumentation: every run writes a timing report (per-span totals for driver
+# startup, navigation, scroll cycles, extraction, translation, scoring, charts and sheet
+# I/O) to TIMING_REPORT_DIR. CHROME_TRACE (or main.py --trace) also writes every span in
+# Chrome trace format; main.py --profile runs the hot paths under cProfile.
+TIMING_REPORT_DIR = 'social_sentiment_analyzer/reports/timing'
+CHROME_TRACE = False
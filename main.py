@@ -1,15 +1,22 @@
 import os
-import re
 import json
+import argparse
 from collections import defaultdict
 
 from config import *
-from scrapers.instagram_scraper import get_comments_from_post, handle_verification_challenges
-from utils.sheet_handler import get_gspread_client, get_all_tabs, get_all_posts, update_status_for_post, update_brand_report_links
-from social_sentiment_analyzer.analyzer import analyze_comments_vader
-from social_sentiment_analyzer.visualizer import create_sentiment_bar_chart, create_word_cloud
+from scrapers.instagram_scraper import handle_verification_challenges
+from scrapers.scrape_pool import ScrapePool, ScrapeJob
+from scrapers.driver_factory import create_driver
+from utils.sheet_handler import get_gspread_client, load_sheet_snapshot, update_status_for_post, update_brand_report_links, SheetWriteBuffer
+from utils.scheduler import PostScheduler
+from utils.checkpoint_store import CheckpointStore
+from utils.instrumentation import get_instrumentation, span
+from utils.storage import (sanitize_filename, comments_path, scores_path, write_comments, read_comments, read_comment_rows,
+                           comment_threads, reply_threads, write_report, load_report)
+from social_sentiment_analyzer.analyzer import analyze_comments_vader, merge_reports, create_scoring_pool
+from social_sentiment_analyzer.pipeline import StreamingAnalysisPipeline
+from social_sentiment_analyzer.visualizer import create_sentiment_bar_chart, create_word_cloud_from_frequencies, ChartPool
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -20,10 +27,6 @@ import glob
 
 COOKIES_FILE = 'insta_cookies.json'
 
-def sanitize_filename(name: str) -> str:
-    """Sanitizes a string to be a valid filename."""
-    return re.sub(r'[\\/*?:"<>|]', '_', name)
-
 def save_cookies(driver, path=COOKIES_FILE):
     cookies = driver.get_cookies()
     with open(path, 'w') as f:
@@ -45,50 +48,13 @@ def load_cookies(driver, path=COOKIES_FILE):
     print(f"Cookies loaded from {path}")
     return True
 
-def setup_driver():
-    """Setup Chrome driver with enhanced anti-detection measures"""
-    print("Launching Chrome browser for Selenium (mobile emulation)...")
-    mobile_emulation = {
-        "deviceMetrics": {"width": 414, "height": 896, "pixelRatio": 3},
-        "userAgent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1"
-    }
-    options = webdriver.ChromeOptions()
-    options.add_experimental_option("mobileEmulation", mobile_emulation)
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('--window-size=430,930')
-    
-    # Enhanced anti-detection measures
-    options.add_argument('--disable-web-security')
-    options.add_argument('--allow-running-insecure-content')
-    options.add_argument('--disable-features=VizDisplayCompositor')
-    options.add_argument('--disable-extensions')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    user_agents = [
-        "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
-        "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1",
-        "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1"
-    ]
-    options.add_argument(f'--user-agent={random.choice(user_agents)}')
-    
-    headless_env = os.environ.get('HEADLESS', '0').lower()
-    if headless_env in ['1', 'true', 'yes']:
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        print("[INFO] Running in headless mode.")
-    else:
-        print("[INFO] Running in headed (UI) mode.")
-    
-    try:
-        driver = webdriver.Chrome(options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        print("Chrome browser launched successfully.")
-        return driver
-    except Exception as e:
-        print(f"Failed to launch Chrome browser: {e}")
-        return None
+def setup_driver(capture_mode=None):
+    """Setup Chrome driver with enhanced anti-detection measures.
+
+    With capture_mode 'network' (default CAPTURE_MODE), CDP performance logging is enabled
+    so comments can be read from the drawer's API responses.
+    """
+    return create_driver(capture_mode)
 
 def handle_common_popups(driver):
     """Handles common pop-ups that appear after login."""
@@ -129,90 +95,261 @@ def authenticate_session(driver):
         handle_verification_challenges(driver)
     print("Authentication setup completed.")
 
-def main():
+def last_scraped_at(data_dir, brand_name, url):
+    """When a post was last scraped: the modification time of its saved comments, or None."""
+    path = comments_path(data_dir, brand_name, url)
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+def main(force=False, force_posts=None, force_brands=None, incremental=None, rescrape_completed=None, profile=False,
+         trace=None):
+    """Scrapes and analyzes every brand tab in the sheet.
+
+    If a previous run was interrupted, posts and brands it completed are read back from
+    the checkpoint store instead of being scraped again. force ignores all checkpoints
+    and re-scrapes every post, including rows already marked "Success"; force_posts /
+    force_brands (lists of post URLs / tab names) do the same for those posts or tabs.
+
+    With incremental (default INCREMENTAL_RESCRAPE), brands that already have a report
+    are re-scraped incrementally: each post stops scrolling once it reaches the comments
+    saved by the previous run, only the new comments are analyzed, and they are merged
+    into the existing report.
+
+    Every tab is read before scraping starts and work is ordered by PostScheduler: rows
+    already marked "Success" are skipped (their saved comments are reused) unless
+    rescrape_completed (default: not SKIP_COMPLETED_POSTS) is set, the most
+    urgent brands and posts go first (SCHEDULE_ORDER), and each brand stops taking new
+    posts once its BRAND_TIME_BUDGET is spent. Posts left over are scraped by the next run.
+
+    Each run writes a timing report to TIMING_REPORT_DIR; trace (default CHROME_TRACE)
+    adds a Chrome trace file and profile runs the hot paths under cProfile.
+    """
+    if incremental is None:
+        incremental = INCREMENTAL_RESCRAPE
+    if rescrape_completed is None:
+        rescrape_completed = not SKIP_COMPLETED_POSTS
+    if trace is None:
+        trace = CHROME_TRACE
+    instrumentation = get_instrumentation()
+    instrumentation.reset(profile=profile)
     print("Starting Instagram comment scraping and sentiment analysis...")
 
     client = get_gspread_client()
     if not client:
         return
         
-    tabs = get_all_tabs(client)
+    # One batch read of every tab; sheet updates are then written as diffs against it.
+    snapshot = load_sheet_snapshot(client)
+    tabs = snapshot.worksheets if snapshot else []
     if not tabs:
         print("No tabs found in the Google Sheet. Exiting.")
         return
 
-    driver = setup_driver()
-    if not driver:
-        return
+    pool = ScrapePool(setup_driver, workers=SCRAPE_WORKERS, delay_range=POST_DELAY_RANGE, authenticate=authenticate_session)
+    # One scoring pool (ANALYSIS_WORKERS processes, none for 1) shared by the pipeline and
+    # the per-brand analysis for the whole run.
+    scoring_pool = create_scoring_pool()
+    pipeline = StreamingAnalysisPipeline(executor=scoring_pool) if STREAMING_ANALYSIS else None
+    checkpoints = CheckpointStore() if CHECKPOINTS_ENABLED else None
+    charts = ChartPool(CHART_WORKERS)
+    if checkpoints:
+        if force:
+            print("[INFO] Ignoring checkpoints from previous runs (--force).")
+            checkpoints.clear()
+        for url in force_posts or []:
+            print(f"[INFO] Forcing re-scrape of {url} ({checkpoints.forget_post(url)} checkpoint(s) dropped).")
+        for name in force_brands or []:
+            print(f"[INFO] Forcing re-scrape of brand '{name}' ({checkpoints.forget_brand(name)} checkpoint(s) dropped).")
+    failed_posts = 0
+    deferred_posts = 0
+    data_dir = "social_sentiment_analyzer/data"
+    reports_dir = "social_sentiment_analyzer/reports"
+
+    def report_path_for(brand_name):
+        return os.path.join(reports_dir, f"{sanitize_filename(brand_name)}_sentiment_analysis_vader.json")
+
+    # Incremental runs re-scrape completed posts of brands that have a report to merge into.
+    # Forced posts and tabs are scraped again even if their rows are marked "Success".
+    scheduler = PostScheduler(skip_completed=not rescrape_completed,
+                              last_scraped=lambda brand_name, url: last_scraped_at(data_dir, brand_name, url),
+                              snapshot=snapshot)
+    has_report = (lambda brand_name: os.path.exists(report_path_for(brand_name))) if incremental else None
 
     try:
-        authenticate_session(driver)
-
-        for sheet in tabs:
-            brand_name = sheet.title
+        plans = scheduler.plan(tabs, rescrape_completed=has_report, force=force, force_brands=force_brands,
+                               force_posts=force_posts)
+        if not plans:
+            print("No posts found in any tab. Exiting.")
+            return
+        if not pool.start():
+            return
+        if pipeline:
+            pipeline.start()
+
+        for plan in plans:
+            sheet = plan.sheet
+            brand_name = plan.brand
             print(f"\n--- Processing Brand/Campaign: {brand_name} ---")
 
-            posts_to_scrape = get_all_posts(sheet)
-            if not posts_to_scrape:
-                print(f"No posts found for '{brand_name}' in the sheet.")
-                continue
-
             all_brand_comments = []
-            data_dir = "social_sentiment_analyzer/data"
             os.makedirs(data_dir, exist_ok=True)
+            vader_report_path = report_path_for(brand_name)
+
+            # Rows skipped as completed keep their saved comments for the report; one whose
+            # comments file is missing is scraped again, after the other posts.
+            tasks = list(plan.tasks)
+            skipped_comments = []
+            for task in plan.skipped:
+                saved = read_comments(comments_path(data_dir, brand_name, task.url))
+                if saved is None:
+                    tasks.append(task)
+                else:
+                    skipped_comments.append(saved)
+            if not tasks and os.path.exists(vader_report_path):
+                print(f"[INFO] All {len(plan.skipped)} posts of '{brand_name}' are already scraped. Report unchanged.")
+                continue
 
-            for i, post in enumerate(posts_to_scrape):
-                url = post.get(URL_COLUMN)
-                if not url:
+            # Incremental mode needs the previous report to merge into; without one the
+            # brand is scraped and analyzed in full.
+            previous_report = load_report(vader_report_path) if incremental else None
+            if incremental and previous_report is None:
+                print(f"[INFO] No previous report for '{brand_name}'. Scraping all comments.")
+
+            jobs = []
+            previous_comments = {}
+            for task in tasks:
+                url = task.url
+                known = None
+                if previous_report is not None:
+                    saved = read_comment_rows(comments_path(data_dir, brand_name, url))
+                    if saved is not None:
+                        previous_comments[url] = saved
+                        known = frozenset(row['text'] for row in saved)
+                jobs.append(ScrapeJob(task.row_index, url, known))
+            post_count = len(jobs)
+
+            # Resume: reuse posts an interrupted run already scraped, and skip the brand
+            # entirely if its report was written from all of them.
+            completed = checkpoints.completed_posts(brand_name) if checkpoints else {}
+            resumed = [job for job in jobs if job.url in completed]
+            if resumed:
+                report_path = checkpoints.analyzed_report(brand_name, post_count) if len(resumed) == post_count else None
+                if report_path:
+                    print(f"[INFO] '{brand_name}' was already completed by a previous run ({report_path}). Skipping.")
                     continue
-
-                print(f"\nScraping comments from: {url}")
-                try:
-                    comments = get_comments_from_post(url, driver=driver)
-                    all_brand_comments.extend(comments)
-                    
-                    # Save comments for this post to a unique file
-                    sanitized_url = sanitize_filename(url)
-                    comments_filename = f"comments_{sanitize_filename(brand_name)}_{sanitized_url}.json"
-                    comments_filepath = os.path.join(data_dir, comments_filename)
-                    with open(comments_filepath, 'w', encoding='utf-8') as f:
-                        json.dump(comments, f, ensure_ascii=False, indent=4)
-                    
-                    print(f"Saved {len(comments)} comments to {comments_filepath}")
-                    update_status_for_post(sheet, i + 2, "Success", len(comments), comments_filepath)
-
-                except Exception as e:
-                    print(f"Failed to scrape {url}: {e}")
-                    update_status_for_post(sheet, i + 2, f"Error: {e}")
-                
-                # Add a random delay between scraping posts to avoid rate-limiting
-                if i < len(posts_to_scrape) - 1:
-                    delay = random.uniform(15, 30)
-                    print(f"Waiting for {delay:.2f} seconds before next post...")
-                    time.sleep(delay)
-
-            if not all_brand_comments:
-                print(f"No comments collected for brand '{brand_name}'. Skipping report generation.")
+                print(f"[INFO] Resuming '{brand_name}': {len(resumed)}/{post_count} posts already scraped.")
+                for job in resumed:
+                    all_brand_comments.extend(completed[job.url])
+                    if pipeline:
+                        pipeline.submit(brand_name, completed[job.url])
+                jobs = [job for job in jobs if job.url not in completed]
+            for saved in skipped_comments:
+                all_brand_comments.extend(saved)
+                if pipeline:
+                    pipeline.submit(brand_name, saved)
+
+            # Workers scrape in parallel; this loop is the single collector that saves
+            # comment files and queues sheet updates (flushed in batches). With streaming
+            # analysis, workers also hand new comments to the pipeline as they find them.
+            on_comments = (lambda job, found: pipeline.submit(brand_name, found)) if pipeline else None
+            finished_urls = set()
+            plan.start()
+            with SheetWriteBuffer(sheet, snapshot=snapshot) as sheet_writes:
+                for result in pool.scrape(jobs, on_comments=on_comments, stop=plan.over_budget):
+                    url = result.job.url
+                    finished_urls.add(url)
+                    if result.error:
+                        print(f"Failed to scrape {url}: {result.error}")
+                        failed_posts += 1
+                        update_status_for_post(sheet, result.job.row_index, f"Error: {result.error}", buffer=sheet_writes)
+                        continue
+
+                    try:
+                        comments = result.comments
+                        # Reply links (key and parent_key) are saved with the texts when the
+                        # scraper returned the records behind them.
+                        threads = (comment_threads(result.records)
+                                   if result.records is not None and len(result.records) == len(comments) else None)
+                        # Incremental: keep the saved comments and add only the new ones.
+                        # Only new comments are analyzed (and checkpointed for resume).
+                        if url in previous_comments:
+                            is_new = [c not in result.job.known_comments for c in comments]
+                            new_comments = [c for c, new in zip(comments, is_new) if new]
+                            saved = previous_comments[url]
+                            comments = [row['text'] for row in saved] + new_comments
+                            if threads is not None:
+                                threads = ([{'key': row['key'], 'parent_key': row['parent_key']} for row in saved] +
+                                           [thread for thread, new in zip(threads, is_new) if new])
+                        else:
+                            new_comments = comments
+                        all_brand_comments.extend(new_comments)
+
+                        # Save comments for this post to a unique file (format set by STORAGE_FORMAT)
+                        comments_filepath = comments_path(data_dir, brand_name, url)
+                        write_comments(comments_filepath, comments, threads)
+
+                        print(f"Saved {len(comments)} comments to {comments_filepath}")
+                        update_status_for_post(sheet, result.job.row_index, "Success", len(comments), comments_filepath, buffer=sheet_writes)
+                        if checkpoints:
+                            checkpoints.save_post(brand_name, url, new_comments)
+
+                    except Exception as e:
+                        print(f"Failed to save comments for {url}: {e}")
+                        failed_posts += 1
+                        update_status_for_post(sheet, result.job.row_index, f"Error: {e}", buffer=sheet_writes)
+
+            # Out of time budget: the posts not started stay unmarked, so the next run picks them up.
+            deferred = [job for job in jobs if job.url not in finished_urls]
+            if deferred:
+                deferred_posts += len(deferred)
+                print(f"[INFO] '{brand_name}' used its {plan.budget:g}s time budget. "
+                      f"{len(deferred)} post(s) deferred to the next run.")
+
+            # Comments streamed from a post that later failed were still analyzed, so the
+            # pipeline's report is the one to use whenever it has one.
+            with span('analysis_wait', brand=brand_name):
+                vader_results = pipeline.finish_brand(brand_name) if pipeline else None
+            if not all_brand_comments and not vader_results:
+                if previous_report is not None:
+                    print(f"No new comments for brand '{brand_name}' since the previous run. Report unchanged.")
+                else:
+                    print(f"No comments collected for brand '{brand_name}'. Skipping report generation.")
                 continue
 
             # --- Create reports directory ---
-            reports_dir = "social_sentiment_analyzer/reports"
             os.makedirs(reports_dir, exist_ok=True)
 
             # --- VADER Analysis ---
-            print(f"\nAnalyzing {len(all_brand_comments)} comments for '{brand_name}' using VADER...")
-            vader_results = analyze_comments_vader(all_brand_comments)
-
-            vader_report_path = os.path.join(reports_dir, f"{sanitize_filename(brand_name)}_sentiment_analysis_vader.json")
-            with open(vader_report_path, 'w', encoding='utf-8') as f:
-                json.dump(vader_results, f, ensure_ascii=False, indent=4)
+            if vader_results is None:
+                print(f"\nAnalyzing {len(all_brand_comments)} comments for '{brand_name}' using VADER...")
+                with span('analysis', brand=brand_name, comments=len(all_brand_comments)):
+                    vader_results = analyze_comments_vader(all_brand_comments, executor=scoring_pool)
+            else:
+                print(f"\nStreaming VADER analysis finished for {len(vader_results['analyzed_comments'])} comments of '{brand_name}'.")
+            if previous_report is not None:
+                vader_results = merge_reports(previous_report, vader_results)
+                print(f"[INFO] Merged into the previous report ({len(vader_results['analyzed_comments'])} comments in total).")
+            # Reply threads come from the saved comment files, which cover every post of
+            # the brand (resumed, skipped and incremental ones included).
+            if EXPAND_REPLIES:
+                rows = []
+                for task in plan.tasks + plan.skipped:
+                    rows.extend(read_comment_rows(comments_path(data_dir, brand_name, task.url)) or [])
+                vader_results['threads'] = reply_threads(rows)
+
+            # With a compact STORAGE_FORMAT, per-comment scores go to the brand's partition
+            # and the JSON report keeps only the summary.
+            with span('report_write', brand=brand_name):
+                write_report(vader_report_path, vader_results, scores_path(data_dir, brand_name))
             print(f"VADER analysis report saved to {vader_report_path}")
 
-            vader_barchart_path = os.path.join(reports_dir, f"{sanitize_filename(brand_name)}_sentiment_barchart_vader.png")
-            create_sentiment_bar_chart(vader_results['sentiment_distribution'], vader_barchart_path)
+            # Charts render on the chart pool (if CHART_WORKERS > 1) while the next brand is scraped.
+            vader_barchart_path = os.path.join(reports_dir, f"{sanitize_filename(brand_name)}_sentiment_barchart_vader.{CHART_FORMAT}")
+            charts.submit(create_sentiment_bar_chart, vader_results['sentiment_distribution'], vader_barchart_path)
 
-            vader_wordcloud_path = os.path.join(reports_dir, f"{sanitize_filename(brand_name)}_wordcloud_vader.png")
-            create_word_cloud([c['translated_text'] for c in vader_results['analyzed_comments'] if c.get('translated_text')], vader_wordcloud_path)
+            vader_wordcloud_path = os.path.join(reports_dir, f"{sanitize_filename(brand_name)}_wordcloud_vader.{CHART_FORMAT}")
+            charts.submit(create_word_cloud_from_frequencies, vader_results['word_frequencies'], vader_wordcloud_path)
+            if checkpoints and not deferred:
+                checkpoints.mark_analyzed(brand_name, vader_report_path, post_count)
 
             # --- Gemini Analysis ---
             # print(f"\nAnalyzing {len(all_brand_comments)} comments for '{brand_name}' using Gemini...")
@@ -254,12 +391,45 @@ def main():
 
             print(f"\n--- Finished processing for {brand_name} ---")
 
+        # The run is complete: drop the checkpoints so the next run scrapes everything
+        # again. If posts failed or were deferred, keep them so a rerun only scrapes those.
+        if checkpoints:
+            if failed_posts or deferred_posts:
+                print(f"[INFO] {failed_posts} post(s) failed and {deferred_posts} deferred. Checkpoints kept: "
+                      f"rerun to scrape only those, or use --force to start over.")
+            else:
+                checkpoints.clear()
+
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}")
     finally:
-        if 'driver' in locals() and driver:
-            driver.quit()
+        pool.close()
+        if pipeline:
+            pipeline.close()
+        if scoring_pool:
+            scoring_pool.shutdown()
+        if checkpoints:
+            checkpoints.close()
+        charts.close()
+        instrumentation.save_run(trace=trace)
         print("\nProcess finished.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape Instagram comments for every brand tab and analyze their sentiment.")
+    parser.add_argument('--force', action='store_true',
+                        help="ignore checkpoints from an interrupted run and re-scrape every post, including completed ones")
+    parser.add_argument('--force-post', action='append', default=[], metavar='URL',
+                        help="re-scrape this post even if it is marked Success or an interrupted run completed it (repeatable)")
+    parser.add_argument('--force-brand', action='append', default=[], metavar='NAME',
+                        help="re-scrape every post of this brand tab (repeatable)")
+    parser.add_argument('--incremental', action='store_true', default=None,
+                        help="only fetch and analyze comments added since the previous run (see INCREMENTAL_RESCRAPE)")
+    parser.add_argument('--rescrape-completed', action='store_true', default=None,
+                        help="also re-scrape rows already marked Success (see SKIP_COMPLETED_POSTS)")
+    parser.add_argument('--profile', action='store_true',
+                        help="run the hot paths (post scraping, translation, scoring, charts) under cProfile")
+    parser.add_argument('--trace', action='store_true', default=None,
+                        help="also write a Chrome trace of the run's timing spans (see CHROME_TRACE)")
+    args = parser.parse_args()
+    main(force=args.force, force_posts=args.force_post, force_brands=args.force_brand, incremental=args.incremental,
+         rescrape_completed=args.rescrape_completed, profile=args.profile, trace=args.trace)
@@ -0,0 +1,90 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Sequence
+
+from config import ADAPTIVE_WAIT_MIN_POLL, ADAPTIVE_WAIT_MAX_TIMEOUT
+
+# Returns the drawer's scrollHeight (arguments[0]) and the number of comment containers
+# matching arguments[1]; either one growing means new content has arrived.
+JS_DRAWER_STATE = """
+    return [arguments[0] ? arguments[0].scrollHeight : 0, document.querySelectorAll(arguments[1]).length];
+"""
+
+
+class AdaptiveWaiter:
+    """
+    Waits for content instead of sleeping for fixed periods.
+
+    wait_for_growth() polls a probe until it reports growth, and keeps a moving average
+    of how long content has actually taken to arrive. That average sets both the poll
+    interval and how long to keep waiting before deciding nothing more is coming, so a
+    fast-loading drawer is polled tightly and given up on quickly, while a slow one gets
+    more patience (up to max_timeout).
+
+    Every wait is accounted for, so stats() can report time spent waiting versus working
+    for one post.
+    """
+
+    def __init__(self, min_poll: float = ADAPTIVE_WAIT_MIN_POLL, max_timeout: float = ADAPTIVE_WAIT_MAX_TIMEOUT):
+        self.min_poll = min_poll
+        self.max_timeout = max_timeout
+        self.load_latency = None
+        self.wait_seconds = 0.0
+        self.growth_events = 0
+        self.timeouts = 0
+        self._started = time.monotonic()
+
+    def sleep(self, seconds: float):
+        """A fixed sleep that is still counted as waiting time."""
+        time.sleep(seconds)
+        self.wait_seconds += seconds
+
+    @contextmanager
+    def waiting(self):
+        """Counts the duration of the enclosed block (e.g. a WebDriverWait) as waiting time."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.wait_seconds += time.monotonic() - start
+
+    def timeout(self) -> float:
+        if self.load_latency is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_poll * 5, self.load_latency * 3))
+
+    def poll_interval(self) -> float:
+        if self.load_latency is None:
+            return self.min_poll
+        return max(self.min_poll, min(self.load_latency / 4, 1.0))
+
+    def wait_for_growth(self, probe: Callable[[], Sequence[float]], baseline: Sequence[float]) -> bool:
+        """Polls probe() until any of its values exceeds the matching baseline value.
+
+        Returns True as soon as growth is seen, False if the adaptive timeout passes first.
+        """
+        with self.waiting():
+            start = time.monotonic()
+            deadline = start + self.timeout()
+            while True:
+                current = probe()
+                if any(c > b for c, b in zip(current, baseline)):
+                    latency = time.monotonic() - start
+                    self.load_latency = latency if self.load_latency is None else 0.7 * self.load_latency + 0.3 * latency
+                    self.growth_events += 1
+                    return True
+                if time.monotonic() >= deadline:
+                    self.timeouts += 1
+                    return False
+                time.sleep(self.poll_interval())
+
+    def stats(self) -> Dict:
+        total = time.monotonic() - self._started
+        return {
+            'total_seconds': round(total, 2),
+            'wait_seconds': round(self.wait_seconds, 2),
+            'work_seconds': round(max(total - self.wait_seconds, 0.0), 2),
+            'growth_events': self.growth_events,
+            'timeouts': self.timeouts,
+            'avg_load_latency': round(self.load_latency, 3) if self.load_latency is not None else None,
+        }
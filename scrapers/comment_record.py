@@ -0,0 +1,120 @@
+import hashlib
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+def comment_key(comment_id: Optional[str], author: Optional[str], text: str, occurrence: Optional[int] = None,
+                parent_key: Optional[int] = None) -> int:
+    """
+    Stable 64-bit identity of a comment: its Instagram ID when known, otherwise a hash of
+    (author, text, occurrence), plus the parent's key for replies. occurrence tells apart
+    repeats of the same text by the same author; unlike a drawer index, it does not change
+    when threads open or comments render above. Unlike hash(), the value is the same in
+    every process and run, so two users posting the same text stay two comments.
+    """
+    if comment_id:
+        payload = f"id\x1f{comment_id}"
+    else:
+        payload = f"{author or ''}\x1f{text}\x1f{occurrence or 0}"
+        if parent_key is not None:
+            payload += f"\x1f{parent_key}"
+    return int.from_bytes(hashlib.blake2b(payload.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _epoch_seconds(created_at) -> Optional[int]:
+    """Unix time of a timestamp from the API (already seconds) or a <time datetime="..."> attribute (ISO 8601)."""
+    if created_at is None or isinstance(created_at, int):
+        return created_at
+    try:
+        return int(datetime.fromisoformat(str(created_at).replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        return None
+
+
+class CommentRecord:
+    """
+    One scraped comment. __slots__ keeps it to a fixed set of fields, with no per-instance
+    __dict__; author names are interned, since the same commenters recur across posts.
+
+    position is the comment's index in the drawer (0 is the caption on the DOM path) or
+    its order in the API responses. created_at is Unix time in seconds on both paths;
+    created_at and like_count are None when the page does not show them. Replies carry
+    their parent comment's key in parent_key, and position is their index in the thread.
+    occurrence numbers earlier comments with the same author and text (see comment_key).
+    """
+
+    __slots__ = ('key', 'comment_id', 'author', 'text', 'created_at', 'like_count', 'position', 'occurrence',
+                 'parent_key')
+
+    def __init__(self, text: str, author: Optional[str] = None, comment_id: Optional[str] = None,
+                 created_at=None, like_count: Optional[int] = None, position: Optional[int] = None,
+                 parent_key: Optional[int] = None, occurrence: Optional[int] = None):
+        self.comment_id = comment_id or None
+        self.author = sys.intern(author) if author else None
+        self.text = text
+        self.created_at = _epoch_seconds(created_at)
+        self.like_count = like_count
+        self.position = position
+        self.occurrence = occurrence
+        self.parent_key = parent_key
+        self.key = comment_key(self.comment_id, self.author, text, occurrence, parent_key)
+
+    @classmethod
+    def from_dict(cls, data: Dict, position: Optional[int] = None) -> 'CommentRecord':
+        """Builds a record from a network capture record or the output of as_dict()."""
+        return cls(data['text'], author=data.get('author'), comment_id=data.get('id'),
+                   created_at=data.get('created_at'), like_count=data.get('like_count'),
+                   position=data.get('position', position), parent_key=data.get('parent_key'),
+                   occurrence=data.get('occurrence'))
+
+    def as_dict(self) -> Dict:
+        return {
+            'id': self.comment_id, 'author': self.author, 'text': self.text,
+            'created_at': self.created_at, 'like_count': self.like_count, 'position': self.position,
+            'occurrence': self.occurrence, 'parent_key': self.parent_key,
+        }
+
+    def __repr__(self):
+        parent = f", parent_key={self.parent_key}" if self.parent_key is not None else ""
+        return f"CommentRecord(author={self.author!r}, text={self.text!r}, position={self.position}{parent})"
+
+
+class CommentCollection:
+    """
+    The comments of one post (and their replies, if expanded) in the order they were
+    first seen, deduplicated by CommentRecord.key. The caption is kept apart (see
+    set_caption), never as a comment.
+    """
+
+    def __init__(self):
+        self._records: Dict[int, CommentRecord] = {}
+        self.caption: Optional[CommentRecord] = None
+
+    def add(self, record: CommentRecord) -> bool:
+        """Adds a record; returns False if the comment was already collected."""
+        if record.key in self._records or (self.caption is not None and record.key == self.caption.key):
+            return False
+        self._records[record.key] = record
+        return True
+
+    def set_caption(self, record: CommentRecord):
+        self.caption = record
+        self._records.pop(record.key, None)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[CommentRecord]:
+        return iter(self._records.values())
+
+    def texts(self) -> List[str]:
+        return [record.text for record in self._records.values()]
+
+
+def is_caption(record: CommentRecord, owner: Optional[str] = None) -> bool:
+    """
+    True for the post caption on the DOM path: the drawer's first container, written by
+    the post's owner. Without a known owner, the first container is taken as the caption.
+    """
+    return record.parent_key is None and record.position == 0 and (owner is None or record.author == owner)
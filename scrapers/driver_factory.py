@@ -0,0 +1,261 @@
+import atexit
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+
+from config import CAPTURE_MODE, SESSION_POOL_SIZE, BROWSER_PROFILE
+from scrapers.network_capture import enable_network_capture
+from utils.instrumentation import span
+
+MOBILE_EMULATION = {
+    "deviceMetrics": {"width": 414, "height": 896, "pixelRatio": 3},
+    "userAgent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1"
+}
+USER_AGENTS = [
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1"
+]
+
+BROWSER_PROFILES = ('default', 'lean')
+# Requests the 'lean' profile blocks through CDP: images, video and fonts (we only read
+# text) and third-party analytics/ad scripts. Instagram's own scripts and the comments
+# API are left alone, and icons such as the Comment button are inline SVG.
+LEAN_BLOCKED_URLS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.heic', '*.ico',
+    '*.mp4', '*.m4s', '*.m4a', '*.webm', '*.mov', '*.mp3',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*://scontent*.cdninstagram.com/*', '*://*.fbcdn.net/v/*',
+    '*://connect.facebook.net/*', '*://*.google-analytics.com/*', '*://*.googletagmanager.com/*',
+    '*://*.doubleclick.net/*',
+]
+
+def _check_profile(profile: Optional[str]) -> str:
+    profile = profile or BROWSER_PROFILE
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile: {profile}")
+    return profile
+
+
+def build_chrome_options(capture_mode: Optional[str] = None, profile: Optional[str] = None) -> webdriver.ChromeOptions:
+    """
+    ChromeOptions for mobile emulation with the anti-detection settings, headless if
+    HEADLESS is set. The opt-in 'lean' profile (see BROWSER_PROFILE) also turns off image
+    loading and media autoplay; see apply_browser_profile for the rest.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_experimental_option("mobileEmulation", MOBILE_EMULATION)
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--window-size=430,930')  # Match a mobile device
+
+    # Enhanced anti-detection measures
+    options.add_argument('--disable-web-security')
+    options.add_argument('--allow-running-insecure-content')
+    options.add_argument('--disable-features=VizDisplayCompositor')
+    options.add_argument('--disable-extensions')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f'--user-agent={random.choice(USER_AGENTS)}')
+    if (capture_mode or CAPTURE_MODE) == 'network':
+        enable_network_capture(options)
+    if _check_profile(profile) == 'lean':
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        options.add_argument('--autoplay-policy=user-gesture-required')
+
+    if os.environ.get('HEADLESS', '0').lower() in ['1', 'true', 'yes']:
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        print("[INFO] Running in headless mode.")
+    else:
+        print("[INFO] Running in headed (UI) mode.")
+    return options
+
+
+def apply_browser_profile(driver, profile: Optional[str] = None):
+    """For the 'lean' profile, blocks LEAN_BLOCKED_URLS in the driver's tab through CDP."""
+    if _check_profile(profile) == 'lean':
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+
+
+def create_driver(capture_mode: Optional[str] = None, profile: Optional[str] = None) -> Optional[webdriver.Chrome]:
+    """Launches a Chrome driver with build_chrome_options(). Returns None if Chrome fails to start."""
+    print(f"Launching Chrome browser for Selenium (mobile emulation, {_check_profile(profile)} profile)...")
+    try:
+        driver = webdriver.Chrome(options=build_chrome_options(capture_mode, profile))
+        apply_browser_profile(driver, profile)
+        # Remove webdriver properties to avoid detection
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        print("Chrome browser launched successfully.")
+        return driver
+    except Exception as e:
+        print(f"Failed to launch Chrome browser: {e}")
+        return None
+
+
+def wait_for_manual_login(driver, seconds: int = 30):
+    """Opens Instagram and gives the user time to log in by hand in the browser window."""
+    driver.get("https://www.instagram.com/")
+    print(f"Please manually handle the login in the browser window if required. Waiting for {seconds} seconds...")
+    time.sleep(seconds)
+
+
+class SessionPool:
+    """
+    Authenticated browser sessions, started ahead of time and reused across scrapes.
+
+    factory launches a driver (create_driver by default) and authenticate, if given, logs it
+    in once. warm() starts sessions up front; acquire() hands out an idle session after a
+    health check, replacing dead ones, and starts a new session only if none is idle;
+    release() returns it for the next caller. stats() reports per-driver startup time and
+    how often sessions were reused or recycled.
+    """
+
+    def __init__(self, factory: Callable = create_driver, authenticate: Optional[Callable] = None,
+                 size: int = SESSION_POOL_SIZE):
+        self.factory = factory
+        self.authenticate = authenticate
+        self.size = max(1, size)
+        self.startup_seconds: List[float] = []
+        self.reuses = 0
+        self.recycled = 0
+        self._idle = []
+        self._sessions = []
+        self._used = set()
+        self._lock = threading.Lock()
+
+    def _start_session(self):
+        start = time.monotonic()
+        with span('driver_startup'):
+            driver = self.factory()
+        if driver is None:
+            return None
+        if self.authenticate:
+            with span('auth'):
+                self.authenticate(driver)
+        elapsed = time.monotonic() - start
+        print(f"[INFO] Browser session {len(self.startup_seconds) + 1} ready in {elapsed:.1f}s.")
+        with self._lock:
+            self.startup_seconds.append(elapsed)
+            self._sessions.append(driver)
+        return driver
+
+    def warm(self, count: Optional[int] = None) -> int:
+        """
+        Starts sessions until count (default size) are idle, one after another so a manual
+        login on the first can save the cookies the others load. Returns the idle count.
+        """
+        target = count or self.size
+        while len(self._idle) < target:
+            driver = self._start_session()
+            if driver is None:
+                break
+            with self._lock:
+                self._idle.append(driver)
+        return len(self._idle)
+
+    @staticmethod
+    def is_alive(driver) -> bool:
+        """Health check: the browser still answers a trivial script."""
+        try:
+            driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            if driver in self._sessions:
+                self._sessions.remove(driver)
+            self._used.discard(id(driver))
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Returns a healthy session, or None if no browser could be started."""
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self._start_session()
+                if driver is None:
+                    return None
+            elif not self.is_alive(driver):
+                print("[WARNING] Browser session is no longer responding. Replacing it.")
+                self.recycled += 1
+                self._discard(driver)
+                continue
+            self.note_use(driver)
+            return driver
+
+    def note_use(self, driver):
+        """Counts a use of a session; every use after its first is a reuse."""
+        with self._lock:
+            if id(driver) in self._used:
+                self.reuses += 1
+            self._used.add(id(driver))
+
+    def release(self, driver):
+        """Returns a session to the pool, or discards it if it has died."""
+        if driver is None:
+            return
+        if self.is_alive(driver):
+            with self._lock:
+                self._idle.append(driver)
+        else:
+            self.recycled += 1
+            self._discard(driver)
+
+    def recycle(self, driver):
+        """Replaces a session that has died (or is misbehaving) with a fresh one. Returns the new session or None."""
+        self.recycled += 1
+        self._discard(driver)
+        return self.acquire()
+
+    def stats(self) -> Dict:
+        started = len(self.startup_seconds)
+        return {
+            'sessions_started': started,
+            'startup_seconds': [round(s, 2) for s in self.startup_seconds],
+            'avg_startup_seconds': round(sum(self.startup_seconds) / started, 2) if started else 0,
+            'reuses': self.reuses,
+            'recycled': self.recycled,
+        }
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions, self._idle = self._sessions, [], []
+        for driver in sessions:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        stats = self.stats()
+        if stats['sessions_started']:
+            print(f"[INFO] Browser sessions: {stats['sessions_started']} started "
+                  f"(avg {stats['avg_startup_seconds']}s), {stats['reuses']} reuses, {stats['recycled']} recycled.")
+
+
+_default_pools: Dict[str, SessionPool] = {}
+_default_pools_lock = threading.Lock()
+
+
+def default_session_pool(capture_mode: Optional[str] = None) -> SessionPool:
+    """
+    The shared pool get_comments_from_post uses when no driver is passed: one per capture
+    mode, logged in by hand once per session, closed when the interpreter exits.
+    """
+    capture_mode = capture_mode or CAPTURE_MODE
+    with _default_pools_lock:
+        if capture_mode not in _default_pools:
+            pool = SessionPool(lambda: create_driver(capture_mode), authenticate=wait_for_manual_login)
+            atexit.register(pool.close)
+            _default_pools[capture_mode] = pool
+        return _default_pools[capture_mode]
@@ -5,11 +5,185 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
 import time
-from typing import List, Optional
-import os
+from typing import AbstractSet, Callable, Dict, List, Optional, Tuple
 import random
 import re
 from selenium.webdriver.common.action_chains import ActionChains
+from config import (DOM_EXTRACTION_MODE, ADAPTIVE_WAITS, CAPTURE_MODE, INCREMENTAL_STOP_CYCLES, EXPAND_REPLIES,
+                    REPLY_EXPAND_BATCH, MAX_REPLIES_PER_POST)
+from scrapers.adaptive_wait import AdaptiveWaiter, JS_DRAWER_STATE
+from scrapers.network_capture import NetworkCommentCapture
+from scrapers.comment_record import CommentRecord, CommentCollection, comment_key, is_caption
+from scrapers.driver_factory import default_session_pool
+from utils.instrumentation import get_instrumentation
+
+# Reads one comment container: the text of the last 'span._ap3a' (the comment body),
+# the first span that sits inside a link (the author) and whether the body span itself
+# sits inside a link, which is how the per-element path tells usernames and mentions
+# apart from comment text, plus the timestamp, like count and comment ID (from the
+# container's /c/<id>/ permalink) when the container shows them. With a scope (the
+# container selector; used when reply threads are expanded) only the container's own
+# elements are read, not those of replies rendered inside it; without one, everything
+# under the container is, as the per-element path does. position is the container's
+# index among the containers topLevel returns or, for replies, in its thread.
+# topLevel(selector, threads) returns every container matching selector, or with
+# threads only those not nested in another one. occurrence numbers containers with the
+# same author and text in the order they were first read; it is stored on the
+# container, so it does not change when threads open or comments render above it.
+# Returns null for containers that have no spans yet.
+_JS_READ_CONTAINER = """
+    function own(div, query, scope) {
+        const found = Array.from(div.querySelectorAll(query));
+        return scope ? found.filter(el => el.closest(scope) === div) : found;
+    }
+    function topLevel(selector, threads) {
+        const all = Array.from(document.querySelectorAll(selector));
+        return threads ? all.filter(div => !div.parentElement.closest(selector)) : all;
+    }
+    function readContainer(div, position, scope) {
+        const spans = own(div, 'span._ap3a', scope);
+        if (!spans.length) {
+            return null;
+        }
+        const target = spans[spans.length - 1];
+        let author = null;
+        for (let j = 0; j < spans.length; j++) {
+            if (spans[j].closest('a')) {
+                author = spans[j].innerText;
+                break;
+            }
+        }
+        const time = own(div, 'time', scope)[0];
+        let likes = null;
+        for (const span of own(div, 'span', scope)) {
+            const match = /^([\\d,.]+)\\s+likes?$/i.exec(span.textContent.trim());
+            if (match) {
+                likes = parseInt(match[1].replace(/[,.]/g, ''), 10);
+                break;
+            }
+        }
+        let id = null;
+        for (const link of own(div, 'a[href*="/c/"]', scope)) {
+            const match = /\\/c\\/(\\d+)/.exec(link.getAttribute('href'));
+            if (match) {
+                id = match[1];
+                break;
+            }
+        }
+        if (!div.hasAttribute('data-occurrence')) {
+            const seen = window.__commentOccurrences = window.__commentOccurrences || new Map();
+            const identity = (author || '') + '\\u001f' + target.innerText;
+            const count = seen.get(identity) || 0;
+            seen.set(identity, count + 1);
+            div.setAttribute('data-occurrence', String(count));
+        }
+        return {
+            id: id,
+            text: target.innerText,
+            author: author,
+            in_link: target.closest('a') !== null,
+            created_at: time ? time.getAttribute('datetime') : null,
+            like_count: likes,
+            position: position,
+            occurrence: parseInt(div.getAttribute('data-occurrence'), 10)
+        };
+    }
+"""
+
+# Reads every comment container in one round trip; with arguments[1] (reply threads
+# expanded) only the top-level ones, each without its replies.
+JS_EXTRACT_COMMENTS = _JS_READ_CONTAINER + """
+    const scope = arguments[1] ? arguments[0] : null;
+    return topLevel(arguments[0], arguments[1]).map((div, i) => readContainer(div, i, scope));
+"""
+
+# Reads only containers that have not been visited yet and tags them with
+# data-scraped so the next cycle skips them. Containers that are not rendered yet are
+# left untagged and picked up on a later cycle. arguments[1] is as for
+# JS_EXTRACT_COMMENTS.
+JS_EXTRACT_NEW_COMMENTS = _JS_READ_CONTAINER + """
+    const scope = arguments[1] ? arguments[0] : null;
+    const containers = topLevel(arguments[0], arguments[1]);
+    const entries = [];
+    for (let i = 0; i < containers.length; i++) {
+        if (containers[i].hasAttribute('data-scraped')) {
+            continue;
+        }
+        const entry = readContainer(containers[i], i, scope);
+        if (entry === null) {
+            continue;
+        }
+        containers[i].setAttribute('data-scraped', '1');
+        entries.push(entry);
+    }
+    return {entries: entries, total: containers.length};
+"""
+
+# Number of containers the extraction scripts would read (arguments[1] as for
+# JS_EXTRACT_COMMENTS), so waits compare like with like against their counts.
+JS_COUNT_CONTAINERS = _JS_READ_CONTAINER + """
+    return topLevel(arguments[0], arguments[1]).length;
+"""
+
+# Reply threads render inside their parent comment's container. Finds every reply-thread
+# control ("View replies (3)", "View all 5 replies", "View 2 more replies") in one pass,
+# innermost elements only, and clicks up to arguments[0] of them. A clicked control is
+# tagged with its text so it is not clicked again unless its text changes. Returns
+# [clicked, still unclicked].
+JS_EXPAND_REPLIES = """
+    const pattern = /^[\\s\\u2014-]*view\\s+(all\\s+)?(\\d+\\s+)?(more\\s+)?repl(y|ies)\\b/i;
+    const controls = Array.from(document.querySelectorAll('span, button, div[role="button"]')).filter(el => {
+        const text = el.textContent.trim();
+        return pattern.test(text) && el.getAttribute('data-expanded') !== text &&
+            !Array.from(el.children).some(child => pattern.test(child.textContent.trim()));
+    });
+    const batch = controls.slice(0, arguments[0]);
+    batch.forEach(el => {
+        el.setAttribute('data-expanded', el.textContent.trim());
+        el.click();
+    });
+    return [batch.length, controls.length - batch.length];
+"""
+
+# Reads every reply: a comment container nested in another one. position is its index
+# within the thread and parent the top-level container it belongs to, read the same way
+# the extraction scripts read it (its position among the top-level containers, ID,
+# author, text and occurrence), so the parent's key can be rebuilt from it.
+JS_EXTRACT_REPLIES = _JS_READ_CONTAINER + """
+    const selector = arguments[0];
+    const parents = new Map(topLevel(selector, true).map((div, i) => [div, i]));
+    const threadSizes = new Map();
+    const replies = [];
+    for (const div of document.querySelectorAll(selector)) {
+        if (parents.has(div)) {
+            continue;
+        }
+        let parent = div.parentElement.closest(selector);
+        while (!parents.has(parent)) {
+            parent = parent.parentElement.closest(selector);
+        }
+        const index = threadSizes.get(parent) || 0;
+        threadSizes.set(parent, index + 1);
+        const entry = readContainer(div, index, selector);
+        if (entry !== null) {
+            entry.parent = readContainer(parent, parents.get(parent), selector);
+            replies.push(entry);
+        }
+    }
+    return replies;
+"""
+
+# Username of the post's owner from the post page header, for caption detection.
+JS_POST_OWNER = """
+    const link = document.querySelector('header a[href^="/"]');
+    return link ? link.getAttribute('href').split('/').filter(Boolean)[0] || null : null;
+"""
+
+JS_SCROLL_TO_BOTTOM = """
+    arguments[0].scrollTop = arguments[0].scrollHeight;
+    var event = new Event('scroll', { bubbles: true });
+    arguments[0].dispatchEvent(event);
+"""
 
 def clean_comment_text(text: str) -> str:
     """Cleans comment text by removing trailing '... more' and extra whitespace."""
@@ -18,65 +192,297 @@ def clean_comment_text(text: str) -> str:
     cleaned_text = re.sub(r'\s*\.\.\.\s*more$', '', text.strip(), flags=re.IGNORECASE | re.DOTALL)
     return cleaned_text.strip()
 
-def get_comments_from_post(url: str, scrolls: int = 50, driver: Optional[webdriver.Chrome] = None) -> List[str]:
-    """Scrapes only top-level comments from an Instagram post using mobile emulation and the comments icon."""
-    close_driver = False
+def extract_comments_per_element(driver, selector: str, threads: bool = False) -> Tuple[List[CommentRecord], int]:
+    """Legacy extraction: walks every comment container with individual WebDriver calls.
+
+    Returns a CommentRecord (text, author and drawer position) per comment and the number
+    of containers seen. Containers with the same author and text are numbered in drawer
+    order (occurrence), as the extraction scripts do. With threads (reply expansion on),
+    containers nested in another one are replies and are left to the reply stage.
+    """
+    found = []
+    comment_divs = driver.find_elements(By.CSS_SELECTOR, selector)
+    if threads:
+        nested = set(driver.find_elements(By.CSS_SELECTOR, f"{selector} {selector}"))
+        comment_divs = [div for div in comment_divs if div not in nested]
+    occurrences: Dict[Tuple[Optional[str], str], int] = {}
+    for position, div in enumerate(comment_divs):
+        try:
+            spans = div.find_elements(By.CSS_SELECTOR, 'span._ap3a')
+            if not spans: continue
+            target_span = spans[-1]
+            target_span.find_element(By.XPATH, './ancestor::a')
+        except NoSuchElementException:
+            comment_text = target_span.text.strip()
+            cleaned_text = clean_comment_text(comment_text)
+            if cleaned_text:
+                authors = div.find_elements(By.CSS_SELECTOR, 'a span._ap3a')
+                author = authors[0].text if authors else None
+                occurrence = occurrences.get((author, cleaned_text), 0)
+                occurrences[(author, cleaned_text)] = occurrence + 1
+                found.append(CommentRecord(cleaned_text, author=author, position=position, occurrence=occurrence))
+        except Exception:
+            continue
+    return found, len(comment_divs)
+
+def _filter_comment_entries(entries) -> Tuple[List[CommentRecord], int]:
+    """Applies the per-element filtering rules to entries returned by the extraction scripts.
+
+    Returns a CommentRecord per comment and the number of WebDriver round trips the
+    per-element path would have needed for the same containers.
+    """
+    found = []
+    # Per-element cost: 1 find_elements for the containers, then per container one
+    # find_elements for the spans, one find_element for the ancestor link and, when
+    # there is no link, one more call to read .text.
+    element_round_trips = 1
+    for entry in entries:
+        element_round_trips += 1
+        if not entry:
+            continue
+        element_round_trips += 1
+        if entry.get('in_link'):
+            continue
+        element_round_trips += 1
+        cleaned_text = clean_comment_text((entry.get('text') or '').strip())
+        if cleaned_text:
+            found.append(CommentRecord(cleaned_text, author=entry.get('author'), comment_id=entry.get('id'),
+                                       created_at=entry.get('created_at'), like_count=entry.get('like_count'),
+                                       position=entry.get('position'), occurrence=entry.get('occurrence')))
+    return found, element_round_trips
+
+def extract_comments_bulk(driver, selector: str, threads: bool = False) -> Tuple[List[CommentRecord], int]:
+    """Single-pass extraction: reads every comment container in one execute_script call.
+
+    Applies the same filtering as extract_comments_per_element (skip containers without
+    'span._ap3a', skip bodies inside a link, drop empty text) and logs how many WebDriver
+    round trips the per-element path would have needed for the same containers.
+
+    With threads (reply expansion on), containers nested in another one are replies and
+    are left to the reply stage, and each container is read without its replies.
+
+    Returns a CommentRecord per comment and the number of containers seen.
+    """
+    entries = driver.execute_script(JS_EXTRACT_COMMENTS, selector, threads) or []
+    found, element_round_trips = _filter_comment_entries(entries)
+    print(f"[INFO] Bulk extraction read {len(entries)} containers in 1 round trip "
+          f"(saved {element_round_trips - 1} WebDriver calls this cycle).")
+    return found, len(entries)
+
+def extract_comments_incremental(driver, selector: str, threads: bool = False) -> Tuple[List[CommentRecord], int]:
+    """Incremental extraction: reads only containers added since the previous cycle.
+
+    Visited containers are tagged in the page, so the per-cycle cost scales with the
+    number of new comments rather than the size of the drawer. Filtering (and threads)
+    is the same as extract_comments_bulk.
+
+    Returns a CommentRecord per comment in the new containers and the total number of
+    containers on the page.
+    """
+    result = driver.execute_script(JS_EXTRACT_NEW_COMMENTS, selector, threads) or {}
+    entries = result.get('entries') or []
+    total = result.get('total', len(entries))
+    found, _ = _filter_comment_entries(entries)
+    print(f"[INFO] Incremental extraction read {len(entries)} new of {total} containers in 1 round trip.")
+    return found, total
+
+def newest_first(records) -> Optional[bool]:
+    """
+    Whether the top-level comments' timestamps never increase in drawer order, i.e. the
+    drawer lists newest comments first. None when fewer than two comments have one.
+    """
+    dated = sorted((record for record in records
+                    if record.parent_key is None and record.created_at is not None and record.position is not None),
+                   key=lambda record: record.position)
+    if len(dated) < 2:
+        return None
+    return all(earlier.created_at >= later.created_at for earlier, later in zip(dated, dated[1:]))
+
+def expand_reply_threads(driver, waiter: AdaptiveWaiter, selector: str, max_replies: Optional[int] = None,
+                         batch_size: Optional[int] = None) -> int:
+    """Opens reply threads until none are left or max_replies (default MAX_REPLIES_PER_POST) replies are on the page.
+
+    Each pass clicks up to batch_size (default REPLY_EXPAND_BATCH) "View replies" controls
+    in a single execute_script call, with no pause between clicks, so their replies load
+    concurrently; then it waits once for replies to appear. Returns the number of
+    controls clicked.
+    """
+    max_replies = max_replies or MAX_REPLIES_PER_POST
+    batch_size = batch_size or REPLY_EXPAND_BATCH
+    nested_selector = f"{selector} {selector}"
+    probe = lambda: [driver.execute_script("return document.querySelectorAll(arguments[0]).length;", nested_selector)]
+    clicked = 0
+    while True:
+        baseline = probe()
+        if baseline[0] >= max_replies:
+            break
+        batch, remaining = driver.execute_script(JS_EXPAND_REPLIES, batch_size)
+        if not batch:
+            break
+        clicked += batch
+        if not waiter.wait_for_growth(probe, baseline) and not remaining:
+            break
+    # Threads from the last passes may still be loading; wait until the count settles.
+    while clicked and probe()[0] < max_replies and waiter.wait_for_growth(probe, probe()):
+        pass
+    return clicked
+
+def extract_replies(driver, selector: str, parents: Dict[int, CommentRecord], limit: int) -> List[CommentRecord]:
+    """Reads up to limit replies, linked through parent_key to their parent in parents (keyed by CommentRecord.key)."""
+    entries = driver.execute_script(JS_EXTRACT_REPLIES, selector) or []
+    replies = []
+    for entry in entries:
+        if len(replies) >= limit:
+            break
+        if entry.get('in_link'):
+            continue
+        text = clean_comment_text((entry.get('text') or '').strip())
+        found = entry.get('parent') or {}
+        parent = parents.get(comment_key(found.get('id'), found.get('author'),
+                                         clean_comment_text((found.get('text') or '').strip()), found.get('occurrence')))
+        if text and parent is not None:
+            replies.append(CommentRecord(text, author=entry.get('author'), comment_id=entry.get('id'),
+                                         created_at=entry.get('created_at'), like_count=entry.get('like_count'),
+                                         position=entry.get('position'), occurrence=entry.get('occurrence'),
+                                         parent_key=parent.key))
+    return replies
+
+def scroll_until_settled(driver, container, selector: str, waiter: AdaptiveWaiter, max_scrolls: int = 30) -> int:
+    """Scrolls the drawer to the bottom for as long as each scroll makes it grow.
+
+    Stops at the first scroll after which neither scrollHeight nor the number of comment
+    containers grows within the waiter's adaptive timeout. Returns the number of scrolls.
+    """
+    probe = lambda: driver.execute_script(JS_DRAWER_STATE, container, selector)
+    scrolls_done = 0
+    while scrolls_done < max_scrolls:
+        baseline = probe()
+        driver.execute_script(JS_SCROLL_TO_BOTTOM, container)
+        scrolls_done += 1
+        if not waiter.wait_for_growth(probe, baseline):
+            break
+    return scrolls_done
+
+def get_comments_from_post(url: str, scrolls: int = 50, driver: Optional[webdriver.Chrome] = None,
+                           extraction_mode: Optional[str] = None, adaptive: Optional[bool] = None,
+                           stats: Optional[Dict] = None, capture_mode: Optional[str] = None,
+                           records: Optional[List[CommentRecord]] = None,
+                           on_comments: Optional[Callable[[List[str]], None]] = None,
+                           known_comments: Optional[AbstractSet[str]] = None,
+                           expand_replies: Optional[bool] = None) -> List[str]:
+    """Scrapes only top-level comments from an Instagram post using mobile emulation and the comments icon.
+
+    If no driver is passed, a session is borrowed from the shared SessionPool for the
+    capture mode (see scrapers.driver_factory): it is launched and logged in once, then
+    reused by later calls.
+
+    extraction_mode selects how visible comments are read each cycle: 'bulk' (one
+    execute_script call), 'incremental' (one call that only reads containers added since
+    the last cycle) or 'element' (per-element lookups). Defaults to DOM_EXTRACTION_MODE.
+
+    adaptive (default ADAPTIVE_WAITS) replaces the fixed scroll sleeps with waits that last
+    only as long as the drawer keeps growing. If a stats dict is passed, it is filled with
+    the post's waiting/working time breakdown and comment throughput.
+
+    capture_mode (default CAPTURE_MODE) selects where comments come from: 'dom' reads the
+    rendered drawer, 'network' parses the JSON responses that feed the drawer through CDP
+    and only scrolls to trigger pagination. The driver must have been created with
+    enable_network_capture() for 'network'. Both return the same list of comment texts.
+
+    Comments are collected as CommentRecords and deduplicated by their key (the comment
+    ID, or a hash of author, text and occurrence), so different users posting the same
+    text are all kept, in the order they appear, and a comment read again after the
+    drawer shifted is not stored twice. A records list, if passed, is filled with the
+    records (author, text and position; the ID in 'network' mode or where the drawer
+    links the comment; timestamp and like count where the page shows them). In 'dom' mode the caption is
+    detected explicitly (the drawer's first container, by the owner named on the post
+    page; see is_caption) and left out.
+
+    If on_comments is passed, it is called after every scrape cycle with the comments
+    first seen in that cycle, so analysis can start before the post is finished.
+
+    expand_replies (default EXPAND_REPLIES) adds a reply stage once the top-level comments
+    are loaded: reply threads are opened in batches (see expand_reply_threads), up to
+    MAX_REPLIES_PER_POST replies are read, each linked to its parent through parent_key,
+    and their texts follow the top-level comments in the returned list. The stage reads
+    the drawer, so it runs in 'dom' capture mode only.
+
+    known_comments, the comments saved for this post by a previous run, turns on
+    incremental scraping: scrolling stops once INCREMENTAL_STOP_CYCLES scrape cycles in a
+    row turn up only known comments, provided the drawer lists newer comments first.
+    That is checked on the comments' timestamps (see newest_first); when they show another
+    order (e.g. "most relevant"), scrolling goes on to the end. Without timestamps the
+    order cannot be checked and is assumed. Known
+    comments are not passed to on_comments. The returned list still includes the known
+    comments that were seen, so callers take the difference for the new ones.
+    """
+    extraction_mode = extraction_mode or DOM_EXTRACTION_MODE
+    capture_mode = capture_mode or CAPTURE_MODE
+    if capture_mode not in ('dom', 'network'):
+        raise ValueError(f"Unknown capture mode: {capture_mode}")
+    if adaptive is None:
+        adaptive = ADAPTIVE_WAITS
+    if expand_replies is None:
+        expand_replies = EXPAND_REPLIES
+    if expand_replies and capture_mode != 'dom':
+        print("[INFO] Reply expansion reads the drawer, so it is skipped in 'network' capture mode.")
+        expand_replies = False
+    waiter = AdaptiveWaiter()
+    reply_stats = None
+    if extraction_mode == 'bulk':
+        extract = extract_comments_bulk
+    elif extraction_mode == 'incremental':
+        extract = extract_comments_incremental
+    elif extraction_mode == 'element':
+        extract = extract_comments_per_element
+    else:
+        raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+
+    # Without a driver, borrow an authenticated session from the shared pool instead of
+    # launching (and logging in) a new browser for every post.
+    sessions = None
     if driver is None:
-        mobile_emulation = {
-            "deviceMetrics": {"width": 414, "height": 896, "pixelRatio": 3},
-            "userAgent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1"
-        }
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option("mobileEmulation", mobile_emulation)
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('--window-size=430,930') # Set a specific window size to better match a mobile device
-        
-        # Enhanced anti-detection measures
-        options.add_argument('--disable-web-security')
-        options.add_argument('--allow-running-insecure-content')
-        options.add_argument('--disable-features=VizDisplayCompositor')
-        options.add_argument('--disable-extensions')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        # Add random user agent rotation
-        user_agents = [
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1",
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1"
-        ]
-        options.add_argument(f'--user-agent={random.choice(user_agents)}')
-        
-        headless_env = os.environ.get('HEADLESS', '0').lower()
-        if headless_env not in ['0', 'false']:
-            options.add_argument('--headless')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            print("[INFO] Running in headless mode.")
-        else:
-            print("[INFO] Running in headed (UI) mode.")
-        
-        driver = webdriver.Chrome(options=options)
-        
-        # Remove webdriver properties to avoid detection
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        close_driver = True
-
-    comments = set()
+        sessions = default_session_pool(capture_mode)
+        driver = sessions.acquire()
+        if driver is None:
+            print("[ERROR] Could not start a browser session.")
+            return []
+
+    comments = CommentCollection()
+    capture = None
+    owner = None
+    instrumentation = get_instrumentation()
+
+    def add_comments(found: List[CommentRecord]) -> Tuple[int, int]:
+        """Records comments; returns how many were new to this scrape and how many of those were not known."""
+        new_comments = []
+        for record in found:
+            if capture is None and comments.caption is None and is_caption(record, owner):
+                comments.set_caption(record)
+            elif comments.add(record):
+                new_comments.append(record)
+        if records is not None:
+            records.extend(new_comments)
+        unknown = [record.text for record in new_comments if not known_comments or record.text not in known_comments]
+        if on_comments and unknown:
+            on_comments(unknown)
+        return len(new_comments), len(unknown)
+
     try:
+        if capture_mode == 'network':
+            capture = NetworkCommentCapture(driver)
+            capture.reset()
+
         # Add random delay before navigation
         time.sleep(random.uniform(2, 5))
-        
+
+        navigation_start = instrumentation.now()
         driver.get(url)
         # On mobile, clicking comments navigates to a new page, so we don't need to do anything special here
         # if the URL already contains /comments/. If not, we will click the icon.
         if "/comments/" not in driver.current_url:
-            if close_driver:
-                print("Please manually handle the login in the browser window if required. Waiting for 30 seconds...")
-                time.sleep(30)
-            else:
-                time.sleep(random.uniform(3, 6))  # Random delay for page load
+            time.sleep(random.uniform(3, 6))  # Random delay for page load
+            owner = driver.execute_script(JS_POST_OWNER)
 
             # --- UPDATED: Handle potential popups by clicking the 'Close' button ---
             try:
@@ -108,10 +514,13 @@ def get_comments_from_post(url: str, scrolls: int = 50, driver: Optional[webdriv
                 print("[INFO] Navigated to comments page.")
             except Exception as e:
                 print(f"Could not find or click comments icon, or failed to navigate: {e}")
+                instrumentation.record('navigation', navigation_start, instrumentation.now() - navigation_start,
+                                       url=url, failed=True)
                 # If it fails, maybe we are on a page without comments, so we can stop.
                 return []
         else:
              print("[INFO] Already on a comments page. Proceeding to scrape.")
+        instrumentation.record('navigation', navigation_start, instrumentation.now() - navigation_start, url=url)
 
         # --- FINALIZED SCRAPING LOGIC (REVERTED TO PROVEN COMMENT FINDING) ---
         try:
@@ -125,27 +534,26 @@ def get_comments_from_post(url: str, scrolls: int = 50, driver: Optional[webdriv
             # 2. Main loop: Scrape first, then decide to scroll.
             max_stalls = 3
             stall_count = 0
+            known_streak = 0
+            unordered = False
             total_scrolls = 0
 
             while stall_count < max_stalls:
                 last_unique_comment_count = len(comments)
+                cycle_start = instrumentation.now()
 
-                # Scrape all visible comment divs using the proven selectors.
-                comment_divs = driver.find_elements(By.CSS_SELECTOR, wait_selector)
-
-                for div in comment_divs:
-                    try:
-                        spans = div.find_elements(By.CSS_SELECTOR, 'span._ap3a')
-                        if not spans: continue
-                        target_span = spans[-1]
-                        target_span.find_element(By.XPATH, './ancestor::a')
-                    except NoSuchElementException:
-                        comment_text = target_span.text.strip()
-                        cleaned_text = clean_comment_text(comment_text)
-                        if cleaned_text:
-                            comments.add(cleaned_text)
-                    except Exception:
-                        continue
+                with instrumentation.span('extract', mode=capture_mode):
+                    if capture:
+                        # Network mode: take comments from the API responses received so far.
+                        new_records = capture.poll()
+                        new_count, unknown_count = add_comments(
+                            [CommentRecord.from_dict(record, position=len(comments) + i) for i, record in enumerate(new_records)]
+                        )
+                        container_count = driver.execute_script(JS_COUNT_CONTAINERS, wait_selector, expand_replies)
+                    else:
+                        # Scrape all visible comment divs using the proven selectors.
+                        visible_comments, container_count = extract(driver, wait_selector, expand_replies)
+                        new_count, unknown_count = add_comments(visible_comments)
                 print(f"After scraping visible content, found {len(comments)} unique comments.")
 
                 if len(comments) == last_unique_comment_count:
@@ -156,6 +564,15 @@ def get_comments_from_post(url: str, scrolls: int = 50, driver: Optional[webdriv
                 if stall_count >= max_stalls:
                     print("[INFO] Reached max stall count. Ending scroll.")
                     break
+                if known_comments and new_count:
+                    known_streak = 0 if unknown_count else known_streak + 1
+                    if known_streak >= INCREMENTAL_STOP_CYCLES and not unordered and newest_first(comments) is False:
+                        print("[INFO] Comments are not listed newest first, so new ones may be further down. "
+                              "Scrolling to the end.")
+                        unordered = True
+                    if known_streak >= INCREMENTAL_STOP_CYCLES and not unordered:
+                        print("[INFO] Reached comments saved by a previous run. Ending scroll.")
+                        break
 
                 # Programmatically find the scrollable container by its functional properties.
                 container = None
@@ -184,14 +601,13 @@ def get_comments_from_post(url: str, scrolls: int = 50, driver: Optional[webdriv
 
                     if container:
                         print("[INFO] Programmatically located the scrollable comments container.")
-                        for _ in range(30):
-                            scroll_script = """
-                            arguments[0].scrollTop = arguments[0].scrollHeight;
-                            var event = new Event('scroll', { bubbles: true });
-                            arguments[0].dispatchEvent(event);
-                            """
-                            driver.execute_script(scroll_script, container)
-                            time.sleep(0.7)
+                        if adaptive:
+                            scrolls_done = scroll_until_settled(driver, container, wait_selector, waiter)
+                            print(f"[INFO] Scrolled {scrolls_done} times until the drawer stopped growing.")
+                        else:
+                            for _ in range(30):
+                                driver.execute_script(JS_SCROLL_TO_BOTTOM, container)
+                                waiter.sleep(0.7)
                     else:
                         raise Exception("Could not programmatically find a scrollable container.")
 
@@ -200,35 +616,74 @@ def get_comments_from_post(url: str, scrolls: int = 50, driver: Optional[webdriv
                 
                 total_scrolls += 1
                 print(f"[INFO] Performed {total_scrolls} scroll-to-bottom cycles on detected drawer.")
-                # Wait for new comments to load (dynamic wait)
-                try:
-                    WebDriverWait(driver, 10).until(
-                        lambda d: len(d.find_elements(By.CSS_SELECTOR, wait_selector)) > len(comment_divs)
-                    )
-                    print("[INFO] New comments loaded after scroll.")
-                except TimeoutException:
-                    print("[INFO] Waited 10s after scroll, no new comments loaded.")
-                time.sleep(1.5)
+                # Wait for new comments to load (dynamic wait). The adaptive scroll above
+                # already waited for the drawer to stop growing.
+                if not adaptive:
+                    try:
+                        with waiter.waiting():
+                            WebDriverWait(driver, 10).until(
+                                lambda d: d.execute_script(JS_COUNT_CONTAINERS, wait_selector, expand_replies)
+                                > container_count
+                            )
+                        print("[INFO] New comments loaded after scroll.")
+                    except TimeoutException:
+                        print("[INFO] Waited 10s after scroll, no new comments loaded.")
+                    waiter.sleep(1.5)
 
                 # 5. Click all 'load more' buttons before scraping
-                click_load_more_buttons(driver)
+                click_load_more_buttons(driver, waiter=waiter if adaptive else None, selector=wait_selector)
+                instrumentation.record('scroll_cycle', cycle_start, instrumentation.now() - cycle_start,
+                                       comments=len(comments))
 
             print(f"Finished loading comments after {total_scrolls} scrolls.")
 
+            if expand_replies:
+                with instrumentation.span('replies'):
+                    reply_start = time.monotonic()
+                    threads = expand_reply_threads(driver, waiter, wait_selector)
+                    parents = {record.key: record for record in comments if record.parent_key is None}
+                    if comments.caption is not None:
+                        parents[comments.caption.key] = comments.caption
+                    new_count, _ = add_comments(extract_replies(driver, wait_selector, parents, MAX_REPLIES_PER_POST))
+                    reply_seconds = time.monotonic() - reply_start
+                reply_stats = {
+                    'reply_threads': threads, 'replies': new_count, 'reply_seconds': round(reply_seconds, 2),
+                    'replies_per_minute': round(new_count / reply_seconds * 60, 1) if reply_seconds else 0,
+                }
+                print(f"[INFO] Expanded {threads} reply threads: {new_count} replies in {reply_seconds:.1f}s "
+                      f"({reply_stats['replies_per_minute']} replies/min).")
+
         except Exception as e:
             print(f"[ERROR] A critical error occurred during the scrape process: {e}")
 
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
-        if close_driver:
-            driver.quit()
-
-    unique_comments = list(comments)
-    if unique_comments:
-        # 5. Restore the simple and effective caption removal heuristic.
-        unique_comments = unique_comments[1:]
-    print(f"Found {len(unique_comments)} unique top-level comments (excluding caption).")
+        if sessions:
+            sessions.release(driver)
+
+    post_stats = waiter.stats()
+    post_stats['capture_mode'] = capture_mode
+    post_stats['comments'] = len(comments)
+    post_stats['comments_per_second'] = round(len(comments) / post_stats['total_seconds'], 2) if post_stats['total_seconds'] else 0
+    if reply_stats:
+        post_stats.update(reply_stats)
+    print(f"[INFO] Post timing: {post_stats['wait_seconds']}s waiting, {post_stats['work_seconds']}s working "
+          f"({post_stats['growth_events']} loads, {post_stats['timeouts']} timeouts), "
+          f"{post_stats['comments_per_second']} comments/s via {capture_mode}.")
+    if stats is not None:
+        stats.update(post_stats)
+
+    # API responses do not include the caption; the DOM path set it aside as it was seen.
+    unique_comments = comments.texts()
+    if capture_mode == 'dom' and comments.caption is None:
+        print("[WARNING] No caption detected; every container was kept as a comment.")
+    if reply_stats:
+        print(f"Found {len(unique_comments)} unique comments (excluding caption), {reply_stats['replies']} of them replies.")
+    else:
+        print(f"Found {len(unique_comments)} unique top-level comments (excluding caption).")
+    if known_comments:
+        print(f"[INFO] {sum(1 for c in unique_comments if c not in known_comments)} of them are new since the previous run.")
     return unique_comments
 
 def handle_verification_challenges(driver):
@@ -269,10 +724,15 @@ def handle_verification_challenges(driver):
     else:
         print("[INFO] Verification check completed.")
 
-def click_load_more_buttons(driver):
-    """Clicks all visible 'View more comments', 'Load more', or 'View more' buttons on the page."""
+def click_load_more_buttons(driver, waiter: Optional[AdaptiveWaiter] = None, selector: str = "div.x1lliihq"):
+    """Clicks all visible 'View more comments', 'Load more', or 'View more' buttons on the page.
+
+    Without a waiter, pauses 1-2 s after each click. With an AdaptiveWaiter, clicks without
+    pausing and then waits once for the drawer to grow.
+    """
     button_texts = ["View more comments", "Load more", "View more"]
     buttons_clicked = 0
+    baseline = driver.execute_script(JS_DRAWER_STATE, None, selector) if waiter else None
     for text in button_texts:
         # Find all buttons or spans with the target text
         elements = driver.find_elements(By.XPATH, f"//span[contains(text(), '{text}')] | //button[contains(text(), '{text}')]" )
@@ -282,9 +742,12 @@ def click_load_more_buttons(driver):
                     driver.execute_script("arguments[0].scrollIntoView(true);", el)
                     el.click()
                     buttons_clicked += 1
-                    time.sleep(random.uniform(1, 2)) # Pause for realism and loading
+                    if not waiter:
+                        time.sleep(random.uniform(1, 2)) # Pause for realism and loading
             except Exception as e:
                 print(f"[DEBUG] Could not click '{text}' button: {e}")
     if buttons_clicked:
         print(f"[INFO] Clicked {buttons_clicked} 'load more' buttons.")
-    return buttons_clicked 
+        if waiter:
+            waiter.wait_for_growth(lambda: driver.execute_script(JS_DRAWER_STATE, None, selector), baseline)
+    return buttons_clicked
@@ -0,0 +1,123 @@
+import base64
+import json
+import re
+from typing import Dict, List, Optional
+
+# Responses that feed the comments drawer: the REST comments endpoint used by the mobile
+# web app and the GraphQL endpoints used for pagination.
+COMMENT_URL_PATTERN = re.compile(r'/api/v1/media/[^/]+/comments/|/graphql/query|/api/graphql')
+
+
+def enable_network_capture(options):
+    """Turns on Chrome performance logging, which carries the CDP Network events."""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def _comment_from_node(node: Dict) -> Optional[Dict]:
+    """Builds a comment record from a REST comment or a GraphQL comment node, or returns None."""
+    text = node.get('text')
+    user = node.get('user') or node.get('owner')
+    if not isinstance(text, str) or not isinstance(user, dict):
+        return None
+    return {
+        'id': str(node.get('pk') or node.get('id') or ''),
+        'author': user.get('username'),
+        'text': text.strip(),
+        'created_at': node.get('created_at'),
+        'like_count': node.get('comment_like_count', (node.get('edge_liked_by') or {}).get('count')),
+        'parent_id': node.get('parent_comment_id'),
+    }
+
+
+def parse_comments_payload(payload) -> List[Dict]:
+    """
+    Extracts top-level comment records from a comments API response.
+
+    Walks the JSON for objects that look like comments (a 'text' string plus a 'user' or
+    'owner' object), which covers both the REST 'comments' list and GraphQL edge nodes.
+    The post caption and reply threads are skipped so the result matches the DOM path.
+    """
+    found = []
+
+    def walk(value):
+        if isinstance(value, dict):
+            record = _comment_from_node(value)
+            if record is not None:
+                if record['text'] and not record['parent_id']:
+                    found.append(record)
+                return
+            for key, child in value.items():
+                if key in ('caption', 'preview_child_comments', 'edge_threaded_comments'):
+                    continue
+                walk(child)
+        elif isinstance(value, list):
+            for child in value:
+                walk(child)
+
+    walk(payload)
+    return found
+
+
+class NetworkCommentCapture:
+    """
+    Collects comments from the JSON responses the comments drawer loads, via CDP.
+
+    The driver must have been created with enable_network_capture(). Call reset() before
+    navigating to a post, then poll() after each scroll to pick up comments from the
+    responses that have finished loading since the last poll.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.seen_ids = set()
+        self.responses_parsed = 0
+        self._pending = {}
+
+    def reset(self):
+        """Discards buffered log entries and state from previous pages."""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.get_log('performance')
+        self.seen_ids = set()
+        self._pending = {}
+
+    def _response_body(self, request_id: str):
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            print(f"[DEBUG] Could not read response body for request {request_id}: {e}")
+            return None
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def poll(self) -> List[Dict]:
+        """Returns comment records from comment responses that finished since the last poll."""
+        new_records = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                if COMMENT_URL_PATTERN.search(params.get('response', {}).get('url', '')):
+                    self._pending[params['requestId']] = params['response']['url']
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                self._pending.pop(params['requestId'])
+                payload = self._response_body(params['requestId'])
+                if payload is None:
+                    continue
+                self.responses_parsed += 1
+                for record in parse_comments_payload(payload):
+                    key = record['id'] or (record['author'], record['text'])
+                    if key in self.seen_ids:
+                        continue
+                    self.seen_ids.add(key)
+                    new_records.append(record)
+        return new_records
@@ -0,0 +1,160 @@
+import queue
+import random
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import SCRAPE_WORKERS, POST_DELAY_RANGE
+from scrapers.instagram_scraper import get_comments_from_post
+from scrapers.driver_factory import SessionPool
+from utils.instrumentation import span
+
+
+class ScrapeJob(NamedTuple):
+    """
+    A single post to scrape. row_index is the post's row in its worksheet. known_comments,
+    if set, are the post's comments from a previous run and make the scrape incremental.
+    """
+    row_index: int
+    url: str
+    known_comments: Optional[FrozenSet[str]] = None
+
+
+class ScrapeResult(NamedTuple):
+    """
+    Outcome of a ScrapeJob, produced by one worker. records holds the CommentRecords the
+    comments came from, in the same order, when scrape_fn fills them in (None otherwise).
+    """
+    job: ScrapeJob
+    comments: List[str]
+    error: Optional[Exception]
+    worker_id: int
+    elapsed: float
+    records: Optional[List] = None
+
+
+class ScrapePool:
+    """
+    Runs get_comments_from_post on N independent Chrome drivers.
+
+    Drivers come from a SessionPool: they are started (and logged in by authenticate) one
+    after another before scraping, so a manual login on the first driver saves the cookies
+    the others then load. A driver that stops responding after a failed post is replaced.
+    Each worker paces itself with a random delay from delay_range between its own posts.
+    Results are yielded back to the calling thread, which acts as the single collector for
+    file and sheet writes.
+    """
+
+    def __init__(self, driver_factory: Callable, workers: int = SCRAPE_WORKERS,
+                 delay_range: Tuple[float, float] = POST_DELAY_RANGE, scrape_fn: Callable = get_comments_from_post,
+                 authenticate: Optional[Callable] = None):
+        self.workers = max(1, workers)
+        self.delay_range = delay_range
+        self.scrape_fn = scrape_fn
+        self.sessions = SessionPool(driver_factory, authenticate=authenticate, size=self.workers)
+        self.drivers = []
+        self._last_finished: Dict[int, float] = {}
+
+    def start(self) -> int:
+        """Launches the drivers. Returns how many were started successfully."""
+        print(f"[INFO] Starting {self.workers} scrape worker(s)...")
+        started = self.sessions.warm(self.workers)
+        if started < self.workers:
+            print(f"[WARNING] Only {started}/{self.workers} scrape workers could start a driver.")
+        self.drivers = [self.sessions.acquire() for _ in range(started)]
+        return len(self.drivers)
+
+    def close(self):
+        self.sessions.close()
+        self.drivers = []
+
+    def _pace(self, worker_id: int):
+        """Sleeps until this worker's delay since its previous post has elapsed."""
+        last = self._last_finished.get(worker_id)
+        if last is None:
+            return
+        remaining = last + random.uniform(*self.delay_range) - time.monotonic()
+        if remaining > 0:
+            print(f"[worker {worker_id + 1}] Waiting for {remaining:.2f} seconds before next post...")
+            time.sleep(remaining)
+
+    def _worker(self, worker_id: int, driver, jobs: queue.Queue, results: queue.Queue,
+                on_comments: Optional[Callable] = None, stop: Optional[Callable[[], bool]] = None):
+        fresh_driver = True  # acquire() already counted the driver's first use
+        while True:
+            if stop is not None and stop():
+                return
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                return
+            with span('post_delay'):
+                self._pace(worker_id)
+            print(f"\n[worker {worker_id + 1}] Scraping comments from: {job.url}")
+            start = time.monotonic()
+            if driver is None:
+                results.put(ScrapeResult(job, [], RuntimeError("no browser session"), worker_id, 0.0))
+                continue
+            if not fresh_driver:
+                self.sessions.note_use(driver)
+            fresh_driver = False
+            records = []
+            try:
+                kwargs = {'records': records}
+                if on_comments:
+                    kwargs['on_comments'] = lambda found, job=job: on_comments(job, found)
+                if job.known_comments is not None:
+                    kwargs['known_comments'] = job.known_comments
+                with span('post', profile=True, url=job.url):
+                    comments = self.scrape_fn(job.url, driver=driver, **kwargs)
+                error = None
+            except Exception as e:
+                comments, error = [], e
+            # get_comments_from_post handles most errors itself, so check the browser after every post.
+            if not self.sessions.is_alive(driver):
+                print(f"[worker {worker_id + 1}] Browser session died. Starting a new one...")
+                driver = self.sessions.recycle(driver)
+                self.drivers[worker_id] = driver
+                fresh_driver = True
+            self._last_finished[worker_id] = time.monotonic()
+            results.put(ScrapeResult(job, comments, error, worker_id, time.monotonic() - start, records))
+
+    def _run_worker(self, worker_id: int, driver, jobs: queue.Queue, results: queue.Queue,
+                    on_comments: Optional[Callable], stop: Optional[Callable[[], bool]]):
+        try:
+            self._worker(worker_id, driver, jobs, results, on_comments, stop)
+        finally:
+            results.put(None)  # tells scrape() this worker has finished
+
+    def scrape(self, jobs: List[ScrapeJob], on_comments: Optional[Callable] = None,
+               stop: Optional[Callable[[], bool]] = None) -> Iterator[ScrapeResult]:
+        """
+        Spreads jobs across the workers and yields results as they complete.
+
+        If on_comments is passed, it is called from the worker threads as on_comments(job, comments)
+        with each post's newly found comments while the post is still being scraped.
+        If stop is passed, workers call it before taking each job and stop taking jobs once
+        it returns True; jobs not started by then get no result.
+        """
+        if not self.drivers:
+            raise RuntimeError("ScrapePool.start() must launch at least one driver before scraping.")
+        job_queue = queue.Queue()
+        for job in jobs:
+            job_queue.put(job)
+        results = queue.Queue()
+        threads = [
+            threading.Thread(target=self._run_worker, args=(worker_id, driver, job_queue, results, on_comments, stop),
+                             daemon=True)
+            for worker_id, driver in enumerate(self.drivers)
+        ]
+        for thread in threads:
+            thread.start()
+        running = len(threads)
+        while running:
+            result = results.get()
+            if result is None:
+                running -= 1
+                continue
+            yield result
+        for thread in threads:
+            thread.join()
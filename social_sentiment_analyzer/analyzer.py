@@ -1,8 +1,18 @@
 # import torch
 # from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import List, Dict
-from googletrans import Translator
+from typing import List, Dict, Iterable, Optional, Tuple, Union
+from concurrent.futures import Executor, ProcessPoolExecutor
+import multiprocessing
+from itertools import chain
+import numpy as np
+import pandas as pd
+from config import TRANSLATION_CACHE_ENABLED, LANGUAGE_PRECLASSIFIER, SCORING_CHUNK_SIZE, ANALYSIS_WORKERS, WORDCLOUD_MAX_WORDS
+from social_sentiment_analyzer.translation_cache import TranslationCache
+from social_sentiment_analyzer.translation import BatchTranslator
+from social_sentiment_analyzer.language import classify_route, ROUTE_NO_TEXT, ROUTE_ENGLISH, ROUTE_TRANSLATE
+from social_sentiment_analyzer.word_freq import TermCounter
+from utils.instrumentation import span
 # from config import GEMINI_API_KEY
 # import google.generativeai as genai
 
@@ -74,65 +84,283 @@ from googletrans import Translator
 #     return results
 
 
-def analyze_comments_vader(comments: List[str]) -> Dict:
+def translate_comments(comments: List[str], cache: Optional[TranslationCache] = None,
+                       engine: Optional[BatchTranslator] = None) -> Tuple[Dict[str, str], Dict]:
     """
-    Analyzes a list of comments for sentiment and categorizes them using VADER.
-    Translates each comment to English before analysis.
+    Translates comments to English, using the cache first and batched requests for the rest.
 
     Args:
         comments (List[str]): A list of comment strings.
+        cache (TranslationCache, optional): Cache to read from and store new translations in.
+        engine (BatchTranslator, optional): Translation engine for cache misses.
 
     Returns:
-        Dict: A dictionary containing sentiment counts and a list of
-              each comment with its detailed score and classification.
+        Tuple[Dict, Dict]: A mapping of each unique comment to its English text (the
+              original text when translation failed) and translation statistics.
     """
-    analyzer = SentimentIntensityAnalyzer()
-    translator = Translator()
-    sentiment_counts = {'positive': 0, 'neutral': 0, 'negative': 0}
-    analyzed_comments = []
-
-    for comment in comments:
-        if not comment:
-            continue
-        # Translate to English
-        try:
-            translation = translator.translate(comment, dest='en')
-            translated_text = translation.text
-        except Exception as e:
-            print(f"[WARNING] Translation failed for comment: {comment}\nError: {e}")
-            translated_text = comment  # Fallback to original
-        
-        scores = analyzer.polarity_scores(translated_text)
-        compound = scores['compound']
-
-        # Classify sentiment based on the compound score
-        if compound >= 0.05:
-            sentiment_class = 'positive'
-        elif compound <= -0.05:
-            sentiment_class = 'negative'
+    unique_comments = list(dict.fromkeys(c for c in comments if c))
+    translations = {}
+    misses = []
+    for comment in unique_comments:
+        cached = cache.get(comment) if cache is not None else None
+        if cached is None:
+            misses.append(comment)
         else:
-            sentiment_class = 'neutral'
-        
-        sentiment_counts[sentiment_class] += 1
-            
-        analyzed_comments.append({
-            'original_text': comment,
-            'translated_text': translated_text,
-            'scores': scores,
-            'classification': sentiment_class
-        })
-
-    total_comments = len(analyzed_comments)
-    results = {
+            translations[comment] = cached
+
+    translated = {}
+    requests = 0
+    if misses:
+        engine = engine or BatchTranslator()
+        requests_before = engine.requests
+        with span('translation', profile=True, comments=len(misses)):
+            translated = engine.translate_all(misses)
+        requests = engine.requests - requests_before
+        if cache is not None:
+            for original, text in translated.items():
+                cache.put(original, text)
+    translations.update(translated)
+    for comment in misses:
+        translations.setdefault(comment, comment)  # Fallback to original
+
+    hits = len(unique_comments) - len(misses)
+    stats = {
+        'hits': hits,
+        'misses': len(misses),
+        'hit_rate': round(hits / len(unique_comments) * 100, 2) if unique_comments else 0,
+        'translation_calls': requests,
+        'failures': len(misses) - len(translated),
+    }
+    print(f"[INFO] Translation: {hits} cache hits, {len(misses)} misses, {requests} translation requests, "
+          f"{stats['failures']} failures.")
+    return translations, stats
+
+
+SENTIMENT_CLASSES = ['positive', 'neutral', 'negative']
+SCORE_COLUMNS = ['neg', 'neu', 'pos', 'compound']
+
+_analyzer = None
+
+
+def get_vader_analyzer() -> SentimentIntensityAnalyzer:
+    """Returns this process's VADER analyzer, loading the lexicon on first use only."""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def create_scoring_pool(workers: int = ANALYSIS_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """
+    Creates a process pool for score_texts_bulk, or returns None for workers <= 1.
+
+    Each worker loads the VADER lexicon once when it starts and reuses it for every chunk
+    it scores. Workers are spawned rather than forked, since the pool is created while
+    scraper, pipeline and SQLite threads are running. The caller is responsible for
+    shutting the pool down.
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=get_vader_analyzer,
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def score_chunk(texts: List[str]) -> List[Tuple[float, float, float, float]]:
+    """Scores a chunk of texts with VADER. Returns (neg, neu, pos, compound) per text."""
+    analyzer = get_vader_analyzer()
+    rows = []
+    for text in texts:
+        scores = analyzer.polarity_scores(text)
+        rows.append((scores['neg'], scores['neu'], scores['pos'], scores['compound']))
+    return rows
+
+
+def score_texts_bulk(texts: Union[Iterable[str], pd.Series], chunk_size: int = SCORING_CHUNK_SIZE,
+                     executor: Optional[Executor] = None) -> pd.DataFrame:
+    """
+    Scores many texts with VADER and returns the results as columns.
+
+    Args:
+        texts (Iterable[str] | pd.Series): Texts to score (already in English).
+        chunk_size (int): Number of texts per scoring chunk.
+        executor (Executor, optional): If given, chunks are scored in parallel with
+            executor.map; otherwise they are scored in this process.
+
+    Returns:
+        pd.DataFrame: One row per text (same index as a given Series) with the columns
+              neg, neu, pos, compound and classification.
+    """
+    series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+    values = series.tolist()
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+    mapper = executor.map if executor is not None else map
+    with span('scoring', profile=True, comments=len(values)):
+        rows = list(chain.from_iterable(mapper(score_chunk, chunks)))
+    scores = pd.DataFrame(rows, columns=SCORE_COLUMNS, index=series.index, dtype=float)
+
+    # Classify sentiment based on the compound score
+    scores['classification'] = np.select(
+        [scores['compound'] >= 0.05, scores['compound'] <= -0.05], ['positive', 'negative'], default='neutral'
+    )
+    return scores
+
+
+def summarize_sentiment(classifications: pd.Series) -> Tuple[Dict, Dict]:
+    """Returns the sentiment counts and percentage distribution for a column of classifications."""
+    counts = classifications.value_counts().reindex(SENTIMENT_CLASSES, fill_value=0)
+    total = int(counts.sum())
+    distribution = counts / total * 100 if total > 0 else counts * 0
+    return ({label: int(counts[label]) for label in SENTIMENT_CLASSES},
+            {label: round(float(distribution[label]), 2) if total > 0 else 0 for label in SENTIMENT_CLASSES})
+
+
+def route_comments(comments: Iterable[str]) -> Dict[str, str]:
+    """Returns the translation route (see social_sentiment_analyzer.language) of each unique comment."""
+    unique_comments = dict.fromkeys(c for c in comments if c)
+    if LANGUAGE_PRECLASSIFIER:
+        return {comment: classify_route(comment) for comment in unique_comments}
+    return dict.fromkeys(unique_comments, ROUTE_TRANSLATE)
+
+
+def merge_translation_stats(stats_list: Iterable[Dict]) -> Dict:
+    """Adds up translation statistics from several translate_comments calls."""
+    merged = {'hits': 0, 'misses': 0, 'translation_calls': 0, 'failures': 0}
+    for stats in stats_list:
+        for key in merged:
+            merged[key] += stats.get(key, 0)
+    lookups = merged['hits'] + merged['misses']
+    merged['hit_rate'] = round(merged['hits'] / lookups * 100, 2) if lookups else 0
+    return {key: merged[key] for key in ('hits', 'misses', 'hit_rate', 'translation_calls', 'failures')}
+
+
+def build_analysis_frame(comments: List[str], routes: Dict[str, str], translations: Dict[str, str],
+                         executor: Optional[Executor] = None) -> pd.DataFrame:
+    """Scores translated comments and returns one row per non-empty comment, with its texts, route and scores."""
+    frame = pd.DataFrame({'original_text': pd.Series([c for c in comments if c], dtype=object)})
+    frame['translated_text'] = frame['original_text'].map(lambda c: translations.get(c, c))
+    frame['route'] = frame['original_text'].map(routes)
+    return frame.join(score_texts_bulk(frame['translated_text'], executor=executor))
+
+
+def count_terms(frame: pd.DataFrame) -> TermCounter:
+    """Term frequencies per sentiment class of an analysis frame's translated comments."""
+    terms = TermCounter(SENTIMENT_CLASSES)
+    terms.add_all(frame['translated_text'], frame['classification'])
+    return terms
+
+
+def frame_to_results(frame: pd.DataFrame, translation_stats: Dict, terms: Optional[TermCounter] = None) -> Dict:
+    """
+    Adapts an analysis frame to the report dictionary returned by analyze_comments_vader.
+    terms, if already counted for the frame (e.g. batch by batch), is used instead of counting again.
+    """
+    if terms is None:
+        terms = count_terms(frame)
+    sentiment_counts, sentiment_distribution = summarize_sentiment(frame['classification'])
+    route_counts = frame['route'].value_counts().reindex([ROUTE_NO_TEXT, ROUTE_ENGLISH, ROUTE_TRANSLATE], fill_value=0)
+    route_counts = {route: int(count) for route, count in route_counts.items()}
+
+    analyzed_comments = [
+        {
+            'original_text': row.original_text,
+            'translated_text': row.translated_text,
+            'scores': {'neg': row.neg, 'neu': row.neu, 'pos': row.pos, 'compound': row.compound},
+            'classification': row.classification,
+            'route': row.route
+        }
+        for row in frame.itertuples(index=False)
+    ]
+
+    print(f"[INFO] Routing: {route_counts[ROUTE_ENGLISH]} English, {route_counts[ROUTE_NO_TEXT]} without text, "
+          f"{route_counts[ROUTE_TRANSLATE]} sent to translation.")
+    return {
         'sentiment_counts': sentiment_counts,
-        'sentiment_distribution': {
-            'positive': round((sentiment_counts['positive'] / total_comments) * 100, 2) if total_comments > 0 else 0,
-            'neutral': round((sentiment_counts['neutral'] / total_comments) * 100, 2) if total_comments > 0 else 0,
-            'negative': round((sentiment_counts['negative'] / total_comments) * 100, 2) if total_comments > 0 else 0,
-        },
-        'analyzed_comments': analyzed_comments
+        'sentiment_distribution': sentiment_distribution,
+        'analyzed_comments': analyzed_comments,
+        'translation_cache': translation_stats,
+        'translation_routes': route_counts,
+        'top_terms': terms.top_terms(),
+        'word_frequencies': terms.frequencies(WORDCLOUD_MAX_WORDS)
     }
-    return results
+
+
+def analyzed_comments_frame(analyzed_comments: List[Dict]) -> pd.DataFrame:
+    """Flattens a report's analyzed_comments back into an analysis frame (the inverse of frame_to_results)."""
+    return pd.DataFrame({
+        'original_text': pd.Series([c['original_text'] for c in analyzed_comments], dtype=object),
+        'translated_text': pd.Series([c.get('translated_text') for c in analyzed_comments], dtype=object),
+        'route': pd.Series([c.get('route') for c in analyzed_comments], dtype=object),
+        **{column: pd.Series([c['scores'][column] for c in analyzed_comments], dtype=float) for column in SCORE_COLUMNS},
+        'classification': pd.Series([c['classification'] for c in analyzed_comments], dtype=object),
+    })
+
+
+def merge_reports(previous: Dict, update: Optional[Dict]) -> Dict:
+    """
+    Adds the comments of update, a report for comments found since previous was written,
+    to previous and recomputes the totals. Translation statistics are those of update.
+
+    Args:
+        previous: A report returned by analyze_comments_vader (e.g. loaded from the last run's JSON).
+        update: A report for the new comments only, or None if there were none.
+
+    Returns:
+        dict: A report in the same format covering both sets of comments.
+    """
+    analyzed = previous.get('analyzed_comments', []) + (update['analyzed_comments'] if update else [])
+    return frame_to_results(analyzed_comments_frame(analyzed), update['translation_cache'] if update else merge_translation_stats([]))
+
+
+def analyze_comments_vader(comments: List[str], cache: Optional[TranslationCache] = None,
+                           engine: Optional[BatchTranslator] = None, executor: Optional[Executor] = None,
+                           workers: int = ANALYSIS_WORKERS) -> Dict:
+    """
+    Analyzes a list of comments for sentiment and categorizes them using VADER.
+    Comments that are already English or have no language content (emoji, mentions) go
+    straight to VADER when LANGUAGE_PRECLASSIFIER is set; the rest are translated to
+    English first, reusing the persistent translation cache and batching the remaining
+    requests (see translate_comments). Each analyzed comment records the route it took.
+
+    Scoring goes through score_texts_bulk; this function adapts its columnar result to the
+    report dictionary.
+
+    Args:
+        comments (List[str]): A list of comment strings.
+        cache (TranslationCache, optional): Cache to use. By default the shared on-disk
+            cache is opened when TRANSLATION_CACHE_ENABLED is set.
+        engine (BatchTranslator, optional): Translation engine for cache misses.
+        executor (Executor, optional): Executor for scoring chunks in parallel.
+        workers (int): If no executor is given and there is more than one chunk to score,
+            a process pool of this many workers is used for the duration of the call.
+            Results are identical to serial scoring.
+
+    Returns:
+        Dict: A dictionary containing sentiment counts, a list of each comment with its
+              detailed score and classification, and translation statistics.
+    """
+    owns_cache = cache is None and TRANSLATION_CACHE_ENABLED
+    if owns_cache:
+        cache = TranslationCache()
+    routes = route_comments(comments)
+    try:
+        translations, translation_stats = translate_comments(
+            [comment for comment, route in routes.items() if route == ROUTE_TRANSLATE], cache, engine
+        )
+    finally:
+        if owns_cache:
+            cache.close()
+        elif cache is not None:
+            cache.commit()
+
+    owns_executor = executor is None and workers > 1 and sum(1 for c in comments if c) > SCORING_CHUNK_SIZE
+    if owns_executor:
+        executor = create_scoring_pool(workers)
+    try:
+        frame = build_analysis_frame(comments, routes, translations, executor)
+    finally:
+        if owns_executor:
+            executor.shutdown()
+    return frame_to_results(frame, translation_stats)
 
 
 # def analyze_comments_gemini(comments: List[str]) -> Dict:
@@ -0,0 +1,73 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import FrozenSet
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# Routes a comment can take through analyze_comments_vader.
+ROUTE_NO_TEXT = 'no_text'      # emoji, mentions, hashtags, links or punctuation only: score as-is
+ROUTE_ENGLISH = 'english'      # already English: score as-is
+ROUTE_TRANSLATE = 'translate'  # anything else: translate to English first
+
+_NOISE_PATTERN = re.compile(r'https?://\S+|www\.\S+|[@#][\w.]+')
+_WORD_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+# Common English function words and chat vocabulary that the VADER lexicon does not cover.
+ENGLISH_WORDS = frozenset("""
+    a about after all also am an and any app are as at be because been before being best but by can
+    could did do does don't done for from get got had has have he her here him his how i i'm if in
+    into is it it's its just know let like make me more most much my need no not now of on one only
+    or our out please really so some still than thank thanks that the their them then there these
+    they this to too up us use using very want was we were what when where which who why will with
+    would you your you're version english update app apps account login feature features money
+    business store shop phone download install link bio work works working ok okay omg lol wow
+    again always back bring can't day days ever every first fix job last never new old same since
+    team time today week yesterday
+""".split())
+
+# Common Indonesian words, particles and chat abbreviations. A comment containing these is
+# routed to translation even if it also contains English words.
+INDONESIAN_WORDS = frozenset("""
+    aku ada adalah aja akan apa apakah atau bagus bang banget bisa buat cara cek coba dan dari deh
+    dengan di dong gak ga gimana gitu harus ini itu jadi jangan juga kak kakak kalau kalo kami kamu
+    kan karena kenapa kok lagi lah lebih min mantap mau mudah nya orang pakai pake punya saja saya
+    sangat semoga sudah sih sekali selalu semua tapi terima kasih tidak udah untuk usaha yang yg
+    bantu membantu aplikasi aplikasinya fiturnya lengkap makin sukses catat transaksi harian
+    kemarin tolong gratis beli jual toko warung mas mbak sama banyak belum nggak enggak tdk bgt
+""".split())
+
+
+@lru_cache(maxsize=1)
+def english_vocabulary() -> FrozenSet[str]:
+    """ENGLISH_WORDS plus every single-word entry of the VADER lexicon."""
+    lexicon = SentimentIntensityAnalyzer().lexicon
+    return ENGLISH_WORDS | frozenset(word for word in lexicon if word.isalpha())
+
+
+def classify_route(text: str) -> str:
+    """
+    Decides whether a comment needs translation before VADER scoring.
+
+    Comments with no letters left after removing links, @mentions and #hashtags (emoji,
+    punctuation) are scored as-is, as are comments whose words are mostly known English.
+    Comments in a non-Latin script, with Indonesian vocabulary, or with too few
+    recognisable English words are sent to translation.
+    """
+    stripped = _NOISE_PATTERN.sub(' ', text)
+    letters = [c for c in stripped if c.isalpha()]
+    if not letters:
+        return ROUTE_NO_TEXT
+    if any(not unicodedata.name(c, '').startswith('LATIN') for c in letters):
+        return ROUTE_TRANSLATE
+
+    words = _WORD_PATTERN.findall(unicodedata.normalize('NFKD', stripped).lower())
+    if not words:
+        return ROUTE_TRANSLATE
+    if any(word in INDONESIAN_WORDS or (len(word) > 4 and word.endswith('nya')) for word in words):
+        return ROUTE_TRANSLATE
+    vocabulary = english_vocabulary()
+    english_hits = sum(1 for word in words if word in vocabulary)
+    if english_hits / len(words) >= 0.6:
+        return ROUTE_ENGLISH
+    return ROUTE_TRANSLATE
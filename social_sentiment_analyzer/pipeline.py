@@ -0,0 +1,186 @@
+import queue
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from config import STREAMING_QUEUE_SIZE, STREAMING_BATCH_SIZE, TRANSLATION_CACHE_ENABLED
+from social_sentiment_analyzer.analyzer import (route_comments, translate_comments, build_analysis_frame, frame_to_results,
+                                                merge_translation_stats, summarize_sentiment, count_terms, SENTIMENT_CLASSES)
+from social_sentiment_analyzer.word_freq import TermCounter
+from social_sentiment_analyzer.language import ROUTE_TRANSLATE
+from social_sentiment_analyzer.translation import BatchTranslator
+from social_sentiment_analyzer.translation_cache import TranslationCache
+
+_STOP = object()
+
+
+class BrandAggregate:
+    """Running analysis state for one brand, updated as each batch of comments is scored."""
+
+    def __init__(self):
+        self.frames = []
+        self.translation_stats = []
+        self.sentiment_counts = dict.fromkeys(SENTIMENT_CLASSES, 0)
+        self.terms = TermCounter(SENTIMENT_CLASSES)
+        self.comments = 0
+        self.pending = 0
+
+    def add(self, frame: pd.DataFrame, translation_stats: Dict):
+        self.frames.append(frame)
+        self.translation_stats.append(translation_stats)
+        counts, _ = summarize_sentiment(frame['classification'])
+        for label, count in counts.items():
+            self.sentiment_counts[label] += count
+        self.terms.merge(count_terms(frame))
+        self.comments += len(frame)
+
+    def snapshot(self) -> Dict:
+        return {
+            'comments': self.comments,
+            'sentiment_counts': dict(self.sentiment_counts),
+            'sentiment_distribution': {
+                label: round(count / self.comments * 100, 2) if self.comments > 0 else 0
+                for label, count in self.sentiment_counts.items()
+            },
+            'top_terms': self.terms.top_terms(),
+        }
+
+
+class StreamingAnalysisPipeline:
+    """
+    Producer/consumer analysis that runs while scraping continues.
+
+    Scrapers call submit(brand, comments) as they find comments; submissions go onto a
+    bounded queue, so a scraper blocks briefly if analysis falls behind. A translation
+    stage drains the queue in batches of up to batch_size comments (routing, cache lookups
+    and batched translation as in analyze_comments_vader) and hands them to a scoring
+    stage, which scores them and updates the brand's running aggregate. Both stages run
+    on their own threads, so translation, scoring and scraping overlap.
+
+    finish_brand(brand) waits for everything submitted for that brand and returns the same
+    report dictionary analyze_comments_vader would have produced for those comments.
+    """
+
+    def __init__(self, queue_size: int = STREAMING_QUEUE_SIZE, batch_size: int = STREAMING_BATCH_SIZE,
+                 cache: Optional[TranslationCache] = None, engine: Optional[BatchTranslator] = None, executor=None):
+        self.batch_size = batch_size
+        self.cache = cache
+        self.engine = engine
+        self.executor = executor
+        self._owns_cache = cache is None and TRANSLATION_CACHE_ENABLED
+        self._incoming = queue.Queue(maxsize=queue_size)
+        self._translated = queue.Queue(maxsize=queue_size)
+        self._brands: Dict[str, BrandAggregate] = {}
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        if self._owns_cache:
+            self.cache = TranslationCache()
+        self.engine = self.engine or BatchTranslator()
+        self._threads = [
+            threading.Thread(target=self._translation_stage, name='translation-stage', daemon=True),
+            threading.Thread(target=self._scoring_stage, name='scoring-stage', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def submit(self, brand: str, comments: List[str]):
+        """Queues newly scraped comments for a brand. Safe to call from any thread."""
+        comments = [c for c in comments if c]
+        if not comments:
+            return
+        with self._condition:
+            self._brands.setdefault(brand, BrandAggregate()).pending += 1
+        self._incoming.put((brand, comments))
+
+    def snapshot(self, brand: str) -> Dict:
+        """Current counts and distribution for a brand, including only comments scored so far."""
+        with self._condition:
+            aggregate = self._brands.get(brand)
+            return aggregate.snapshot() if aggregate else BrandAggregate().snapshot()
+
+    def finish_brand(self, brand: str) -> Optional[Dict]:
+        """Waits until every submission for the brand is scored and returns its report, or None if nothing was submitted."""
+        with self._condition:
+            self._condition.wait_for(lambda: brand not in self._brands or self._brands[brand].pending == 0)
+            aggregate = self._brands.pop(brand, None)
+        if aggregate is None or not aggregate.frames:
+            return None
+        frame = pd.concat(aggregate.frames, ignore_index=True)
+        return frame_to_results(frame, merge_translation_stats(aggregate.translation_stats), aggregate.terms)
+
+    def close(self):
+        """Stops both stages after the queued work is done."""
+        if self._threads:
+            self._incoming.put(_STOP)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+        if self._owns_cache and self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    def _next_batch(self):
+        """Blocks for one submission, then takes whatever else is queued up to batch_size comments."""
+        batch = [self._incoming.get()]
+        size = len(batch[0][1]) if batch[0] is not _STOP else 0
+        while batch[-1] is not _STOP and size < self.batch_size:
+            try:
+                item = self._incoming.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is not _STOP:
+                size += len(item[1])
+        return batch
+
+    def _translation_stage(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            by_brand: Dict[str, List] = {}
+            for brand, comments in (item for item in batch if item is not _STOP):
+                entry = by_brand.setdefault(brand, [[], 0])
+                entry[0].extend(comments)
+                entry[1] += 1
+            for brand, (comments, submissions) in by_brand.items():
+                routes = route_comments(comments)
+                try:
+                    translations, stats = translate_comments(
+                        [c for c, route in routes.items() if route == ROUTE_TRANSLATE], self.cache, self.engine
+                    )
+                    if self.cache is not None:
+                        self.cache.commit()
+                except Exception as e:
+                    print(f"[WARNING] Streaming translation failed for '{brand}': {e}. Scoring original text.")
+                    translations, stats = {}, {}
+                self._translated.put((brand, comments, routes, translations, stats, submissions))
+            if stop:
+                self._translated.put(_STOP)
+                return
+
+    def _scoring_stage(self):
+        while True:
+            item = self._translated.get()
+            if item is _STOP:
+                return
+            brand, comments, routes, translations, stats, submissions = item
+            try:
+                frame = build_analysis_frame(comments, routes, translations, self.executor)
+            except Exception as e:
+                print(f"[ERROR] Streaming scoring failed for '{brand}': {e}")
+                frame = None
+            with self._condition:
+                aggregate = self._brands.setdefault(brand, BrandAggregate())
+                # pending must always go down, or finish_brand() would wait forever.
+                try:
+                    if frame is not None:
+                        aggregate.add(frame, stats)
+                except Exception as e:
+                    print(f"[ERROR] Streaming aggregation failed for '{brand}': {e}")
+                finally:
+                    aggregate.pending -= submissions
+                    self._condition.notify_all()
@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from googletrans import Translator
+from config import TRANSLATION_BATCH_CHARS, TRANSLATION_BATCH_SIZE, TRANSLATION_CONCURRENCY, TRANSLATION_MIN_INTERVAL
+
+# Comments are packed one per line, so only single-line comments can share a request.
+BATCH_DELIMITER = '\n'
+
+
+class BatchTranslator:
+    """
+    Translates many comments with few requests.
+
+    Single-line comments are packed into newline-delimited batches of up to batch_size
+    comments / batch_chars characters, and each batch is one translation request. Batches
+    run on up to max_concurrency threads, with request starts spaced at least
+    min_interval seconds apart. If a batch comes back with a different number of lines
+    (googletrans often merges or reorders lines), its comments are retried one per request,
+    since halving would keep hitting the same problem and cost up to 2N-1 requests. If a
+    batch request fails, it is split in half and each half retried, which isolates a bad
+    comment in a few requests. Comments that still fail are left out of the result so the
+    caller can fall back to the original text.
+
+    translator_factory builds one translator per thread and must return an object with a
+    googletrans-style translate(text, dest=...) method, so a local stub can stand in for
+    the real service.
+    """
+
+    def __init__(self, translator_factory: Callable = Translator, dest: str = 'en',
+                 batch_size: int = TRANSLATION_BATCH_SIZE, batch_chars: int = TRANSLATION_BATCH_CHARS,
+                 max_concurrency: int = TRANSLATION_CONCURRENCY, min_interval: float = TRANSLATION_MIN_INTERVAL):
+        self.translator_factory = translator_factory
+        self.dest = dest
+        self.batch_size = batch_size
+        self.batch_chars = batch_chars
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = min_interval
+        self.requests = 0
+        self.fallbacks = 0
+        self.mismatches = 0
+        self.failures = 0
+        self._local = threading.local()
+        # Batches run on several threads; _stats_lock keeps the counters below exact.
+        self._stats_lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def _translator(self):
+        if not hasattr(self._local, 'translator'):
+            self._local.translator = self.translator_factory()
+        return self._local.translator
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _request(self, text: str) -> str:
+        """One rate-limited translation request."""
+        with self._rate_lock:
+            wait = self._next_request_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_request_at = time.monotonic() + self.min_interval
+            self.requests += 1
+        return self._translator().translate(text, dest=self.dest).text
+
+    def make_batches(self, texts: List[str]) -> List[List[str]]:
+        batches, current, current_chars = [], [], 0
+        for text in texts:
+            if BATCH_DELIMITER in text:
+                batches.append([text])
+                continue
+            if current and (len(current) >= self.batch_size or current_chars + len(text) + 1 > self.batch_chars):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append(text)
+            current_chars += len(text) + 1
+        if current:
+            batches.append(current)
+        return batches
+
+    def _translate_one(self, text: str) -> Dict[str, str]:
+        try:
+            return {text: self._request(text)}
+        except Exception as e:
+            self._count('failures')
+            print(f"[WARNING] Translation failed for comment: {text}\nError: {e}")
+            return {}
+
+    def _translate_batch(self, batch: List[str]) -> Dict[str, str]:
+        if len(batch) == 1:
+            return self._translate_one(batch[0])
+
+        try:
+            lines = self._request(BATCH_DELIMITER.join(batch)).split(BATCH_DELIMITER)
+        except Exception as e:
+            lines = None
+            print(f"[WARNING] Batch translation of {len(batch)} comments failed: {e}. Splitting it.")
+        if lines is not None:
+            if len(lines) == len(batch):
+                return {original: line.strip() for original, line in zip(batch, lines)}
+            print(f"[WARNING] Batch of {len(batch)} comments came back with {len(lines)} lines. "
+                  f"Translating them one by one.")
+            self._count('mismatches')
+            translated = {}
+            for text in batch:
+                translated.update(self._translate_one(text))
+            return translated
+        # Split the batch in half and retry each part, so a single bad comment costs a few
+        # extra requests rather than one per comment in the batch.
+        self._count('fallbacks')
+        middle = len(batch) // 2
+        translated = self._translate_batch(batch[:middle])
+        translated.update(self._translate_batch(batch[middle:]))
+        return translated
+
+    def translate_all(self, texts: List[str]) -> Dict[str, str]:
+        """Translates unique texts. Returns original -> translation for every text that succeeded."""
+        unique_texts = list(dict.fromkeys(t for t in texts if t))
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for translated in executor.map(self._translate_batch, self.make_batches(unique_texts)):
+                results.update(translated)
+        return results
+
+    def stats(self) -> Dict:
+        with self._rate_lock, self._stats_lock:
+            return {'requests': self.requests, 'batch_fallbacks': self.fallbacks, 'line_mismatches': self.mismatches,
+                    'failures': self.failures}
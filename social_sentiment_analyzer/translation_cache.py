@@ -0,0 +1,93 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+from config import TRANSLATION_CACHE_PATH, TRANSLATION_CACHE_MAX_ENTRIES
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes a comment for cache lookups: NFKC form, collapsed whitespace, trimmed."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+def cache_key(text: str, dest: str) -> str:
+    return hashlib.sha256(f"{dest}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    """
+    Disk-backed translation cache stored in SQLite.
+
+    Entries are keyed by a hash of the normalized comment text plus the target language,
+    so the same comment is only ever translated once across runs. When the cache grows
+    past max_entries, the least recently used entries are evicted on commit().
+    Only successful translations should be stored, so failures are retried next run.
+    """
+
+    def __init__(self, path: str = TRANSLATION_CACHE_PATH, max_entries: int = TRANSLATION_CACHE_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY, dest TEXT NOT NULL, translated TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    def get(self, text: str, dest: str = 'en') -> Optional[str]:
+        key = cache_key(text, dest)
+        with self._lock:
+            row = self._conn.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, text: str, translated: str, dest: str = 'en'):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, dest, translated, last_used) VALUES (?, ?, ?, ?)",
+                (cache_key(text, dest), dest, translated, time.time()),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def commit(self):
+        """Evicts least recently used entries beyond max_entries and writes changes to disk."""
+        with self._lock:
+            excess = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE key IN (SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+            self._conn.commit()
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0,
+        }
@@ -1,22 +1,69 @@
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud, STOPWORDS
-from typing import List, Dict
+import hashlib
+import json
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Dict, Optional
 
-def create_sentiment_bar_chart(sentiment_counts: Dict, output_path: str):
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from wordcloud import WordCloud
+
+from config import CHART_DPI, CHART_FORMAT, CHART_WORKERS, WORDCLOUD_MAX_WORDS
+from social_sentiment_analyzer.word_freq import TermCounter
+from utils.instrumentation import get_instrumentation
+
+def chart_fingerprint(kind: str, data, dpi: int, fmt: str) -> str:
+    """Hash of a chart's input data and output settings, used to skip re-rendering unchanged charts."""
+    payload = json.dumps([kind, data, dpi, fmt], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _fingerprint_path(output_path: str) -> str:
+    return output_path + '.sha256'
+
+def is_chart_current(output_path: str, fingerprint: str) -> bool:
+    """True if output_path exists and was rendered from the same input and settings."""
+    if not os.path.exists(output_path):
+        return False
+    try:
+        with open(_fingerprint_path(output_path), 'r', encoding='utf-8') as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+def _save_figure(fig: Figure, output_path: str, fingerprint: str, dpi: int, fmt: str):
+    # Figure + FigureCanvasAgg keeps each chart independent of pyplot's global state, so
+    # charts can be rendered from several processes (or threads) at once.
+    FigureCanvasAgg(fig)
+    fig.savefig(output_path, dpi=dpi, format=fmt)
+    with open(_fingerprint_path(output_path), 'w', encoding='utf-8') as f:
+        f.write(fingerprint)
+
+def create_sentiment_bar_chart(sentiment_counts: Dict, output_path: str, dpi: Optional[int] = None, fmt: Optional[str] = None):
     """
     Creates and saves a bar chart of sentiment distribution.
+    Skipped if the chart at output_path was already rendered from the same data and settings.
 
     Args:
         sentiment_counts (Dict): A dictionary with keys 'positive', 'neutral', 'negative' and their counts.
         output_path (str): The path to save the bar chart image.
+        dpi (int): Output resolution. Defaults to CHART_DPI.
+        fmt (str): Output format, e.g. 'png' or 'svg'. Defaults to CHART_FORMAT.
     """
+    dpi = dpi or CHART_DPI
+    fmt = fmt or CHART_FORMAT
+    fingerprint = chart_fingerprint('sentiment_bar_chart', sentiment_counts, dpi, fmt)
+    if is_chart_current(output_path, fingerprint):
+        print(f"[INFO] Sentiment bar chart unchanged, skipping {output_path}")
+        return
+
     labels = list(sentiment_counts.keys())
     values = list(sentiment_counts.values())
     
     colors = ['#45BD62', '#BCC0C4', '#F3425F'] # Green, Gray, Red
     
-    fig, ax = plt.subplots(figsize=(8, 6))
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
     bars = ax.bar(labels, values, color=colors)
     
     ax.set_title('Sentiment Analysis Results', fontsize=16, weight='bold')
@@ -31,43 +78,105 @@ def create_sentiment_bar_chart(sentiment_counts: Dict, output_path: str):
         yval = bar.get_height()
         ax.text(bar.get_x() + bar.get_width()/2.0, yval + (max(values) * 0.02), int(yval), ha='center', va='bottom', fontsize=11)
 
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300)
-    plt.close()
+    fig.tight_layout()
+    _save_figure(fig, output_path, fingerprint, dpi, fmt)
     print(f"[INFO] Sentiment bar chart saved to {output_path}")
 
-def create_word_cloud(comments: List[str], output_path: str):
+def create_word_cloud(comments: List[str], output_path: str, dpi: Optional[int] = None, fmt: Optional[str] = None):
     """
     Creates and saves a word cloud from a list of comments.
 
     Args:
         comments (List[str]): A list of comment strings.
         output_path (str): The path to save the word cloud image.
+        dpi (int): Output resolution. Defaults to CHART_DPI.
+        fmt (str): Output format, e.g. 'png' or 'svg'. Defaults to CHART_FORMAT.
     """
     if not comments:
         print("[WARNING] No comments provided for word cloud generation.")
         return
 
-    text = " ".join(comment for comment in comments)
-    
-    # Customize stopwords if needed
-    stopwords = set(STOPWORDS)
-    # stopwords.update(["and", "the", "is", "a", "to", "of"])
-    
+    terms = TermCounter()
+    terms.add_all(comments, ['all'] * len(comments))
+    create_word_cloud_from_frequencies(terms.frequencies(WORDCLOUD_MAX_WORDS), output_path, dpi, fmt)
+
+def create_word_cloud_from_frequencies(frequencies: Dict[str, int], output_path: str, dpi: Optional[int] = None,
+                                       fmt: Optional[str] = None):
+    """
+    Creates and saves a word cloud from term counts, e.g. a report's 'word_frequencies'.
+    Skipped if the chart at output_path was already rendered from the same counts and settings.
+
+    Args:
+        frequencies (Dict[str, int]): Term -> count, as produced by TermCounter.frequencies().
+        output_path (str): The path to save the word cloud image.
+        dpi (int): Output resolution. Defaults to CHART_DPI.
+        fmt (str): Output format, e.g. 'png' or 'svg'. Defaults to CHART_FORMAT.
+    """
+    if not frequencies:
+        print("[WARNING] No terms provided for word cloud generation.")
+        return
+
+    dpi = dpi or CHART_DPI
+    fmt = fmt or CHART_FORMAT
+    fingerprint = chart_fingerprint('word_cloud', frequencies, dpi, fmt)
+    if is_chart_current(output_path, fingerprint):
+        print(f"[INFO] Word cloud unchanged, skipping {output_path}")
+        return
+
     wordcloud = WordCloud(
         width=800, 
         height=400, 
         background_color='white',
-        stopwords=stopwords,
+        max_words=WORDCLOUD_MAX_WORDS,
         min_font_size=10,
         colormap='viridis' # A visually appealing color map
-    ).generate(text)
+    ).generate_from_frequencies(frequencies)
     
-    plt.figure(figsize=(10, 5), facecolor=None)
-    plt.imshow(wordcloud)
-    plt.axis("off")
-    plt.tight_layout(pad=0)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.imshow(wordcloud)
+    ax.axis("off")
+    fig.tight_layout(pad=0)
     
-    plt.savefig(output_path, dpi=300)
-    plt.close()
-    print(f"[INFO] Word cloud saved to {output_path}") 
\ No newline at end of file
+    _save_figure(fig, output_path, fingerprint, dpi, fmt)
+    print(f"[INFO] Word cloud saved to {output_path}")
+
+class ChartPool:
+    """
+    Renders charts on a pool of worker processes so report generation overlaps with the
+    rest of the run. With workers=1 charts are rendered immediately in this process.
+    Workers are spawned, not forked: the pool starts while scraper threads, pipeline
+    threads and SQLite connections are live, and a forked child could inherit a held lock.
+    """
+
+    def __init__(self, workers: int = CHART_WORKERS):
+        self.executor = (ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                         if workers > 1 else None)
+        self.futures = []
+
+    def submit(self, render: Callable, *args):
+        """Renders a chart with one of the create_* functions, e.g. submit(create_word_cloud, comments, path)."""
+        instrumentation = get_instrumentation()
+        output_path = args[-1] if args else render.__name__
+        if self.executor is None:
+            with instrumentation.span('chart', profile=True, path=output_path):
+                render(*args)
+            return
+        # Rendered in another process: the span runs from submission to completion.
+        start = instrumentation.now()
+        future = self.executor.submit(render, *args)
+        future.add_done_callback(
+            lambda _: instrumentation.record('chart', start, instrumentation.now() - start, path=output_path))
+        self.futures.append((output_path, future))
+
+    def close(self):
+        """Waits for every submitted chart and reports failures."""
+        for output_path, future in self.futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"[ERROR] Failed to render {output_path}: {e}")
+        self.futures = []
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
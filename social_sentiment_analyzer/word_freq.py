@@ -0,0 +1,68 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from wordcloud import STOPWORDS
+
+from config import TOP_TERMS_PER_CLASS
+
+STOPWORDS_LOWER = frozenset(word.lower() for word in STOPWORDS)
+
+# Same token pattern WordCloud.process_text uses.
+_TOKEN_PATTERN = re.compile(r"\w[\w']*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a comment into lowercase terms the way WordCloud would: drops a trailing "'s",
+    numbers and stopwords. Unlike WordCloud.generate, terms never span two comments.
+    """
+    terms = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word and not word.isdigit() and word not in STOPWORDS_LOWER:
+            terms.append(word)
+    return terms
+
+
+class TermCounter:
+    """
+    Term frequencies per sentiment class.
+
+    Each comment is tokenized once, when it is added. Counters for different posts,
+    batches or brands can be merged with merge() (or +=), and the result feeds both
+    WordCloud.generate_from_frequencies (frequencies()) and the report (top_terms()).
+    """
+
+    def __init__(self, classes: Iterable[str] = ()):
+        self.by_class: Dict[str, Counter] = {label: Counter() for label in classes}
+
+    def add(self, text: Optional[str], classification: str):
+        if text:
+            self.by_class.setdefault(classification, Counter()).update(tokenize(text))
+
+    def add_all(self, texts: Iterable[Optional[str]], classifications: Iterable[str]):
+        for text, classification in zip(texts, classifications):
+            self.add(text, classification)
+
+    def merge(self, other: 'TermCounter') -> 'TermCounter':
+        for label, counts in other.by_class.items():
+            self.by_class.setdefault(label, Counter()).update(counts)
+        return self
+
+    __iadd__ = merge
+
+    def frequencies(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Term counts over all classes, most common first; limit keeps only the top terms."""
+        total = Counter()
+        for counts in self.by_class.values():
+            total.update(counts)
+        return dict(total.most_common(limit))
+
+    def top_terms(self, n: int = TOP_TERMS_PER_CLASS) -> Dict[str, List[Dict]]:
+        """The n most common terms of each sentiment class, for the report JSON."""
+        return {
+            label: [{'term': term, 'count': count} for term, count in counts.most_common(n)]
+            for label, counts in self.by_class.items()
+        }
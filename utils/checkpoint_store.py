@@ -0,0 +1,108 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import CHECKPOINT_PATH
+
+# Post states. Posts that failed are not recorded, so they are retried on resume.
+POST_SCRAPED = 'scraped'
+
+
+class CheckpointStore:
+    """
+    SQLite record of the work done by an unfinished run of main.main().
+
+    Each scraped post is stored with its comments as soon as it finishes, and each brand
+    is marked analyzed once its report is written, so a run that crashes can be restarted
+    and pick up at the first unfinished post. Translations are not stored here: the
+    translation cache already keeps every successful translation across runs.
+
+    main.main() calls clear() after all tabs have been processed, so the next run does
+    not resume from them. Which posts that run scrapes is up to PostScheduler: rows
+    already marked "Success" in the sheet are skipped unless forced.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            " brand TEXT NOT NULL, url TEXT NOT NULL, state TEXT NOT NULL, comments TEXT NOT NULL,"
+            " updated_at REAL NOT NULL, PRIMARY KEY (brand, url))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS brands ("
+            " brand TEXT PRIMARY KEY, report_path TEXT, post_count INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def save_post(self, brand: str, url: str, comments: List[str]):
+        """Records a post as scraped, with its comments. Committed immediately."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (brand, url, state, comments, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (brand, url, POST_SCRAPED, json.dumps(comments, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def completed_posts(self, brand: str) -> Dict[str, List[str]]:
+        """Returns url -> comments for every post of the brand scraped in this run."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, comments FROM posts WHERE brand = ? AND state = ?", (brand, POST_SCRAPED)
+            ).fetchall()
+        return {url: json.loads(comments) for url, comments in rows}
+
+    def mark_analyzed(self, brand: str, report_path: str, post_count: int):
+        """Records that the brand's report was written from post_count scraped posts."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO brands (brand, report_path, post_count, updated_at) VALUES (?, ?, ?, ?)",
+                (brand, report_path, post_count, time.time()),
+            )
+            self._conn.commit()
+
+    def analyzed_report(self, brand: str, post_count: int) -> Optional[str]:
+        """Returns the brand's report path if it was analyzed from the same number of posts, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT report_path, post_count FROM brands WHERE brand = ?", (brand,)
+            ).fetchone()
+        if row is None or row[1] != post_count or not row[0] or not os.path.exists(row[0]):
+            return None
+        return row[0]
+
+    def forget_post(self, url: str) -> int:
+        """Drops a post's checkpoint (in every brand) and its brands' analysis state. Returns posts removed."""
+        with self._lock:
+            brands = [row[0] for row in self._conn.execute("SELECT brand FROM posts WHERE url = ?", (url,))]
+            removed = self._conn.execute("DELETE FROM posts WHERE url = ?", (url,)).rowcount
+            self._conn.executemany("DELETE FROM brands WHERE brand = ?", [(brand,) for brand in brands])
+            self._conn.commit()
+        return removed
+
+    def forget_brand(self, brand: str) -> int:
+        """Drops all checkpoints of a brand. Returns posts removed."""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM posts WHERE brand = ?", (brand,)).rowcount
+            self._conn.execute("DELETE FROM brands WHERE brand = ?", (brand,))
+            self._conn.commit()
+        return removed
+
+    def clear(self):
+        """Drops every checkpoint, so the next run resumes nothing (completed sheet rows are still skipped)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM posts")
+            self._conn.execute("DELETE FROM brands")
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
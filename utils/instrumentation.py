@@ -0,0 +1,192 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import TIMING_REPORT_DIR, CHROME_TRACE
+
+
+class Instrumentation:
+    """
+    Timing spans for one run of the pipeline.
+
+    span(name) times a block (driver startup, a post's navigation, a scroll cycle, a
+    translation batch, a sheet write, ...) from any thread; record() adds a span that
+    was timed elsewhere, e.g. a chart rendered in a worker process. At the end of the run
+    write_report() saves per-span totals as JSON and write_chrome_trace() saves every
+    span in Chrome trace format (open it in chrome://tracing or Perfetto).
+
+    With profile=True, spans opened with span(..., profile=True) (the hot paths) also
+    run under cProfile; write_profile() merges those profiles into one .prof file.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.reset(profile)
+
+    def reset(self, profile: bool = False):
+        self.profile = profile
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._profiles: List[cProfile.Profile] = []
+        self.profiles_skipped = 0
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Seconds since the run started, on the clock spans are measured with."""
+        return time.perf_counter() - self._start
+
+    def record(self, name: str, start: float, duration: float, **args):
+        """Adds a span that started at start (see now()) and lasted duration seconds."""
+        thread = threading.current_thread()
+        event = {'name': name, 'start': start, 'duration': duration, 'tid': thread.ident}
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def span(self, name: str, profile: bool = False, **args):
+        """Times the block as a span called name; args are kept with it in the trace."""
+        profiler = self._start_profiler() if profile and self.profile else None
+        start = self.now()
+        try:
+            yield
+        finally:
+            duration = self.now() - start
+            if profiler:
+                profiler.disable()
+                with self._lock:
+                    self._profiles.append(profiler)
+            self.record(name, start, duration, **args)
+
+    def _start_profiler(self) -> Optional[cProfile.Profile]:
+        # Python 3.12+ allows only one active profiler per process, so a hot path that
+        # starts while another thread is being profiled runs unprofiled.
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            with self._lock:
+                self.profiles_skipped += 1
+            return None
+        return profiler
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per span name: count, total/average/max seconds, sorted by total time."""
+        with self._lock:
+            events = list(self._events)
+        totals: Dict[str, Dict] = {}
+        for event in events:
+            entry = totals.setdefault(event['name'], {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            entry['count'] += 1
+            entry['total_seconds'] += event['duration']
+            entry['max_seconds'] = max(entry['max_seconds'], event['duration'])
+        return {
+            name: {
+                'count': entry['count'],
+                'total_seconds': round(entry['total_seconds'], 3),
+                'avg_seconds': round(entry['total_seconds'] / entry['count'], 4),
+                'max_seconds': round(entry['max_seconds'], 3),
+            }
+            for name, entry in sorted(totals.items(), key=lambda item: -item[1]['total_seconds'])
+        }
+
+    def write_report(self, path: str) -> Dict:
+        """
+        Writes the run's timing report as JSON and returns it. Spans from different
+        threads overlap, so their totals can add up to more than the run's wall time.
+        """
+        report = {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(self.now(), 3),
+            'spans': self.summary(),
+        }
+        _write_json(path, report)
+        return report
+
+    def write_chrome_trace(self, path: str):
+        """Writes every span as a Chrome trace 'complete' event, one track per thread."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        trace = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in threads.items()
+        ]
+        for event in events:
+            trace.append({
+                'name': event['name'], 'ph': 'X', 'pid': pid, 'tid': event['tid'],
+                'ts': round(event['start'] * 1e6), 'dur': round(event['duration'] * 1e6),
+                'args': event.get('args', {}),
+            })
+        _write_json(path, {'traceEvents': trace, 'displayTimeUnit': 'ms'})
+
+    def write_profile(self, path: str, top: int = 25) -> Optional[str]:
+        """
+        Merges the cProfile data of every profiled span into path (a .prof file for
+        pstats/snakeviz) and returns the top functions by cumulative time as text.
+        """
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        stats.dump_stats(path)
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats('cumulative').print_stats(top)
+        return out.getvalue()
+
+    def save_run(self, directory: str = TIMING_REPORT_DIR, trace: bool = CHROME_TRACE):
+        """
+        Writes the run's timing report to directory, plus the Chrome trace if trace is set
+        and the merged profile if profiling is on, and prints the slowest spans.
+        """
+        base = os.path.join(directory, f"run_{self.started_at.strftime('%Y%m%d_%H%M%S')}")
+        report = self.write_report(base + '_timing.json')
+        print(f"[INFO] Timing report saved to {base}_timing.json ({report['wall_seconds']}s wall time). Slowest spans:")
+        for name, entry in list(report['spans'].items())[:8]:
+            print(f"[INFO]   {name}: {entry['total_seconds']}s over {entry['count']} span(s), max {entry['max_seconds']}s")
+        if trace:
+            self.write_chrome_trace(base + '_trace.json')
+            print(f"[INFO] Chrome trace saved to {base}_trace.json (open in chrome://tracing or ui.perfetto.dev).")
+        if self.profile:
+            top_functions = self.write_profile(base + '.prof')
+            if top_functions:
+                print(top_functions)
+                print(f"[INFO] Profile saved to {base}.prof.")
+            if self.profiles_skipped:
+                print(f"[INFO] {self.profiles_skipped} hot-path span(s) ran unprofiled while another was being profiled.")
+
+
+def _write_json(path: str, data: Dict):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+# The run's instrumentation. Modules time their work with span(); main.main() resets it
+# at the start of a run and writes the reports at the end.
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    return _instrumentation
+
+
+def span(name: str, profile: bool = False, **args):
+    """Times a block on the run's instrumentation: with span('translation', comments=n): ..."""
+    return _instrumentation.span(name, profile=profile, **args)
@@ -0,0 +1,186 @@
+import time
+from datetime import datetime
+from typing import AbstractSet, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from config import (URL_COLUMN, STATUS_COLUMN, COMMENT_COUNT_COLUMN, PRIORITY_COLUMN, POSTED_AT_COLUMN,
+                    SCHEDULE_ORDER, SKIP_COMPLETED_POSTS, BRAND_TIME_BUDGET, BRAND_TIME_BUDGETS)
+from utils.sheet_handler import get_all_posts
+
+COMPLETED_STATUS = 'Success'
+
+
+class PostTask(NamedTuple):
+    """
+    One post row of a brand tab. row_index is its row in the worksheet. priority,
+    posted_at (Unix time) and expected_comments (the count from the last scrape) are None
+    when the row leaves them blank; last_scraped is None for posts never scraped.
+    """
+    brand: str
+    row_index: int
+    url: str
+    status: str
+    priority: Optional[float] = None
+    posted_at: Optional[float] = None
+    expected_comments: Optional[int] = None
+    last_scraped: Optional[float] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status == COMPLETED_STATUS
+
+
+def _missing_last(value: Optional[float]) -> tuple:
+    return (value is None, value or 0)
+
+
+# Sort keys for SCHEDULE_ORDER. Lower sorts first; blank cells sort after filled ones.
+PRIORITY_KEYS: Dict[str, Callable[[PostTask], tuple]] = {
+    'priority': lambda task: _missing_last(task.priority),
+    'newest': lambda task: _missing_last(-task.posted_at if task.posted_at is not None else None),
+    'oldest': lambda task: _missing_last(task.posted_at),
+    # Never-scraped posts first, then the ones scraped longest ago.
+    'stale': lambda task: (task.last_scraped is not None, task.last_scraped or 0),
+    'smallest': lambda task: _missing_last(task.expected_comments),
+    'largest': lambda task: _missing_last(-task.expected_comments if task.expected_comments is not None else None),
+}
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value) -> Optional[float]:
+    """Unix time of a date cell: ISO 8601 ('2024-05-01' or with a time), or a number already in seconds."""
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).strip().replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class BrandPlan:
+    """
+    The scheduled work of one brand tab: tasks to scrape in priority order, plus the
+    completed rows left out of the run (skipped). The brand's time budget starts with
+    start(); over_budget() then tells the scrape pool to stop taking its posts.
+    """
+
+    def __init__(self, sheet, brand: str, tasks: List[PostTask], skipped: List[PostTask],
+                 budget: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.sheet = sheet
+        self.brand = brand
+        self.tasks = tasks
+        self.skipped = skipped
+        self.budget = budget or None
+        self.clock = clock
+        self.started_at: Optional[float] = None
+
+    @property
+    def expected_comments(self) -> int:
+        return sum(task.expected_comments or 0 for task in self.tasks)
+
+    def start(self):
+        self.started_at = self.clock()
+
+    def elapsed(self) -> float:
+        return 0.0 if self.started_at is None else self.clock() - self.started_at
+
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.started_at is not None and self.elapsed() >= self.budget
+
+    def __repr__(self):
+        return f"BrandPlan(brand={self.brand!r}, tasks={len(self.tasks)}, skipped={len(self.skipped)}, budget={self.budget})"
+
+
+class PostScheduler:
+    """
+    Reads every brand tab up front and decides what to scrape, and in which order.
+
+    Rows whose STATUS_COLUMN is already "Success" are skipped (skip_completed) or, when
+    they have to be scraped again (rescrape_completed, e.g. incremental runs, or forced
+    from the command line), queued after all other posts; a forced post is queued with
+    the pending ones. Posts are ordered by the keys named in order (see PRIORITY_KEYS),
+    and brands by their most urgent post, then by expected comment count and post count,
+    so a small urgent campaign is not stuck behind a large tab. Each brand gets
+    brand_budget seconds (brand_budgets overrides it per tab name; 0 or None means no
+    limit), measured with clock. last_scraped(brand, url), if given, returns when a post
+    was last scraped. With a SheetSnapshot, tabs are read from it instead of the API.
+    """
+
+    def __init__(self, order: Sequence[str] = SCHEDULE_ORDER, skip_completed: bool = SKIP_COMPLETED_POSTS,
+                 brand_budget: Optional[float] = BRAND_TIME_BUDGET, brand_budgets: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 last_scraped: Optional[Callable[[str, str], Optional[float]]] = None, snapshot=None):
+        unknown = [name for name in order if name not in PRIORITY_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown schedule key(s) {unknown}; expected any of {sorted(PRIORITY_KEYS)}.")
+        self.order = list(order)
+        self.skip_completed = skip_completed
+        self.brand_budget = brand_budget
+        self.brand_budgets = BRAND_TIME_BUDGETS if brand_budgets is None else brand_budgets
+        self.clock = clock
+        self.last_scraped = last_scraped
+        self.snapshot = snapshot
+
+    def sort_key(self, task: PostTask) -> tuple:
+        return tuple(PRIORITY_KEYS[name](task) for name in self.order)
+
+    def read_tasks(self, sheet) -> List[PostTask]:
+        """Returns a PostTask for every row of the tab that has a post URL, in row order."""
+        tasks = []
+        for i, post in enumerate(get_all_posts(sheet, self.snapshot)):
+            url = post.get(URL_COLUMN)
+            if not url:
+                continue
+            count = _number(post.get(COMMENT_COUNT_COLUMN))
+            tasks.append(PostTask(
+                brand=sheet.title, row_index=i + 2, url=url, status=str(post.get(STATUS_COLUMN, '')).strip(),
+                priority=_number(post.get(PRIORITY_COLUMN)), posted_at=_timestamp(post.get(POSTED_AT_COLUMN)),
+                expected_comments=int(count) if count is not None else None,
+                last_scraped=self.last_scraped(sheet.title, url) if self.last_scraped else None,
+            ))
+        return tasks
+
+    def plan_brand(self, sheet, tasks: List[PostTask], rescrape_completed: bool = False,
+                   force_posts: AbstractSet[str] = frozenset()) -> BrandPlan:
+        pending = sorted((task for task in tasks if not task.completed or task.url in force_posts), key=self.sort_key)
+        completed = sorted((task for task in tasks if task.completed and task.url not in force_posts), key=self.sort_key)
+        if rescrape_completed or not self.skip_completed:
+            pending, skipped = pending + completed, []
+        else:
+            skipped = completed
+        budget = self.brand_budgets.get(sheet.title, self.brand_budget)
+        return BrandPlan(sheet, sheet.title, pending, skipped, budget=budget, clock=self.clock)
+
+    def plan(self, sheets: List, rescrape_completed: Optional[Callable[[str], bool]] = None, force: bool = False,
+             force_brands: Optional[Sequence[str]] = None, force_posts: Optional[Sequence[str]] = None) -> List[BrandPlan]:
+        """
+        Builds a BrandPlan for every tab with at least one post, most urgent brand first.
+        rescrape_completed(brand), if given, says whether a brand's completed rows are
+        scraped again instead of skipped. force does so for every brand, force_brands for
+        the tabs named, and force_posts (URLs) for those posts only.
+        """
+        force_brands = set(force_brands or ())
+        force_posts = frozenset(force_posts or ())
+        plans = []
+        for sheet in sheets:
+            tasks = self.read_tasks(sheet)
+            if not tasks:
+                print(f"No posts found for '{sheet.title}' in the sheet.")
+                continue
+            rescrape = force or sheet.title in force_brands or bool(rescrape_completed and rescrape_completed(sheet.title))
+            plans.append(self.plan_brand(sheet, tasks, rescrape, force_posts))
+
+        # Brands with nothing left to scrape go last (they only need their report checked).
+        plans.sort(key=lambda plan: (not plan.tasks, self.sort_key(plan.tasks[0]) if plan.tasks else (),
+                                     plan.expected_comments, len(plan.tasks)))
+        for plan in plans:
+            print(f"[INFO] Scheduled '{plan.brand}': {len(plan.tasks)} post(s) to scrape, "
+                  f"{len(plan.skipped)} already completed" + (f", {plan.budget:g}s budget." if plan.budget else "."))
+        return plans
@@ -1,7 +1,15 @@
 import gspread
+from gspread.utils import rowcol_to_a1, absolute_range_name, numericise_all
 from oauth2client.service_account import ServiceAccountCredentials
-from config import SHEET_ID, CREDENTIALS_JSON, COMMENTS_LINK_COLUMN
+from config import (SHEET_ID, CREDENTIALS_JSON, STATUS_COLUMN, COMMENT_COUNT_COLUMN, COMMENTS_LINK_COLUMN,
+                    SHEET_BATCH_ROWS, SHEET_FLUSH_INTERVAL, SHEET_MAX_RETRIES)
 import pandas as pd
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.instrumentation import span
 
 def get_gspread_client():
     """Authorize and return the gspread client."""
@@ -22,36 +30,256 @@ def get_all_tabs(client):
     if not client:
         return []
     try:
-        spreadsheet = client.open_by_key(SHEET_ID)
-        return spreadsheet.worksheets()
+        with span('sheet_read'):
+            spreadsheet = client.open_by_key(SHEET_ID)
+            return spreadsheet.worksheets()
     except Exception as e:
         print(f"Failed to get tabs from spreadsheet: {e}")
         return []
 
-def get_all_posts(sheet):
-    """Fetch all records from a given sheet."""
+def get_all_posts(sheet, snapshot=None):
+    """Fetch all records from a given sheet, or from a SheetSnapshot of it without an API call."""
+    if sheet and snapshot is not None:
+        return snapshot.records(sheet.title)
     if sheet:
-        return sheet.get_all_records()
+        with span('sheet_read', sheet=sheet.title):
+            return sheet.get_all_records()
     return []
 
-def update_status_for_post(sheet, row_index, status, comment_count=None, comments_link=None, analyzed_link=None, wordcloud_link=None):
-    """Update the status and output links for a specific row in the sheet."""
+class SheetSnapshot:
+    """
+    The values of every tab of a spreadsheet, read in one values_batch_get request.
+
+    Each tab is kept as a DataFrame of its cell values (as shown in the sheet) with the
+    header row as columns and the sheet row numbers (2, 3, ...) as index; the header ->
+    column map is computed once per tab. Writes go through diff(), which drops cells that
+    already hold the value, and apply(), which records what was written.
+    """
+
+    def __init__(self, worksheets: List, values: Dict[str, List[List[str]]]):
+        self.worksheets = worksheets
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self._columns: Dict[str, Dict[str, int]] = {}
+        for sheet in worksheets:
+            rows = values.get(sheet.title) or [[]]
+            header = list(rows[0])
+            width = max([len(header)] + [len(row) for row in rows[1:]])
+            header += [''] * (width - len(header))
+            body = [list(row) + [''] * (width - len(row)) for row in rows[1:]]
+            self.frames[sheet.title] = pd.DataFrame(body, columns=header, index=range(2, len(body) + 2), dtype=object)
+            self._columns[sheet.title] = {name: i + 1 for i, name in enumerate(header) if name}
+
+    @classmethod
+    def load(cls, spreadsheet) -> 'SheetSnapshot':
+        """Lists the tabs (one metadata request) and reads all of their values (one values_batch_get)."""
+        with span('sheet_read'):
+            worksheets = spreadsheet.worksheets()
+            ranges = [absolute_range_name(sheet.title) for sheet in worksheets]
+            response = spreadsheet.values_batch_get(ranges) if ranges else {}
+        # valueRanges come back in the order they were requested.
+        value_ranges = response.get('valueRanges', [])
+        values = {sheet.title: value_range.get('values', []) for sheet, value_range in zip(worksheets, value_ranges)}
+        return cls(worksheets, values)
+
+    def frame(self, title: str) -> pd.DataFrame:
+        return self.frames[title]
+
+    def columns(self, title: str) -> Dict[str, int]:
+        """Header -> 1-based column number of a tab."""
+        return self._columns[title]
+
+    def records(self, title: str) -> List[Dict]:
+        """The tab's rows as dicts keyed by header, with numbers parsed like get_all_records()."""
+        frame = self.frames[title]
+        return [dict(zip(frame.columns, numericise_all(list(row))))
+                for row in frame.itertuples(index=False, name=None)]
+
+    def _cell(self, title: str, row: int, col: int) -> Optional[str]:
+        frame = self.frames[title]
+        if row not in frame.index or col > len(frame.columns):
+            return None
+        return frame.iat[row - 2, col - 1]
+
+    def diff(self, title: str, cells: Dict[Tuple[int, int], object]) -> Dict[Tuple[int, int], object]:
+        """The (row, col) -> value updates whose value differs from the snapshot."""
+        return {(row, col): value for (row, col), value in cells.items() if self._cell(title, row, col) != str(value)}
+
+    def apply(self, title: str, cells: Dict[Tuple[int, int], object]):
+        """Records written cells in the snapshot. Cells outside the tab's read range are left out."""
+        frame = self.frames[title]
+        for (row, col), value in cells.items():
+            if row in frame.index and col <= len(frame.columns):
+                frame.iat[row - 2, col - 1] = str(value)
+
+def load_sheet_snapshot(client) -> Optional[SheetSnapshot]:
+    """Opens the spreadsheet and reads every tab into a SheetSnapshot."""
+    if not client:
+        return None
+    try:
+        snapshot = SheetSnapshot.load(client.open_by_key(SHEET_ID))
+        print(f"[INFO] Read {len(snapshot.worksheets)} tab(s) from the spreadsheet in one batch request.")
+        return snapshot
+    except Exception as e:
+        print(f"Failed to read tabs from spreadsheet: {e}")
+        return None
+
+class SheetWriteBuffer:
+    """
+    Queues cell updates for one worksheet and writes them with a single batch_update.
+
+    The header row is read once and cached as a header -> column map. Updates are flushed
+    when max_rows distinct rows are pending, when flush() is called, and, while the buffer
+    is open as a context manager, by a background timer every max_interval seconds, so
+    queued rows are written even when no further updates arrive (0 turns time-based
+    flushes off). Rate-limit (429) errors
+    are retried with exponential backoff.
+
+    With a SheetSnapshot, the header comes from the snapshot instead of the sheet, and
+    cells that already hold the queued value are not written.
+    """
+
+    def __init__(self, sheet, max_rows: int = SHEET_BATCH_ROWS, max_interval: float = SHEET_FLUSH_INTERVAL,
+                 max_retries: int = SHEET_MAX_RETRIES, snapshot: Optional[SheetSnapshot] = None,
+                 retry_delay: float = 1.0):
+        self.sheet = sheet
+        self.snapshot = snapshot
+        self.max_rows = max_rows
+        self.max_interval = max_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retries = 0
+        self._columns = None
+        self._pending = {}
+        self._rows = set()
+        self._last_flush = time.monotonic()
+        # _lock guards the queue; _write_lock keeps flushes (timer and caller) in order.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = None
+
+    def __enter__(self):
+        if self.max_interval and self.max_interval > 0:
+            self._closed.clear()
+            self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._timer.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        self.flush()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.max_interval / 4):
+            if time.monotonic() - self._last_flush >= self.max_interval:
+                self.flush()
+
+    @property
+    def columns(self) -> Dict[str, int]:
+        """Header -> 1-based column number, read from the sheet on first use."""
+        if self._columns is None and self.snapshot is not None:
+            self._columns = self.snapshot.columns(self.sheet.title)
+        if self._columns is None:
+            self._columns = {header: i + 1 for i, header in enumerate(self.sheet.row_values(1)) if header}
+        return self._columns
+
+    def update_row(self, row_index: int, values: Dict[str, object]):
+        """Queues values (keyed by column header) for a row. None values are skipped."""
+        for header, value in values.items():
+            if value is None:
+                continue
+            if header not in self.columns:
+                print(f"[WARNING] Column '{header}' not found in sheet '{self.sheet.title}'.")
+                continue
+            with self._lock:
+                self._pending[(row_index, self.columns[header])] = value
+        with self._lock:
+            self._rows.add(row_index)
+            due = len(self._rows) >= self.max_rows or (
+                bool(self.max_interval) and time.monotonic() - self._last_flush >= self.max_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Writes all queued updates in one batch_update call."""
+        with self._write_lock:
+            with self._lock:
+                self._last_flush = time.monotonic()
+                cells = self._pending
+                rows = len(self._rows)
+                self._pending = {}
+                self._rows = set()
+            if cells:
+                self._write(cells, rows)
+
+    def _write(self, cells: Dict[Tuple[int, int], object], rows: int):
+        if self.snapshot is not None:
+            cells = self.snapshot.diff(self.sheet.title, cells)
+            if not cells:
+                print(f"Sheet '{self.sheet.title}' already up to date for {rows} rows. Nothing written.")
+                return
+        data = [{'range': rowcol_to_a1(row, col), 'values': [[value]]} for (row, col), value in sorted(cells.items())]
+        for attempt in range(self.max_retries + 1):
+            try:
+                with span('sheet_write', sheet=self.sheet.title, cells=len(data)):
+                    self.sheet.batch_update(data)
+                if self.snapshot is not None:
+                    self.snapshot.apply(self.sheet.title, cells)
+                print(f"Updated sheet '{self.sheet.title}': {len(data)} cells across {rows} rows in one request.")
+                return
+            except gspread.exceptions.APIError as e:
+                if _api_error_status(e) != 429 or attempt == self.max_retries:
+                    print(f"Failed to update sheet '{self.sheet.title}' for {rows} rows: {e}")
+                    return
+                delay = self.retry_delay * (2 ** attempt + random.uniform(0, 1))
+                self.retries += 1
+                print(f"[WARNING] Sheets rate limit hit. Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+            except Exception as e:
+                print(f"Failed to update sheet '{self.sheet.title}' for {rows} rows: {e}")
+                return
+
+def _api_error_status(error) -> int:
+    code = getattr(error, 'code', None)
+    if code is None and getattr(error, 'response', None) is not None:
+        code = error.response.status_code
+    return code
+
+def update_status_for_post(sheet, row_index, status, comment_count=None, comments_link=None, analyzed_link=None, wordcloud_link=None,
+                           buffer=None, snapshot=None):
+    """Update the status and output links for a specific row in the sheet.
+
+    If a SheetWriteBuffer is passed, the updates are queued on it instead of written immediately.
+    With a SheetSnapshot, the header row is taken from it instead of being read from the sheet.
+    """
     if not sheet:
         return
+
+    if buffer is not None:
+        buffer.update_row(row_index, {
+            STATUS_COLUMN: status,
+            COMMENT_COUNT_COLUMN: comment_count,
+            COMMENTS_LINK_COLUMN: comments_link or None,
+        })
+        return
         
     try:
-        # Find column numbers dynamically
-        headers = sheet.row_values(1)
-        status_col = headers.index('Status') + 1
-        count_col = headers.index('Comments Count') + 1
-        comments_link_col = headers.index(COMMENTS_LINK_COLUMN) + 1
-        
-        # Update cells
-        sheet.update_cell(row_index, status_col, status)
-        if comment_count is not None:
-            sheet.update_cell(row_index, count_col, comment_count)
-        if comments_link:
-            sheet.update_cell(row_index, comments_link_col, comments_link)
+        with span('sheet_write', sheet=sheet.title):
+            # Find column numbers dynamically
+            headers = list(snapshot.frame(sheet.title).columns) if snapshot is not None else sheet.row_values(1)
+            status_col = headers.index('Status') + 1
+            count_col = headers.index('Comments Count') + 1
+            comments_link_col = headers.index(COMMENTS_LINK_COLUMN) + 1
+
+            # Update cells
+            sheet.update_cell(row_index, status_col, status)
+            if comment_count is not None:
+                sheet.update_cell(row_index, count_col, comment_count)
+            if comments_link:
+                sheet.update_cell(row_index, comments_link_col, comments_link)
             
         print(f"Updated sheet '{sheet.title}' for row {row_index}.")
             
@@ -66,10 +294,11 @@ def update_brand_report_links(sheet, bar_chart_link: str, word_cloud_link: str):
         # Assuming the links should be placed in a specific, known cell.
         # For example, in cell J1 for the bar chart and K1 for the word cloud.
         # This can be adjusted as needed.
-        sheet.update('J1', 'Brand Bar Chart Link')
-        sheet.update('K1', bar_chart_link)
-        sheet.update('L1', 'Brand Word Cloud Link')
-        sheet.update('M1', word_cloud_link)
+        with span('sheet_write', sheet=sheet.title):
+            sheet.update('J1', 'Brand Bar Chart Link')
+            sheet.update('K1', bar_chart_link)
+            sheet.update('L1', 'Brand Word Cloud Link')
+            sheet.update('M1', word_cloud_link)
         print(f"Updated brand report links for sheet '{sheet.title}'.")
     except Exception as e:
         print(f"Failed to update brand report links for sheet '{sheet.title}': {e}") 
@@ -0,0 +1,263 @@
+import glob
+import gzip
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from config import STORAGE_FORMAT
+from social_sentiment_analyzer.analyzer import analyzed_comments_frame, SCORE_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet is optional; 'json' and 'jsonl.gz' need only the standard library.
+    pa = pq = None
+
+STORAGE_FORMATS = ('json', 'jsonl.gz', 'parquet')
+
+_SHORTCODE_PATTERN = re.compile(r'/(?:p|reel|tv)/([^/?#]+)')
+
+
+def sanitize_filename(name: str) -> str:
+    """Sanitizes a string to be a valid filename."""
+    return re.sub(r'[\\/*?:"<>|]', '_', name)
+
+
+def _check_format(fmt: str):
+    if fmt not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage format: {fmt}")
+    if fmt == 'parquet' and pq is None:
+        raise ImportError("STORAGE_FORMAT 'parquet' needs pyarrow (pip install pyarrow).")
+
+
+def _format_of(path: str) -> str:
+    for fmt in ('jsonl.gz', 'parquet'):
+        if path.endswith('.' + fmt):
+            return fmt
+    return 'json'
+
+
+def post_key(url: str) -> str:
+    """Partition value for a post: its shortcode, or the quoted URL if it has none."""
+    match = _SHORTCODE_PATTERN.search(url)
+    return match.group(1) if match else quote(url, safe='')
+
+
+def comments_path(data_dir: str, brand: str, url: str, fmt: str = STORAGE_FORMAT) -> str:
+    """
+    Where a post's comments are stored. 'json' keeps the original flat
+    comments_<brand>_<url>.json files; the compact formats are partitioned as
+    brand=<brand>/post=<shortcode>/comments.<fmt>.
+    """
+    _check_format(fmt)
+    if fmt == 'json':
+        return os.path.join(data_dir, f"comments_{sanitize_filename(brand)}_{sanitize_filename(url)}.json")
+    return os.path.join(data_dir, f"brand={quote(brand, safe='')}", f"post={post_key(url)}", f"comments.{fmt}")
+
+
+def scores_path(data_dir: str, brand: str, fmt: str = STORAGE_FORMAT) -> Optional[str]:
+    """Where a brand's per-comment scores are stored, or None for 'json' (they stay in the report)."""
+    _check_format(fmt)
+    if fmt == 'json':
+        return None
+    return os.path.join(data_dir, f"brand={quote(brand, safe='')}", f"scores.{fmt}")
+
+
+def _write_frame(path: str, frame: pd.DataFrame):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if _format_of(path) == 'parquet':
+        _check_format('parquet')
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path, compression='zstd')
+    else:
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for record in frame.to_dict('records'):
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _iter_frame(path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Yields a partitioned file in chunks of up to batch_size rows without loading it whole."""
+    if _format_of(path) == 'parquet':
+        _check_format('parquet')
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+        return
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        records = []
+        for line in f:
+            records.append(json.loads(line))
+            if len(records) >= batch_size:
+                yield pd.DataFrame.from_records(records)
+                records = []
+        if records:
+            yield pd.DataFrame.from_records(records)
+
+
+def _read_frame(path: str) -> pd.DataFrame:
+    if _format_of(path) == 'parquet':
+        _check_format('parquet')
+        return pq.read_table(path, memory_map=True).to_pandas()
+    return pd.concat(list(_iter_frame(path, 100000)) or [pd.DataFrame()], ignore_index=True)
+
+
+def _key_id(key: Optional[int]) -> Optional[str]:
+    return None if key is None else f"{key:016x}"
+
+
+def comment_threads(records) -> List[Dict]:
+    """
+    The key and parent_key of each CommentRecord, as 16-digit hex strings (parent_key is
+    None for top-level comments), in the form write_comments takes them.
+    """
+    return [{'key': _key_id(record.key), 'parent_key': _key_id(record.parent_key)} for record in records]
+
+
+def write_comments(path: str, comments: List[str], threads: Optional[List[Dict]] = None):
+    """
+    Writes a post's comments in the format given by the path's extension. threads, if
+    given, holds each comment's key and parent_key (see comment_threads), in the same
+    order; they are stored next to the text, so reply threads can be rebuilt from the
+    file. Without threads, 'json' files stay a plain list of texts.
+    """
+    if _format_of(path) == 'json':
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            if threads is not None:
+                comments = [{'text': text, **thread} for text, thread in zip(comments, threads)]
+            json.dump(comments, f, ensure_ascii=False, indent=4)
+        return
+    frame = pd.DataFrame({'position': range(len(comments)), 'text': pd.Series(comments, dtype=object)})
+    if threads is not None:
+        frame['key'] = pd.Series([thread['key'] for thread in threads], dtype=object)
+        frame['parent_key'] = pd.Series([thread['parent_key'] for thread in threads], dtype=object)
+    _write_frame(path, frame)
+
+
+def read_comment_rows(path: str) -> Optional[List[Dict]]:
+    """
+    Reads back a post's comments in order as {'text', 'key', 'parent_key'} dicts (key and
+    parent_key are None for files written without threads), or returns None if the file
+    is missing or unreadable.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        if _format_of(path) == 'json':
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            return [{'text': item['text'], 'key': item.get('key'), 'parent_key': item.get('parent_key')}
+                    if isinstance(item, dict) else {'text': item, 'key': None, 'parent_key': None}
+                    for item in saved]
+        frame = _read_frame(path)
+        if not len(frame):
+            return []
+        frame = frame.sort_values('position')
+        keys = frame['key'] if 'key' in frame else [None] * len(frame)
+        parent_keys = frame['parent_key'] if 'parent_key' in frame else [None] * len(frame)
+        return [{'text': text, 'key': key if isinstance(key, str) else None,
+                 'parent_key': parent_key if isinstance(parent_key, str) else None}
+                for text, key, parent_key in zip(frame['text'], keys, parent_keys)]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[WARNING] Could not read {path}: {e}")
+        return None
+
+
+def read_comments(path: str) -> Optional[List[str]]:
+    """Reads back a post's comment texts in order, or returns None if the file is missing or unreadable."""
+    rows = read_comment_rows(path)
+    return None if rows is None else [row['text'] for row in rows]
+
+
+def reply_threads(rows: List[Dict]) -> List[Dict]:
+    """
+    Groups comment rows (see read_comment_rows) into the threads that have replies: one
+    {'key', 'text', 'replies': [{'key', 'text'}]} per parent comment, in the order the
+    parents were saved. Replies whose parent is not among rows are left out.
+    """
+    parents = {row['key']: row for row in rows if row['key'] is not None and row['parent_key'] is None}
+    threads: Dict[str, Dict] = {}
+    for row in rows:
+        parent = parents.get(row['parent_key']) if row['parent_key'] is not None else None
+        if parent is None:
+            continue
+        thread = threads.setdefault(parent['key'], {'key': parent['key'], 'text': parent['text'], 'replies': []})
+        thread['replies'].append({'key': row['key'], 'text': row['text']})
+    order = {key: i for i, key in enumerate(parents)}
+    return sorted(threads.values(), key=lambda thread: order[thread['key']])
+
+
+def write_report(report_path: str, report: Dict, scores_file: Optional[str] = None):
+    """
+    Writes an analyze_comments_vader report. With scores_file, the per-comment results go
+    there as flat columns and the JSON report keeps only the summary plus a pointer to it.
+    """
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    if scores_file:
+        _write_frame(scores_file, analyzed_comments_frame(report['analyzed_comments']))
+        report = {key: value for key, value in report.items() if key != 'analyzed_comments'}
+        report['analyzed_comments_path'] = scores_file
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+
+
+def load_report(report_path: str) -> Optional[Dict]:
+    """Reads a report written by write_report, including its per-comment results, or returns None."""
+    if not os.path.exists(report_path):
+        return None
+    try:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        scores_file = report.pop('analyzed_comments_path', None)
+        if scores_file:
+            frame = _read_frame(scores_file)
+            report['analyzed_comments'] = [
+                {
+                    'original_text': row.original_text,
+                    'translated_text': row.translated_text,
+                    'scores': {column: float(getattr(row, column)) for column in SCORE_COLUMNS},
+                    'classification': row.classification,
+                    'route': row.route,
+                }
+                for row in frame.itertuples(index=False)
+            ]
+        return report
+    except (OSError, ValueError, KeyError, AttributeError) as e:
+        print(f"[WARNING] Could not read {report_path}: {e}")
+        return None
+
+
+def _partition_files(data_dir: str, kind: str, brands: Optional[List[str]]) -> Iterator[Dict]:
+    pattern = 'brand=*/post=*/comments.*' if kind == 'comments' else 'brand=*/scores.*'
+    for path in sorted(glob.glob(os.path.join(data_dir, pattern))):
+        if _format_of(path) == 'json':
+            continue
+        parts = dict(part.split('=', 1) for part in os.path.relpath(path, data_dir).split(os.sep) if '=' in part)
+        brand = unquote(parts['brand'])
+        if brands is None or brand in brands:
+            yield {'path': path, 'brand': brand, 'post': parts.get('post')}
+
+
+def iter_records(data_dir: str, kind: str = 'comments', brands: Optional[List[str]] = None,
+                 batch_size: int = 50000) -> Iterator[pd.DataFrame]:
+    """
+    Streams stored comments (kind='comments') or per-comment scores (kind='scores') across
+    brands as DataFrame chunks of up to batch_size rows, with brand (and post) columns
+    taken from the partition path. Parquet files are memory-mapped; JSONL files are read
+    line by line, so memory use is bounded by batch_size.
+    """
+    if kind not in ('comments', 'scores'):
+        raise ValueError(f"Unknown record kind: {kind}")
+    for partition in _partition_files(data_dir, kind, brands):
+        for chunk in _iter_frame(partition['path'], batch_size):
+            chunk.insert(0, 'brand', partition['brand'])
+            if kind == 'comments':
+                chunk.insert(1, 'post', partition['post'])
+            yield chunk
+
+
+def load_records(data_dir: str, kind: str = 'comments', brands: Optional[List[str]] = None) -> pd.DataFrame:
+    """Loads everything iter_records would yield into one DataFrame."""
+    return pd.concat(list(iter_records(data_dir, kind, brands)) or [pd.DataFrame()], ignore_index=True)